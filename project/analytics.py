@@ -0,0 +1,314 @@
+# occupancy heatmaps and pass networks aggregated over many matches
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, List, Optional
+import numpy as np
+from tracking import TrackingRecorder, BALL_ROW
+from replay import Replay
+
+DEFAULT_BINS = (20, 20)  # Heatmap cells along x and y of the 0-100 pitch
+TICK_CHUNK = 2048  # Ticks binned per bincount call, to bound temporary memory
+TASKS_PER_WORKER = 2  # Chunks in flight per worker process, bounding unmerged results
+
+
+class MatchAnalytics:
+    """
+    Mergeable occupancy heatmaps and pass networks for a squad pairing.
+
+    Heatmaps are per-player tick counts over a grid, filled straight from
+    tracking arrays with one bincount per chunk of ticks; team maps are
+    sums over each side's players. The pass network counts attempted and
+    completed passes between every pair of squad players from the event
+    log. Everything is a fixed-size array, so aggregating any number of
+    matches takes constant memory and results from separate processes are
+    combined with merge().
+    """
+
+    def __init__(self, player_ids: List[str], n_home: int, bins: tuple = DEFAULT_BINS):
+        """
+        Initialize empty heatmaps and networks.
+
+        Args:
+            player_ids: Squad player ids, home squad first (the tracking roster order)
+            n_home: Number of home squad players at the start of player_ids
+            bins: Heatmap cells along x and y
+        """
+        self.player_ids = list(player_ids)
+        self.n_home = n_home
+        self.bins = tuple(bins)
+        self.matches = 0
+        self._player_index = {player_id: i for i, player_id in enumerate(self.player_ids)}
+
+        n = len(self.player_ids)
+        self.occupancy = np.zeros((n,) + self.bins, dtype=np.int64)
+        self.passes = np.zeros((n, n), dtype=np.int64)
+        self.completed_passes = np.zeros((n, n), dtype=np.int64)
+
+    @classmethod
+    def for_replay(cls, replay: Replay, bins: tuple = DEFAULT_BINS) -> 'MatchAnalytics':
+        """Empty analytics for the squads of a recording"""
+        n_home = sum(entry['team'] == 'home' for entry in replay.roster)
+        return cls([entry['player_id'] for entry in replay.roster], n_home, bins)
+
+    # ---- Adding matches ----
+
+    def add_tracking(self, frames: np.ndarray, codes: np.ndarray):
+        """
+        Bin player positions from tracking arrays into the heatmaps.
+
+        Args:
+            frames: float frames, shape (ticks, rows, channels) with x, y first
+            codes: int codes, shape (ticks, rows, channels) with the roster index first
+        """
+        n_x, n_y = self.bins
+        cells = n_x * n_y
+        for start in range(0, len(frames), TICK_CHUNK):
+            xy = frames[start:start + TICK_CHUNK, :BALL_ROW, 0:2]
+            players = codes[start:start + TICK_CHUNK, :BALL_ROW, 0]
+            present = players >= 0
+            ix = np.clip((xy[..., 0][present] * (n_x / 100.0)).astype(np.intp), 0, n_x - 1)
+            iy = np.clip((xy[..., 1][present] * (n_y / 100.0)).astype(np.intp), 0, n_y - 1)
+            flat = players[present].astype(np.intp) * cells + ix * n_y + iy
+            self.occupancy += np.bincount(flat, minlength=self.occupancy.size).reshape(self.occupancy.shape)
+
+    def add_events(self, events: Iterable[dict]):
+        """
+        Count passes between squad players from an event log.
+
+        Args:
+            events: Match event dictionaries (Match.events or Replay.events)
+        """
+        passers, targets, completed = [], [], []
+        for event in events:
+            if event['type'] != 'pass':
+                continue
+            passer = self._player_index.get(event['player_id'])
+            target = self._player_index.get(event['details'].get('target'))
+            if passer is None or target is None:
+                continue
+            passers.append(passer)
+            targets.append(target)
+            completed.append(event['details'].get('outcome') == 'completed')
+        if not passers:
+            return
+        passers, targets = np.array(passers), np.array(targets)
+        np.add.at(self.passes, (passers, targets), 1)
+        done = np.array(completed)
+        np.add.at(self.completed_passes, (passers[done], targets[done]), 1)
+
+    def add_replay(self, replay: Replay):
+        """Add one recorded match: its tracking arrays and its event log"""
+        if [entry['player_id'] for entry in replay.roster] != self.player_ids:
+            raise ValueError("Recording squads do not match the analytics squads")
+        self.add_tracking(replay.frames, replay.codes)
+        self.add_events(replay.events)
+        self.matches += 1
+
+    def merge(self, other: 'MatchAnalytics') -> 'MatchAnalytics':
+        """
+        Add another set of analytics for the same squads and grid into this one.
+
+        Args:
+            other: Analytics from other matches
+
+        Returns:
+            This object, for chaining
+        """
+        if other.player_ids != self.player_ids or other.bins != self.bins:
+            raise ValueError("Cannot merge analytics for different squads or grids")
+        self.matches += other.matches
+        self.occupancy += other.occupancy
+        self.passes += other.passes
+        self.completed_passes += other.completed_passes
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the aggregate arrays (fixed, however many matches are added)"""
+        return self.occupancy.nbytes + self.passes.nbytes + self.completed_passes.nbytes
+
+    # ---- Results ----
+
+    def player_heatmap(self, player_id: str, normalize: bool = True) -> np.ndarray:
+        """
+        Occupancy of one player, indexed [x_cell, y_cell].
+
+        Args:
+            player_id: The player's id
+            normalize: Return shares of the player's ticks instead of counts
+
+        Returns:
+            Array of shape bins
+        """
+        counts = self.occupancy[self._player_index[player_id]]
+        return _normalized(counts) if normalize else counts
+
+    def team_heatmap(self, home: bool = True, normalize: bool = True) -> np.ndarray:
+        """
+        Occupancy of a whole side, indexed [x_cell, y_cell].
+
+        Args:
+            home: Home side (True) or away side (False)
+            normalize: Return shares of the side's player-ticks instead of counts
+
+        Returns:
+            Array of shape bins
+        """
+        players = slice(0, self.n_home) if home else slice(self.n_home, None)
+        counts = self.occupancy[players].sum(axis=0)
+        return _normalized(counts) if normalize else counts
+
+    def pass_network(self, completed_only: bool = True, per_match: bool = True) -> np.ndarray:
+        """
+        Pass counts between squad players, indexed [passer, target] in player_ids order.
+
+        Args:
+            completed_only: Count only completed passes
+            per_match: Divide by the number of matches aggregated
+
+        Returns:
+            Square adjacency matrix
+        """
+        counts = self.completed_passes if completed_only else self.passes
+        if per_match:
+            return counts / max(self.matches, 1)
+        return counts.copy()
+
+
+def _normalized(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    return counts / total if total else counts.astype(float)
+
+
+def control_map(match, home: bool = True) -> np.ndarray:
+    """
+    Live pitch control of one side, indexed [x_cell, y_cell] like the heatmaps.
+
+    Reads the match's shared surface (Match.pitch_control), so it agrees
+    with what the features and pass selection saw at the same tick.
+
+    Args:
+        match: The match in progress
+        home: Home side (True) or away side (False)
+
+    Returns:
+        Array of control probabilities over the pitch-control grid
+    """
+    team = match.home_team if home else match.away_team
+    return match.pitch_control.surface(team).T
+
+
+def analyze_replays(paths: List[str], bins: tuple = DEFAULT_BINS) -> Optional[MatchAnalytics]:
+    """
+    Aggregate recordings of one fixture in this process.
+
+    Args:
+        paths: Tracking data files with the same squads
+        bins: Heatmap cells along x and y
+
+    Returns:
+        Combined analytics, or None if there are no paths
+    """
+    analytics = None
+    for path in paths:
+        replay = Replay(path)
+        if analytics is None:
+            analytics = MatchAnalytics.for_replay(replay, bins)
+        analytics.add_replay(replay)
+    return analytics
+
+
+def analyze_simulations(seeds: List[int], factory: Callable,
+                        bins: tuple = DEFAULT_BINS) -> Optional[MatchAnalytics]:
+    """
+    Simulate one match per seed and aggregate them in this process.
+
+    Each match is recorded to the same temporary tracking file, which is
+    analysed and then overwritten by the next, so disk and memory use do
+    not grow with the number of matches. The caller's random state is
+    left untouched.
+
+    Args:
+        seeds: One random seed per match
+        factory: Picklable callable returning a new Match (e.g. create_sample_match)
+        bins: Heatmap cells along x and y
+
+    Returns:
+        Combined analytics, or None if there are no seeds
+    """
+    from gamesim import SimpleMatchSimulator
+
+    saved_state = random.getstate()
+    analytics = None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'match.trk')
+            for seed in seeds:
+                random.seed(seed)
+                match = factory()
+                simulator = SimpleMatchSimulator(match, verbose=False)
+                with TrackingRecorder(path, match, simulator.time_step) as recorder:
+                    simulator.recorder = recorder
+                    simulator.run()
+                replay = Replay(path)
+                if analytics is None:
+                    analytics = MatchAnalytics.for_replay(replay, bins)
+                analytics.add_replay(replay)
+                del replay
+    finally:
+        random.setstate(saved_state)
+    return analytics
+
+
+def parallel_analytics(worker: Callable, items: List, workers: int = 0,
+                       chunk_size: int = 50, **kwargs) -> Optional[MatchAnalytics]:
+    """
+    Split items into chunks, aggregate each chunk in a worker process and merge the results.
+
+    At most TASKS_PER_WORKER chunks per worker are in flight at a time and
+    each result is merged and dropped as soon as it arrives, so memory does
+    not grow with the number of chunks.
+
+    Args:
+        worker: analyze_replays or analyze_simulations (called as worker(chunk, **kwargs))
+        items: Recording paths or seeds
+        workers: Number of worker processes (0 runs everything inline)
+        chunk_size: Items per task; each task returns one fixed-size result
+        **kwargs: Extra arguments for the worker (factory, bins)
+
+    Returns:
+        Analytics for all items, or None if there are none
+    """
+    chunks = (items[i:i + chunk_size] for i in range(0, len(items), chunk_size))
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return _merge_all(_completed(executor, worker, chunks, TASKS_PER_WORKER * workers, kwargs))
+    return _merge_all(worker(chunk, **kwargs) for chunk in chunks)
+
+
+def _completed(executor: ProcessPoolExecutor, worker: Callable, chunks: Iterable[List],
+               window: int, kwargs: dict) -> Iterator[Optional[MatchAnalytics]]:
+    """Yield worker results in completion order, keeping at most window chunks submitted"""
+    pending = set()
+    for chunk in chunks:
+        pending.add(executor.submit(worker, chunk, **kwargs))
+        while len(pending) >= window:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            yield future.result()
+
+
+def _merge_all(partials: Iterable[Optional[MatchAnalytics]]) -> Optional[MatchAnalytics]:
+    """Merge partial results as they arrive, keeping only the running total"""
+    total = None
+    for partial in partials:
+        if partial is None:
+            continue
+        total = partial if total is None else total.merge(partial)
+    return total
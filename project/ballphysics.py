@@ -0,0 +1,288 @@
+# closed-form ball flight with event-driven sub-stepping
+import math
+import numpy as np
+from typing import Optional
+from states import Ball, PhysicalState
+
+# Fraction of horizontal speed kept per second (rolling matches the old 0.95 per tick)
+GROUND_RETENTION = 0.95
+AIR_RETENTION = 0.985
+GROUND_DECAY = -math.log(GROUND_RETENTION)
+AIR_DECAY = -math.log(AIR_RETENTION)
+
+GRAVITY = 9.81  # m/s^2, heights are in meters
+BOUNCE_RESTITUTION = 0.5  # Fraction of vertical speed kept on a bounce
+MIN_BOUNCE_SPEED = 1.0  # Slower impacts stop bouncing and roll
+STOP_SPEED = 0.1  # Below this horizontal speed the ball comes to rest
+
+# Pitch and goal dimensions on the 0-100 scale
+PITCH_MIN, PITCH_MAX = 0.0, 100.0
+GOAL_MIN_Y, GOAL_MAX_Y = 45.0, 55.0
+CROSSBAR_HEIGHT = 2.44
+
+# Height bands for the airborne physical states
+LOW_BALL_HEIGHT = 1.0
+MEDIUM_BALL_HEIGHT = 2.5
+
+# Lines the ball can leave the pitch over
+HOME_GOAL_LINE = 'home_goal_line'  # x = 0
+AWAY_GOAL_LINE = 'away_goal_line'  # x = 100
+TOUCHLINE = 'touchline'  # y = 0 or y = 100
+
+# Safety limit on analytic segments per advance (bounces, landings, stops)
+MAX_SEGMENTS = 32
+
+
+class BoundaryCrossing:
+    """Where and when a free ball crossed a pitch boundary"""
+
+    def __init__(self, time: float, position: np.ndarray, height: float, line: str):
+        """
+        Initialize the crossing record.
+
+        Args:
+            time: Seconds into the advance at which the line was crossed
+            position: Ball position on the line
+            height: Ball height in meters at the crossing
+            line: HOME_GOAL_LINE, AWAY_GOAL_LINE or TOUCHLINE
+        """
+        self.time = time
+        self.position = position
+        self.height = height
+        self.line = line
+
+    @property
+    def is_goal(self) -> bool:
+        """Whether the ball crossed a goal line between the posts and under the bar"""
+        return (self.line in (HOME_GOAL_LINE, AWAY_GOAL_LINE) and
+                GOAL_MIN_Y <= self.position[1] <= GOAL_MAX_Y and
+                self.height <= CROSSBAR_HEIGHT)
+
+
+def travel(velocity, decay: float, t):
+    """
+    Displacement after t seconds of exponentially decaying motion.
+
+    Solves dv/dt = -decay * v, so x(t) = x0 + v0 * (1 - exp(-decay * t)) / decay.
+    Works elementwise, so t may be an array of times.
+
+    Args:
+        velocity: Initial velocity (scalar or array)
+        decay: Decay rate per second
+        t: Elapsed time(s)
+
+    Returns:
+        Displacement with the broadcast shape of velocity and t
+    """
+    return velocity * (-np.expm1(-decay * t) / decay)
+
+
+def launch_speed(distance: float, arrival_speed: float, decay: float = GROUND_DECAY) -> float:
+    """
+    Initial speed needed for a rolling ball to cover a distance.
+
+    Since v(t) = v0 - decay * x(t), the answer is v0 = arrival_speed + decay * distance.
+
+    Args:
+        distance: Distance to cover
+        arrival_speed: Speed the ball should still have on arrival
+        decay: Decay rate per second
+
+    Returns:
+        Launch speed
+    """
+    return arrival_speed + decay * distance
+
+
+def time_to_line(start: float, velocity: float, decay: float, line: float) -> float:
+    """
+    Exact time for one coordinate of a decaying ball to reach a line.
+
+    Args:
+        start: Current coordinate
+        velocity: Velocity along the same axis
+        decay: Decay rate per second
+        line: Coordinate of the line
+
+    Returns:
+        Time in seconds, or infinity if the ball stops short or moves away
+    """
+    if velocity == 0.0:
+        return math.inf
+    fraction = decay * (line - start) / velocity
+    if fraction < 0.0 or fraction >= 1.0:
+        return math.inf
+    return -math.log1p(-fraction) / decay
+
+
+def time_to_stop(speed: float, decay: float) -> float:
+    """Time until the horizontal speed falls below STOP_SPEED"""
+    if speed <= STOP_SPEED:
+        return 0.0
+    return math.log(speed / STOP_SPEED) / decay
+
+
+def landing_time(height: float, vertical_velocity: float) -> float:
+    """Time until an airborne ball returns to the ground"""
+    return (vertical_velocity + math.sqrt(vertical_velocity ** 2 + 2 * GRAVITY * height)) / GRAVITY
+
+
+def _boundary_time(position: np.ndarray, velocity: np.ndarray, decay: float):
+    """Earliest time and line at which the ball leaves the pitch"""
+    x, y = position
+    vx, vy = velocity
+    best, line = math.inf, None
+    if vx < 0:
+        best, line = time_to_line(x, vx, decay, PITCH_MIN), HOME_GOAL_LINE
+    elif vx > 0:
+        best, line = time_to_line(x, vx, decay, PITCH_MAX), AWAY_GOAL_LINE
+    if vy != 0:
+        t = time_to_line(y, vy, decay, PITCH_MIN if vy < 0 else PITCH_MAX)
+        if t < best:
+            best, line = t, TOUCHLINE
+    return best, line
+
+
+def kick_ball(ball: Ball, target: np.ndarray, speed: float, loft: float = 0.0):
+    """
+    Send a free ball towards a target.
+
+    Args:
+        ball: The ball (possession should already be cleared)
+        target: Pitch position to aim at
+        speed: Horizontal launch speed
+        loft: Initial vertical speed in m/s (0 for a ground pass)
+    """
+    direction = np.asarray(target, dtype=float) - ball.position
+    norm = np.linalg.norm(direction)
+    if norm > 0:
+        ball.velocity = direction / norm * speed
+    else:
+        ball.velocity = np.array([0.0, 0.0])
+    ball.vertical_velocity = float(loft)
+    ball.speed = float(speed) if norm > 0 else 0.0
+    ball.physical_state = _physical_state(ball)
+
+
+def _physical_state(ball: Ball) -> PhysicalState:
+    """Physical state implied by the ball's height and motion"""
+    if ball.height > 0.0 or ball.vertical_velocity > 0.0:
+        if ball.height < LOW_BALL_HEIGHT:
+            return PhysicalState.IN_AIR_LOW
+        if ball.height < MEDIUM_BALL_HEIGHT:
+            return PhysicalState.IN_AIR_MEDIUM
+        return PhysicalState.IN_AIR_HIGH
+    if ball.speed > 0.0:
+        return PhysicalState.MOVING
+    return PhysicalState.STATIONARY
+
+
+def flight_segments(position: np.ndarray, velocity: np.ndarray, height: float,
+                    vertical_velocity: float, horizon: float):
+    """
+    Split the free flight of a ball into analytically solved segments.
+
+    Segments end at physical events (landing/bounce, coming to rest,
+    leaving the pitch) or at the horizon. Nothing is yielded for a ball at
+    rest on the ground, and iteration stops after a boundary crossing.
+
+    Args:
+        position: Starting position
+        velocity: Starting horizontal velocity
+        height: Starting height in meters
+        vertical_velocity: Starting vertical speed in m/s
+        horizon: Time to cover in seconds
+
+    Yields:
+        Tuples of (start_time, duration, start_state, decay, airborne, event, end_state)
+        where states are (position, velocity, height, vertical_velocity), event is
+        None (horizon reached), 'land', 'stop' or a boundary line, and end_state
+        already includes the effect of the event (bounce, stop, clamp to the line)
+    """
+    state = (position, velocity, height, vertical_velocity)
+    elapsed = 0.0
+
+    for _ in range(MAX_SEGMENTS):
+        remaining = horizon - elapsed
+        if remaining <= 0.0:
+            return
+        position, velocity, height, vertical_velocity = state
+        airborne = height > 0.0 or vertical_velocity > 0.0
+        speed = math.hypot(velocity[0], velocity[1])
+        if not airborne and speed == 0.0:
+            return
+
+        decay = AIR_DECAY if airborne else GROUND_DECAY
+        step, event = remaining, None
+        if airborne:
+            t_land = landing_time(height, vertical_velocity)
+            if t_land <= step:
+                step, event = t_land, 'land'
+        else:
+            t_stop = time_to_stop(speed, decay)
+            if t_stop <= step:
+                step, event = t_stop, 'stop'
+        t_cross, line = _boundary_time(position, velocity, decay)
+        if t_cross <= step:
+            step, event = t_cross, line
+
+        # Exact motion over this segment
+        end_position = position + travel(velocity, decay, step)
+        end_velocity = velocity * math.exp(-decay * step)
+        end_height, end_vertical = height, vertical_velocity
+        if airborne:
+            end_height = max(0.0, height + vertical_velocity * step - 0.5 * GRAVITY * step * step)
+            end_vertical = vertical_velocity - GRAVITY * step
+
+        if event == 'land':
+            end_height = 0.0
+            impact = abs(end_vertical)
+            end_vertical = impact * BOUNCE_RESTITUTION if impact >= MIN_BOUNCE_SPEED else 0.0
+        elif event == 'stop':
+            end_velocity = np.array([0.0, 0.0])
+        elif event is not None:
+            end_position = np.clip(end_position, PITCH_MIN, PITCH_MAX)
+
+        end_state = (end_position, end_velocity, end_height, end_vertical)
+        yield elapsed, step, state, decay, airborne, event, end_state
+
+        elapsed += step
+        state = end_state
+        if event not in (None, 'land', 'stop'):
+            return
+
+
+def advance_ball(ball: Ball, dt: float) -> Optional[BoundaryCrossing]:
+    """
+    Advance a free ball by dt seconds using the closed-form motion.
+
+    The interval is split only at physical events (landing, bounce, coming
+    to rest, leaving the pitch) and each piece is solved exactly, so the
+    result does not depend on the simulator's time step. A ball at rest on
+    the ground costs nothing.
+
+    Args:
+        ball: The ball to move (must not be in possession)
+        dt: Time to advance in seconds
+
+    Returns:
+        The boundary crossing if the ball left the pitch (the ball is left
+        on the line at that instant), otherwise None
+    """
+    crossing = None
+    segment = None
+    for segment in flight_segments(ball.position, ball.velocity, ball.height,
+                                   ball.vertical_velocity, dt):
+        start, step, _, _, _, event, end_state = segment
+        if event not in (None, 'land', 'stop'):
+            crossing = BoundaryCrossing(start + step, end_state[0].copy(), end_state[2], event)
+
+    if segment is not None:
+        position, velocity, height, vertical_velocity = segment[-1]
+        ball.position = position
+        ball.velocity = velocity
+        ball.height = height
+        ball.vertical_velocity = vertical_velocity
+    ball.speed = float(np.linalg.norm(ball.velocity))
+    ball.physical_state = _physical_state(ball)
+    return crossing
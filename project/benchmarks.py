@@ -0,0 +1,416 @@
+# seeded benchmark suite with JSON results and baseline comparison
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from states import Match
+from gamesim import SimpleMatchSimulator, create_sample_match
+from predict import ActionOutcomePredictor
+from descmodel import FeatureExtractor
+from montecarlo import AdaptiveMonteCarlo, Fixture
+from memory import ensemble_memory
+
+FORMAT_NAME = 'ucl-sim benchmarks'
+FORMAT_VERSION = 1
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'data')
+TOLERANCE = 0.10  # Relative slowdown flagged as a regression
+
+
+def _metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    return {'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def _best_of(function: Callable, repeats: int) -> float:
+    """Fastest wall-clock seconds of several calls (least disturbed by other load)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _seeded_match(seed: int, factory: Callable = create_sample_match) -> Match:
+    """Build a match with the random module seeded, so every run sees the same squads"""
+    random.seed(seed)
+    return factory()
+
+
+def _match_in_play(seed: int, seconds: int = 300) -> Match:
+    """A match played for a while from a seeded kickoff, for benchmarks needing a live state"""
+    match = _seeded_match(seed)
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    simulator.reset(seed)
+    simulator.run(until=seconds)
+    return match
+
+
+# ---- Benchmarks ----
+# Each takes the suite seed and its own sizes and returns metric name -> metric
+
+def bench_ticks(seed: int, ticks: int = 600, repeats: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Cost of one SimpleMatchSimulator tick over the opening minutes.
+
+    Args:
+        seed: Workload seed
+        ticks: Seconds of play per run
+        repeats: Runs, of which the fastest counts
+
+    Returns:
+        Seconds per tick
+    """
+    simulator = SimpleMatchSimulator(_seeded_match(seed), verbose=False)
+
+    def play():
+        simulator.reset(seed)
+        simulator.run(until=ticks)
+
+    return {'tick_seconds': _metric(_best_of(play, repeats) / ticks, 's', False)}
+
+
+def bench_full_match(seed: int, matches: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Wall time of complete matches, kickoff to full time.
+
+    Args:
+        seed: Workload seed (match i replays seed + i)
+        matches: Matches to play
+
+    Returns:
+        Median seconds per match
+    """
+    simulator = SimpleMatchSimulator(_seeded_match(seed), verbose=False)
+    times = []
+    for i in range(matches):
+        simulator.reset(seed + i)
+        start = time.perf_counter()
+        simulator.run()
+        times.append(time.perf_counter() - start)
+    return {'match_seconds': _metric(statistics.median(times), 's', False)}
+
+
+def bench_predictor(seed: int, calls: int = 20000, repeats: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    ActionOutcomePredictor throughput for each predict_* method.
+
+    Calls cycle through every player on the pitch of a match in play, with
+    the nearest teammate as pass target and nearest opponent as tackle
+    target.
+
+    Args:
+        seed: Workload seed
+        calls: Calls per method and run
+        repeats: Runs, of which the fastest counts
+
+    Returns:
+        Calls per second for each method
+    """
+    match = _match_in_play(seed)
+    geometry = match.geometry
+    players = [p for team in (match.home_team, match.away_team) for p in team.lineup]
+    teammates = [geometry.nearest_teammate(p)[0] for p in players]
+    opponents = [geometry.nearest_opponent(p)[0] for p in players]
+    predictor = ActionOutcomePredictor()
+    predictor.rng = random.Random(seed)
+    n = len(players)
+
+    methods = {
+        'pass': lambda i: predictor.predict_pass_outcome(players[i % n], teammates[i % n], match),
+        'shot': lambda i: predictor.predict_shot_outcome(players[i % n], match),
+        'dribble': lambda i: predictor.predict_dribble_outcome(players[i % n], match),
+        'tackle': lambda i: predictor.predict_tackle_outcome(players[i % n], opponents[i % n], match),
+    }
+    results = {}
+    for name, call in methods.items():
+        seconds = _best_of(lambda: [call(i) for i in range(calls)], repeats)
+        results[f'predict_{name}_per_second'] = _metric(calls / seconds, 'calls/s', True)
+    return results
+
+
+def bench_features(seed: int, ticks: int = 200, repeats: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    FeatureExtractor throughput over all 22 players per tick.
+
+    Geometry is invalidated before every tick so its rebuild is part of
+    the cost, as in a running match.
+
+    Args:
+        seed: Workload seed
+        ticks: Ticks per run
+        repeats: Runs, of which the fastest counts
+
+    Returns:
+        Players featurised per second
+    """
+    match = _match_in_play(seed)
+    players = [p for team in (match.home_team, match.away_team) for p in team.lineup]
+    extractor = FeatureExtractor()
+
+    def extract():
+        for _ in range(ticks):
+            match.invalidate_geometry()
+            for player in players:
+                extractor.extract_player_features(player)
+                extractor.extract_spatial_features(player, match)
+                extractor.extract_tactical_features(player, match)
+                extractor.extract_temporal_features(player, match, [])
+
+    seconds = _best_of(extract, repeats)
+    return {'features_per_second': _metric(ticks * len(players) / seconds, 'players/s', True)}
+
+
+def bench_data_load(seed: int, data_dir: str = DATA_DIR, repeats: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Load time of the player statistics CSVs.
+
+    Args:
+        seed: Workload seed (unused; the files are fixed)
+        data_dir: Directory of the scraped CSV files
+        repeats: Runs, of which the fastest counts
+
+    Returns:
+        Seconds to load every file and rows per second (empty if no files)
+    """
+    paths = sorted(os.path.join(data_dir, name) for name in os.listdir(data_dir)
+                   if name.endswith('.csv') and not name.startswith('.')) if os.path.isdir(data_dir) else []
+    if not paths:
+        return {}
+    rows = [0]
+
+    def load():
+        rows[0] = 0
+        for path in paths:
+            with open(path, newline='', encoding='utf-8') as handle:
+                rows[0] += sum(1 for _ in csv.DictReader(handle))
+
+    seconds = _best_of(load, repeats)
+    return {
+        'csv_load_seconds': _metric(seconds, 's', False),
+        'csv_rows_per_second': _metric(rows[0] / seconds, 'rows/s', True),
+    }
+
+
+def bench_montecarlo(seed: int, max_workers: int = 1, matches_per_worker: int = 2,
+                     engine: str = 'simulation') -> Dict[str, Dict[str, Any]]:
+    """
+    AdaptiveMonteCarlo throughput with 1..max_workers worker processes.
+
+    Sampling is forced to a fixed number of matches (no early stopping)
+    and includes pool warm-up.
+
+    Args:
+        seed: Workload seed
+        max_workers: Largest pool size measured
+        matches_per_worker: Matches played per worker at each pool size
+        engine: Monte Carlo engine to measure
+
+    Returns:
+        Matches per second at each pool size
+    """
+    results = {}
+    for workers in range(1, max_workers + 1):
+        n = workers * matches_per_worker
+        fixture = Fixture('benchmark', create_sample_match, engine)
+        with AdaptiveMonteCarlo(workers=workers, batch_size=1, min_samples=n, max_samples=n,
+                                target_half_width=0.0, seed=seed) as sampler:
+            start = time.perf_counter()
+            sampler.run([fixture])
+            seconds = time.perf_counter() - start
+        results[f'montecarlo_{engine}_{workers}_workers_matches_per_second'] = \
+            _metric(len(fixture.results) / seconds, 'matches/s', True)
+    return results
+
+
+def bench_memory(seed: int, matches: int = 2, seconds: Optional[float] = 600) -> Dict[str, Dict[str, Any]]:
+    """
+    Memory per played match with several held at once (see memory.ensemble_memory).
+
+    Args:
+        seed: Workload seed
+        matches: Matches held at once
+        seconds: Match seconds played each (None for full matches, several
+                 times slower under tracemalloc)
+
+    Returns:
+        Traced and accounted bytes per match, event store bytes per match
+        and the peak while playing
+    """
+    report = ensemble_memory(create_sample_match, matches, seconds, seed)
+    return {
+        'memory_traced_bytes_per_match': _metric(report['traced_bytes_per_match'], 'B', False),
+        'memory_accounted_bytes_per_match': _metric(report['categories']['total'], 'B', False),
+        'memory_event_store_bytes_per_match': _metric(report['categories']['event_store'], 'B', False),
+        'memory_peak_bytes': _metric(report['peak_bytes'], 'B', False),
+    }
+
+
+BENCHMARKS = {
+    'ticks': bench_ticks,
+    'full_match': bench_full_match,
+    'predictor': bench_predictor,
+    'features': bench_features,
+    'data_load': bench_data_load,
+    'montecarlo': bench_montecarlo,
+    'memory': bench_memory,
+}
+
+
+# ---- Suite, storage and comparison ----
+
+def environment() -> Dict[str, Any]:
+    """Machine and library versions the results were taken on"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_suite(names: Optional[List[str]] = None, seed: int = 0,
+              options: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Run benchmarks and collect their metrics.
+
+    The caller's random state is left untouched.
+
+    Args:
+        names: Benchmarks to run (keys of BENCHMARKS; all if None)
+        seed: Seed for every workload
+        options: Per-benchmark keyword arguments, e.g. {'montecarlo': {'max_workers': 4}}
+
+    Returns:
+        Results document: format, creation time, environment, seed, seconds
+        per benchmark and the metrics
+    """
+    names = list(BENCHMARKS) if names is None else names
+    options = options or {}
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    saved_state = random.getstate()
+    metrics, durations = {}, {}
+    try:
+        for name in names:
+            start = time.perf_counter()
+            metrics.update(BENCHMARKS[name](seed, **options.get(name, {})))
+            durations[name] = time.perf_counter() - start
+    finally:
+        random.setstate(saved_state)
+
+    return {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'seed': seed,
+        'options': options,
+        'durations': durations,
+        'metrics': metrics,
+    }
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Write a results document as JSON"""
+    with open(path, 'w') as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    Read a results document.
+
+    Args:
+        path: JSON file written by save_results
+
+    Returns:
+        The results document
+    """
+    with open(path) as handle:
+        results = json.load(handle)
+    if results.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} is not a benchmark results file")
+    if results.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark results version: {results.get('version')}")
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Compare metrics present in both runs.
+
+    Args:
+        current: Results document of the new run
+        baseline: Results document to compare against
+        tolerance: Relative change in the bad direction that counts as a regression
+
+    Returns:
+        One row per shared metric with both values, the ratio current / baseline,
+        the improvement factor (above 1 is better) and whether it regressed
+    """
+    rows = []
+    for name, metric in sorted(current['metrics'].items()):
+        base = baseline['metrics'].get(name)
+        if base is None or base['value'] == 0 or metric['value'] == 0:
+            continue
+        ratio = metric['value'] / base['value']
+        improvement = ratio if metric['higher_is_better'] else 1.0 / ratio
+        rows.append({
+            'metric': name,
+            'unit': metric['unit'],
+            'baseline': base['value'],
+            'current': metric['value'],
+            'ratio': ratio,
+            'improvement': improvement,
+            'regression': improvement < 1.0 - tolerance,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ucl-sim benchmark suite")
+    parser.add_argument('benchmarks', nargs='*', help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1, help="largest Monte Carlo pool size")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare with this results file; exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--memory-budget', type=float,
+                        help="bytes allowed per match in the memory benchmark; exit 1 if exceeded")
+    args = parser.parse_args()
+
+    results = run_suite(args.benchmarks or None, args.seed, {'montecarlo': {'max_workers': args.workers}})
+    for name, metric in sorted(results['metrics'].items()):
+        print(f"{name:48s} {metric['value']:14.6g} {metric['unit']}")
+    if args.output:
+        save_results(results, args.output)
+
+    failed = False
+    if args.memory_budget is not None:
+        for name in ('memory_traced_bytes_per_match', 'memory_accounted_bytes_per_match'):
+            metric = results['metrics'].get(name)
+            if metric is not None and metric['value'] > args.memory_budget:
+                print(f"{name} {metric['value']:.0f} B exceeds the budget of {args.memory_budget:.0f} B")
+                failed = True
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.tolerance)
+        print()
+        for row in rows:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['metric']:48s} {row['improvement']:6.2f}x{flag}")
+        failed = failed or any(row['regression'] for row in rows)
+    sys.exit(1 if failed else 0)
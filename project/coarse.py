@@ -0,0 +1,431 @@
+# coarse possession-chain match engine over pitch zones
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from states import Match, MatchPeriod, Player, PlayerAction, PlayingPosition, FieldZone
+from zones import THIRD_LINES, PENALTY_AREA_DEPTH, PENALTY_AREA_Y
+from predict import ActionOutcomePredictor
+from memory import cached
+
+# Zones of the chain, seen from the team in possession's attacking direction
+ZONES = (FieldZone.DEFENSIVE_THIRD, FieldZone.MIDDLE_THIRD, FieldZone.ATTACKING_THIRD,
+         FieldZone.PENALTY_AREA)
+DEFENSIVE, MIDDLE, ATTACKING, BOX = range(len(ZONES))
+
+# Outcomes of one on-ball action
+ACTION_OUTCOMES = ('advance', 'hold', 'turnover', 'goal', 'miss')
+ADVANCE, HOLD, TURNOVER, GOAL, MISS = range(len(ACTION_OUTCOMES))
+
+ACTION_SECONDS = 6.0  # Match time per on-ball action
+MATCH_SECONDS = 90 * 60
+
+# Pressure on the ball carrier in each zone (0-1), before the opponent's pressing
+ZONE_PRESSURE = (0.2, 0.35, 0.5, 0.7)
+# Typical pass lengths (short, through) and shot distance / angle from each zone
+SHORT_PASS_DISTANCE = 12.0
+THROUGH_PASS_DISTANCE = 25.0
+SHOT_DISTANCE = (None, None, 25.0, 11.0)
+SHOT_ANGLE = (None, None, 30.0, 20.0)
+# Shot volume and conversion, fitted by fit_chain to the full engine's goals on
+# the reference fixtures. The fit overrides the predictor's shot conversion rather
+# than deriving it: the full engine takes far more, mostly speculative, shots than
+# the chain has on-ball actions, so the chain matches its goals by making 40% of
+# attacking-third actions shots and scaling the predictor's goal odds by about
+# 5.0 for the home side and 3.5 for the away side (the full engine's home side
+# scores more). The predictor still sets how conversion varies with player
+# attributes.
+LONG_SHOT_SHARE = 0.4  # Share of actions in the attacking third that are shots
+SHOT_ODDS = (5.03, 3.46)  # Scale on the odds of a shot becoming a goal, home and away
+
+SHORT_PASS_ADVANCE = 0.35  # Completed short passes that reach the next zone
+DRIBBLE_ADVANCE = 0.25  # Successful dribbles that reach the next zone
+INTERCEPT_RATE = 0.15  # Completed passes read by a defender, at defending 100 (doubled for through balls)
+
+# Where the ball goes after each outcome: zone for the team that has it next
+# (after a turnover the zone is seen from the new team's direction)
+_NEXT_ZONE = np.array([
+    # advance, hold, turnover, goal, miss
+    [MIDDLE, DEFENSIVE, ATTACKING, MIDDLE, DEFENSIVE],
+    [ATTACKING, MIDDLE, MIDDLE, MIDDLE, DEFENSIVE],
+    [BOX, ATTACKING, DEFENSIVE, MIDDLE, DEFENSIVE],
+    [BOX, BOX, DEFENSIVE, MIDDLE, DEFENSIVE],
+])
+# Outcomes that hand the ball to the other team, and those that score
+_SWITCHES = np.array([False, False, True, True, True])
+_SCORES = np.array([False, False, False, True, False])
+
+
+def _average_player(players: List[Player], team) -> Player:
+    """Stand-in player whose attributes and stamina are the averages of a group"""
+    average = Player('average', 'Average player', PlayingPosition.CM, team)
+    if players:
+        average.attributes.array[:] = np.mean([p.attributes.array for p in players], axis=0)
+        average.current_stamina = float(np.mean([p.current_stamina for p in players]))
+    return average
+
+
+def transition_table(match: Match, predictor: Optional[ActionOutcomePredictor] = None,
+                     long_shot_share: float = LONG_SHOT_SHARE,
+                     shot_odds: Tuple[float, float] = SHOT_ODDS) -> np.ndarray:
+    """
+    Outcome probabilities of an on-ball action for each team and zone.
+
+    Uses the predictor's success probabilities for passes, dribbles, shots
+    and saves, applied to an average outfield player of the team in
+    possession and the opposing goalkeeper, with the team's tempo and
+    directness splitting actions between passes, through balls and
+    dribbles, and the opponent's pressing raising pressure.
+
+    Args:
+        match: The fixture (current lineups and tactics are read)
+        predictor: Source of success probabilities (a default one if None)
+        long_shot_share: Share of attacking-third actions that are shots
+        shot_odds: Scale on the odds of a shot becoming a goal, home and away
+
+    Returns:
+        Array of shape (2, zones, outcomes) indexed [home/away, zone, outcome]
+    """
+    predictor = predictor if predictor is not None else ActionOutcomePredictor()
+    teams = (match.home_team, match.away_team)
+    table = np.zeros((2, len(ZONES), len(ACTION_OUTCOMES)))
+
+    for side, team in enumerate(teams):
+        opponent = teams[1 - side]
+        outfield = [p for p in team.lineup if p.assigned_position != PlayingPosition.GK]
+        carrier = _average_player(outfield, team)
+        defenders = [p for p in opponent.lineup if p.assigned_position != PlayingPosition.GK]
+        defending = np.mean([p.attributes['defending'] for p in defenders]) / 100.0 if defenders else 0.7
+        keeper = next((p for p in opponent.lineup if p.assigned_position == PlayingPosition.GK), None)
+
+        pass_share = 0.3 + 0.4 * team.tactics.get('tempo', 60) / 100.0
+        through_share = team.tactics.get('passing_directness', 50) / 100.0
+        pressing = opponent.tactics.get('pressing_intensity', 70) / 100.0
+
+        for zone in range(len(ZONES)):
+            pressure = min(1.0, ZONE_PRESSURE[zone] * (0.5 + pressing))
+            row = table[side, zone]
+
+            if zone == BOX:
+                shot_share = 1.0
+            elif zone == ATTACKING:
+                shot_share = long_shot_share
+            else:
+                shot_share = 0.0
+
+            if shot_share:
+                context = {'distance': SHOT_DISTANCE[zone], 'angle': SHOT_ANGLE[zone], 'pressure': pressure}
+                on_target = predictor.success_probability(PlayerAction.SHOOT, carrier, context)
+                if keeper is not None:
+                    save_context = {'distance': SHOT_DISTANCE[zone], 'angle': SHOT_ANGLE[zone]}
+                    saved = predictor.success_probability(PlayerAction.SAVE_SHOT, keeper, save_context)
+                else:
+                    saved = 0.0
+                goal = on_target * (1.0 - saved)
+                row[GOAL] += shot_share * goal
+                row[MISS] += shot_share * (1.0 - goal)
+
+            play_share = 1.0 - shot_share
+            if not play_share:
+                continue
+            for action, share, distance, advance, intercept in (
+                    (PlayerAction.PASS, pass_share * (1.0 - through_share), SHORT_PASS_DISTANCE,
+                     SHORT_PASS_ADVANCE, INTERCEPT_RATE * defending),
+                    (PlayerAction.THROUGH_PASS, pass_share * through_share, THROUGH_PASS_DISTANCE,
+                     1.0, 2.0 * INTERCEPT_RATE * defending),
+                    (PlayerAction.DRIBBLE, 1.0 - pass_share, None, DRIBBLE_ADVANCE, 0.0)):
+                context = {'pressure': pressure}
+                if distance is not None:
+                    context['distance'] = distance
+                success = predictor.success_probability(action, carrier, context) * (1.0 - intercept)
+                weight = play_share * share
+                row[ADVANCE] += weight * success * advance
+                row[HOLD] += weight * success * (1.0 - advance)
+                row[TURNOVER] += weight * (1.0 - success)
+
+    return scale_shot_odds(table / table.sum(axis=2, keepdims=True), shot_odds)
+
+
+def scale_shot_odds(table: np.ndarray, shot_odds: Tuple[float, float]) -> np.ndarray:
+    """
+    Rescale the odds of shots becoming goals, keeping the number of shots.
+
+    Args:
+        table: Transition table(s), shape (..., 2, zones, outcomes)
+        shot_odds: Scale on the odds for the home and away team
+
+    Returns:
+        A new table of the same shape
+    """
+    table = table.copy()
+    shots = table[..., GOAL] + table[..., MISS]
+    goal = np.divide(table[..., GOAL], shots, out=np.zeros_like(shots), where=shots > 0)
+    odds = np.asarray(shot_odds, dtype=float)[:, None] * goal
+    goal = odds / (1.0 - goal + odds)
+    table[..., GOAL] = shots * goal
+    table[..., MISS] = shots * (1.0 - goal)
+    return table
+
+
+def simulate_chains(table: np.ndarray, n: int, rng: np.random.Generator,
+                    actions: int = int(MATCH_SECONDS / ACTION_SECONDS), start_step: int = 0,
+                    start_goals: Tuple[int, int] = (0, 0), start_side: Optional[int] = None,
+                    start_zone: int = MIDDLE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Play many matches at once as possession chains.
+
+    By default every match starts with a kickoff by a random team and the
+    other team kicks off the second half; a start state (see chain_state)
+    continues matches already in progress instead. Each step is one
+    on-ball action whose outcome is drawn from the transition table, so
+    all matches advance together with a few array operations per step.
+
+    Args:
+        table: Output of transition_table
+        n: Number of matches
+        rng: NumPy random generator
+        actions: On-ball actions per match
+        start_step: Actions already played
+        start_goals: Home and away goals so far
+        start_side: Team in possession (0 home, 1 away), or None for a random kickoff
+        start_zone: Zone of the ball for the team in possession
+
+    Returns:
+        Tuple of (home goals, away goals) arrays of length n
+    """
+    cumulative = np.cumsum(table, axis=2)
+    cumulative[..., -1] = 1.0
+    goals = np.tile(np.asarray(start_goals, dtype=np.int64), (n, 1))
+    first_kickoff = rng.integers(0, 2, n)
+    side = first_kickoff.copy() if start_side is None else np.full(n, start_side)
+    zone = np.full(n, start_zone)
+    rows = np.arange(n)
+    uniforms = rng.random((actions - start_step, n))
+
+    for step in range(start_step, actions):
+        if step == actions // 2 and (step > start_step or start_side is None):
+            side = 1 - first_kickoff
+            zone[:] = MIDDLE
+        outcome = (uniforms[step - start_step][:, None] > cumulative[side, zone]).sum(axis=1)
+        goals[rows, side] += _SCORES[outcome]
+        zone = _NEXT_ZONE[zone, outcome]
+        side = np.where(_SWITCHES[outcome], 1 - side, side)
+    return goals[:, 0], goals[:, 1]
+
+
+def chain_state(match: Match) -> Dict[str, Any]:
+    """
+    Start state for simulate_chains matching a match in progress.
+
+    The ball's zone is read from its position along the possessing team's
+    attacking direction (home attacks towards x = 100). At half time, or
+    when nobody has the ball, the next kickoff is left to chance.
+
+    Args:
+        match: The live match
+
+    Returns:
+        Keyword arguments start_step, start_goals, start_side and start_zone
+    """
+    if match.period == MatchPeriod.HALFTIME:
+        elapsed = MATCH_SECONDS / 2
+    else:
+        elapsed = min(match.clock, MATCH_SECONDS)
+    state = {'start_step': int(elapsed / ACTION_SECONDS),
+             'start_goals': (match.home_team.goals_scored, match.away_team.goals_scored),
+             'start_side': None, 'start_zone': MIDDLE}
+    if match.team_in_possession is None or match.period == MatchPeriod.HALFTIME:
+        return state
+
+    side = 0 if match.team_in_possession is match.home_team else 1
+    x, y = match.ball.position
+    progress = x if side == 0 else 100.0 - x
+    if progress >= 100.0 - PENALTY_AREA_DEPTH and PENALTY_AREA_Y[0] <= y <= PENALTY_AREA_Y[1]:
+        zone = BOX
+    elif progress >= THIRD_LINES[1]:
+        zone = ATTACKING
+    elif progress >= THIRD_LINES[0]:
+        zone = MIDDLE
+    else:
+        zone = DEFENSIVE
+    state.update(start_side=side, start_zone=zone)
+    return state
+
+
+def expected_goals(table: np.ndarray, actions: int = int(MATCH_SECONDS / ACTION_SECONDS)) -> np.ndarray:
+    """
+    Exact expected goals of simulate_chains from kickoff.
+
+    Only the possession state's distribution is carried forward (not the
+    score), which makes this much cheaper than the full scoreline
+    distribution in markov.py.
+
+    Args:
+        table: Output of transition_table, or several stacked along a leading axis
+        actions: On-ball actions per match
+
+    Returns:
+        Array of (home, away) expected goals, with the same leading axes as table
+    """
+    n_zones = len(ZONES)
+    batch = table.shape[:-3]
+    moves = np.zeros(batch + (2 * n_zones, 2 * n_zones))
+    scoring = np.zeros(batch + (2 * n_zones, 2))
+    for side in range(2):
+        for zone in range(n_zones):
+            state = side * n_zones + zone
+            for outcome in range(len(ACTION_OUTCOMES)):
+                next_side = 1 - side if _SWITCHES[outcome] else side
+                moves[..., state, next_side * n_zones + _NEXT_ZONE[zone, outcome]] += table[..., side, zone, outcome]
+            scoring[..., state, side] = table[..., side, zone, GOAL]
+
+    # Second to last axis: which team kicked off the first half (even odds)
+    dist = np.zeros(batch + (2, 2 * n_zones))
+    dist[..., 0, MIDDLE] = dist[..., 1, n_zones + MIDDLE] = 0.5
+    occupancy = np.zeros(batch + (2 * n_zones,))
+    for step in range(actions):
+        if step == actions // 2:
+            halves = dist.sum(axis=-1)
+            dist[:] = 0.0
+            dist[..., 0, n_zones + MIDDLE], dist[..., 1, MIDDLE] = halves[..., 0], halves[..., 1]
+        occupancy += dist.sum(axis=-2)
+        dist = dist @ moves
+    return np.einsum('...s,...sk->...k', occupancy, scoring)
+
+
+def fit_chain(fixtures: Optional[List[Dict[str, Any]]] = None,
+              predictor: Optional[ActionOutcomePredictor] = None,
+              long_shot_shares: Tuple[float, ...] = tuple(np.linspace(0.0, 1.0, 11))) -> Dict[str, Any]:
+    """
+    Fit the shot volume and conversion to full-engine results.
+
+    For each candidate long-shot share, each side's shot odds are set by
+    bisection so that the chain's mean home and away goals equal the full
+    engine's over the reference fixtures; the share whose per-fixture
+    expected goals fit the observed means best (Poisson deviance) is kept.
+
+    Args:
+        fixtures: Reference fixtures (reference.load_reference() if None)
+        predictor: Source of success probabilities (a default one if None)
+        long_shot_shares: Candidate values of LONG_SHOT_SHARE
+
+    Returns:
+        Dictionary with the fitted long_shot_share and shot_odds, the
+        deviance and the mean home and away goals of both engines
+    """
+    # Imported here because reference builds on the full engine
+    from reference import load_reference, reference_match
+
+    fixtures = fixtures if fixtures is not None else load_reference()
+    matches = [reference_match(entry) for entry in fixtures]
+    observed = np.array([np.mean(entry['scores'], axis=0) for entry in fixtures])
+    target = observed.mean(axis=0)
+
+    best = None
+    for share in long_shot_shares:
+        base = np.array([transition_table(match, predictor, share, (1.0, 1.0)) for match in matches])
+        odds = [1.0, 1.0]
+        # The sides interact only through possession after a goal, so a few passes settle
+        for _ in range(3):
+            for side in range(2):
+                low, high = 0.0, 1.0
+
+                def side_goals(value: float) -> float:
+                    trial = list(odds)
+                    trial[side] = value
+                    return float(expected_goals(scale_shot_odds(base, trial))[:, side].mean())
+
+                while side_goals(high) < target[side]:
+                    low, high = high, 2.0 * high
+                for _ in range(30):
+                    if side_goals(0.5 * (low + high)) < target[side]:
+                        low = 0.5 * (low + high)
+                    else:
+                        high = 0.5 * (low + high)
+                odds[side] = 0.5 * (low + high)
+
+        goals = expected_goals(scale_shot_odds(base, odds))
+        deviance = 2.0 * float(np.sum(observed * np.log(np.maximum(observed, 1e-12) / goals) - (observed - goals)))
+        if best is None or deviance < best['deviance']:
+            best = {'long_shot_share': float(share), 'shot_odds': (float(odds[0]), float(odds[1])),
+                    'deviance': deviance, 'goals': tuple(float(g) for g in goals.mean(axis=0)),
+                    'reference_goals': tuple(float(g) for g in target)}
+    return best
+
+
+class CoarseMatchSimulator:
+    """
+    Possession-chain stand-in for SimpleMatchSimulator.
+
+    Instead of moving 22 players every second, a match is a chain of
+    on-ball actions, each moving the ball between zones, keeping it,
+    losing it or ending in a shot, with probabilities from the same
+    ActionOutcomePredictor. Only the final score is produced.
+    """
+
+    def __init__(self, match: Match, predictor: Optional[ActionOutcomePredictor] = None):
+        """
+        Initialize the coarse simulator.
+
+        Args:
+            match: The fixture to play
+            predictor: Source of success probabilities (a default one if None)
+        """
+        self.match = match
+        self.table = transition_table(match, predictor)
+
+    def simulate(self, n: int, seed: Optional[int] = None, resume: bool = False) -> List[Tuple[int, int]]:
+        """
+        Final scores of n independent matches (the match object is not changed).
+
+        Args:
+            n: Number of matches
+            seed: Seed for the chain draws (None for nondeterministic)
+            resume: Continue from the match's current clock, score and ball
+                    instead of kicking off
+
+        Returns:
+            List of (home_goals, away_goals)
+        """
+        state = chain_state(self.match) if resume else {}
+        home, away = simulate_chains(self.table, n, np.random.default_rng(seed), **state)
+        return list(zip(home.tolist(), away.tolist()))
+
+    def run(self, seed: Optional[int] = None):
+        """
+        Play the match once and record the final score on it.
+
+        Args:
+            seed: Seed for the chain draws (None draws one from the random module)
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        (home_goals, away_goals), = self.simulate(1, seed)
+        self.match.home_team.goals_scored = home_goals
+        self.match.home_team.goals_conceded = away_goals
+        self.match.away_team.goals_scored = away_goals
+        self.match.away_team.goals_conceded = home_goals
+        self.match.clock = float(MATCH_SECONDS)
+        self.match.period = MatchPeriod.FULLTIME
+
+
+# Transition tables built inside this process, keyed by factory (most recent few)
+_fixture_tables = {}
+
+
+def coarse_fixture(factory: Callable, seeds: List[int]) -> List[Tuple[int, int]]:
+    """
+    Play one coarse match per seed (same signature as montecarlo.simulate_fixture).
+
+    The whole batch is drawn together from one generator seeded by all the
+    seeds, so a batch is reproducible from its seeds.
+
+    Args:
+        factory: Callable returning the fixture's Match
+        seeds: One seed per match
+
+    Returns:
+        List of (home_goals, away_goals) final scores
+    """
+    table = cached(_fixture_tables, factory, lambda: transition_table(factory()))
+    home, away = simulate_chains(table, len(seeds), np.random.default_rng(list(seeds)))
+    return list(zip(home.tolist(), away.tolist()))
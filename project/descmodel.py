@@ -1,4 +1,5 @@
 # AI and ML to decide decisions duriing matches
+import random
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from states import (
@@ -19,6 +20,7 @@ class PlayerDecisionModel:
         self.model = None
         self.feature_scaler = None
         self.action_mapping = None  # Maps from model output to PlayerAction enum
+        self.rng = random  # Random source for the placeholder's choices
     
     def predict_action(self, player: Player, match: Match) -> PlayerAction:
         """
@@ -94,7 +96,14 @@ class PlayerDecisionModel:
         """
         # Just return some reasonable default based on context
         if player.has_ball:
-            return PlayerAction.PASS
+            geometry = match.geometry
+            goal_distance = geometry.goal_distance(player, geometry.attacking_goal(player))
+
+            # Shoot when in range, otherwise pass more often at a higher tempo
+            if goal_distance < 25.0:
+                return PlayerAction.SHOOT
+            pass_chance = 0.3 + 0.4 * player.team.tactics.get('tempo', 60) / 100.0
+            return PlayerAction.PASS if self.rng.random() < pass_chance else PlayerAction.DRIBBLE
         elif player.team.possession:
             return PlayerAction.PROVIDE_SUPPORT
         else:
@@ -219,8 +228,20 @@ class FeatureExtractor:
         Returns:
             Dictionary of spatial features
         """
-        # Calculate distances, angles, spatial relationships
-        return {}
+        # Distances and angles come from the match's shared per-tick geometry
+        geometry = match.geometry
+        goal = geometry.attacking_goal(player)
+        _, teammate_dist = geometry.nearest_teammate(player)
+        _, opponent_dist = geometry.nearest_opponent(player)
+
+        return {
+            'open_space': match.pitch_control.open_space(player),
+            'distance_to_ball': geometry.distance_to_ball(player),
+            'distance_to_goal': geometry.goal_distance(player, goal),
+            'angle_to_goal': geometry.goal_angle(player, goal),
+            'nearest_teammate_dist': teammate_dist,
+            'nearest_opponent_dist': opponent_dist
+        }
     
     def extract_tactical_features(self, player: Player, match: Match) -> Dict[str, float]:
         """
@@ -0,0 +1,205 @@
+# formation templates and vectorized team shape
+import numpy as np
+from typing import Dict, Tuple
+from states import Formation, PlayingPosition
+
+P = PlayingPosition
+
+# Roles for the eleven formation slots, goalkeeper first, then back to front
+# and left to right (facing the opponent's goal)
+FORMATION_ROLES: Dict[Formation, Tuple[PlayingPosition, ...]] = {
+    Formation.F_4_4_2: (P.GK, P.LB, P.CB, P.CB, P.RB, P.LM, P.CM, P.CM, P.RM, P.ST, P.ST),
+    Formation.F_4_3_3: (P.GK, P.LB, P.CB, P.CB, P.RB, P.CM, P.CDM, P.CM, P.LW, P.ST, P.RW),
+    Formation.F_4_2_3_1: (P.GK, P.LB, P.CB, P.CB, P.RB, P.CDM, P.CDM, P.LM, P.CAM, P.RM, P.ST),
+    Formation.F_3_5_2: (P.GK, P.CB, P.CB, P.CB, P.LM, P.CM, P.CDM, P.CM, P.RM, P.ST, P.ST),
+    Formation.F_5_3_2: (P.GK, P.LB, P.CB, P.CB, P.CB, P.RB, P.CM, P.CDM, P.CM, P.ST, P.ST),
+    Formation.F_4_5_1: (P.GK, P.LB, P.CB, P.CB, P.RB, P.LM, P.CM, P.CDM, P.CM, P.RM, P.ST),
+    Formation.F_3_4_3: (P.GK, P.CB, P.CB, P.CB, P.LM, P.CM, P.CM, P.RM, P.LW, P.ST, P.RW),
+}
+
+# Anchor positions for a mid block with the ball on the centre spot, in the
+# frame of a team attacking towards x = 100 (left is high y)
+FORMATION_ANCHORS: Dict[Formation, np.ndarray] = {
+    Formation.F_4_4_2: np.array([
+        [5, 50],
+        [25, 85], [22, 62], [22, 38], [25, 15],
+        [45, 85], [42, 62], [42, 38], [45, 15],
+        [62, 60], [62, 40]], dtype=float),
+    Formation.F_4_3_3: np.array([
+        [5, 50],
+        [25, 85], [22, 62], [22, 38], [25, 15],
+        [45, 68], [38, 50], [45, 32],
+        [65, 82], [68, 50], [65, 18]], dtype=float),
+    Formation.F_4_2_3_1: np.array([
+        [5, 50],
+        [25, 85], [22, 62], [22, 38], [25, 15],
+        [38, 60], [38, 40],
+        [55, 82], [56, 50], [55, 18],
+        [68, 50]], dtype=float),
+    Formation.F_3_5_2: np.array([
+        [5, 50],
+        [22, 70], [20, 50], [22, 30],
+        [48, 90], [45, 65], [38, 50], [45, 35], [48, 10],
+        [64, 60], [64, 40]], dtype=float),
+    Formation.F_5_3_2: np.array([
+        [5, 50],
+        [30, 90], [20, 68], [18, 50], [20, 32], [30, 10],
+        [43, 70], [38, 50], [43, 30],
+        [62, 60], [62, 40]], dtype=float),
+    Formation.F_4_5_1: np.array([
+        [5, 50],
+        [25, 85], [22, 62], [22, 38], [25, 15],
+        [48, 88], [46, 66], [38, 50], [46, 34], [48, 12],
+        [65, 50]], dtype=float),
+    Formation.F_3_4_3: np.array([
+        [5, 50],
+        [22, 70], [20, 50], [22, 30],
+        [45, 88], [42, 60], [42, 40], [45, 12],
+        [65, 80], [68, 50], [65, 20]], dtype=float),
+}
+
+# How strongly each slot follows the ball (the goalkeeper barely moves)
+SLOT_MOBILITY = np.array([0.15] + [1.0] * 10)
+
+BALL_FOLLOW_X = 0.5  # Block shift per unit of ball movement up/down the pitch
+BALL_FOLLOW_Y = 0.3  # Sideways shift towards the ball
+LINE_HEIGHT_SHIFT = 0.3  # Shift per point of defensive_line_height away from 50
+POSSESSION_PUSH = 8.0  # Extra push up the pitch while in possession
+MIN_WIDTH_SCALE = 0.6  # Spread of the shape at width 0 (1.0 is the template spread)
+MAX_WIDTH_SCALE = 1.3  # Spread at width 100
+
+# Targets stay this far inside the pitch
+PITCH_MARGIN = 1.0
+
+
+# Anchors of both sides on the pitch (away rotated half a turn), per formation pair
+_pitch_anchors = {}
+
+
+def pitch_anchors(home_formation: Formation, away_formation: Formation) -> np.ndarray:
+    """
+    Both teams' anchors on the pitch, shape (2, 11, 2), built once per formation pair.
+
+    Args:
+        home_formation: Formation of the team attacking towards x = 100
+        away_formation: Formation of the team attacking towards x = 0
+
+    Returns:
+        Read-only anchor array (home slots then away slots)
+    """
+    key = (home_formation, away_formation)
+    anchors = _pitch_anchors.get(key)
+    if anchors is None:
+        anchors = np.stack((FORMATION_ANCHORS[home_formation],
+                            100.0 - FORMATION_ANCHORS[away_formation]))
+        anchors.flags.writeable = False
+        _pitch_anchors[key] = anchors
+    return anchors
+
+
+def block_shift(ball_x: float, line_height: float, in_possession: bool) -> float:
+    """
+    How far a team's block moves up the pitch from its anchors.
+
+    Args:
+        ball_x: Ball position along the team's attacking direction (0-100)
+        line_height: defensive_line_height tactic (0-100)
+        in_possession: Whether the team has the ball
+
+    Returns:
+        Forward shift in pitch units (negative drops deeper)
+    """
+    return (BALL_FOLLOW_X * (ball_x - 50.0) + LINE_HEIGHT_SHIFT * (line_height - 50.0) +
+            (POSSESSION_PUSH if in_possession else 0.0))
+
+
+def width_scale(width: float) -> float:
+    """Spread of the shape relative to the template for a width tactic (0-100)"""
+    return MIN_WIDTH_SCALE + (MAX_WIDTH_SCALE - MIN_WIDTH_SCALE) * width / 100.0
+
+
+def team_shapes(anchors: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """
+    Shift and scale formation anchors for several teams in one array expression.
+
+    Args:
+        anchors: Anchors on the pitch, shape (k, 11, 2)
+        params: Per team (shift_x, shift_y, width_scale) in pitch coordinates, shape (k, 3)
+
+    Returns:
+        Target positions, shape (k, 11, 2)
+    """
+    shapes = np.empty(anchors.shape)
+    shapes[..., 0] = anchors[..., 0] + SLOT_MOBILITY * params[:, 0:1]
+    shapes[..., 1] = 50.0 + (anchors[..., 1] - 50.0) * params[:, 2:3] + SLOT_MOBILITY * params[:, 1:2]
+    np.maximum(shapes, PITCH_MARGIN, out=shapes)
+    return np.minimum(shapes, 100.0 - PITCH_MARGIN, out=shapes)
+
+
+def match_shapes(match) -> np.ndarray:
+    """
+    Formation targets for both teams given the current ball position and tactics.
+
+    Args:
+        match: The current match state
+
+    Returns:
+        Target positions on the pitch, shape (2, 11, 2): home slots then away slots
+    """
+    home, away = match.home_team, match.away_team
+    ball_x, ball_y = match.ball.position.tolist()
+    shift_y = BALL_FOLLOW_Y * (ball_y - 50.0)
+
+    # The away team attacks towards x = 0, so its forward shift is negative on the pitch
+    params = np.array([
+        [block_shift(ball_x, home.tactics['defensive_line_height'], home.possession),
+         shift_y, width_scale(home.tactics['width'])],
+        [-block_shift(100.0 - ball_x, away.tactics['defensive_line_height'], away.possession),
+         shift_y, width_scale(away.tactics['width'])]
+    ])
+    return team_shapes(pitch_anchors(home.formation, away.formation), params)
+
+
+def update_formation_positions(match) -> np.ndarray:
+    """
+    Recompute both teams' shape and store each lineup player's slot target.
+
+    Lineup order gives the formation slot, so player i of a lineup takes
+    FORMATION_ROLES[formation][i].
+
+    Args:
+        match: The current match state
+
+    Returns:
+        The (2, 11, 2) target array; players' formation_position are views into it
+    """
+    shapes = match_shapes(match)
+    for team_shape, team in zip(shapes, (match.home_team, match.away_team)):
+        for player, target in zip(team.lineup, team_shape):
+            player.formation_position = target
+    return shapes
+
+
+def kickoff_shape(formation: Formation, tactics: Dict, attacking_right: bool = True) -> np.ndarray:
+    """
+    Formation positions for a kickoff, kept inside the team's own half.
+
+    Args:
+        formation: The team's formation
+        tactics: The team's tactics dictionary
+        attacking_right: True if the team attacks towards x = 100
+
+    Returns:
+        Positions on the pitch, shape (11, 2)
+    """
+    anchors = FORMATION_ANCHORS[formation]
+    shift = block_shift(50.0, tactics['defensive_line_height'], False)
+    if not attacking_right:
+        anchors, shift = 100.0 - anchors, -shift
+    params = np.array([[shift, 0.0, width_scale(tactics['width'])]])
+    shape = team_shapes(anchors[None], params)[0]
+    if attacking_right:
+        shape[:, 0] = np.minimum(shape[:, 0], 49.0)
+    else:
+        shape[:, 0] = np.maximum(shape[:, 0], 51.0)
+    return shape
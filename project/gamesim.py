@@ -2,65 +2,161 @@
 import simpy
 import random
 import numpy as np
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from states import (
     Player, Team, Match, Ball, 
     PlayerAction, TeamPhase, MatchPeriod, GamePhase,
     PhysicalState, BallAction
 )
+from ballphysics import (
+    advance_ball, kick_ball, launch_speed,
+    AIR_DECAY, GRAVITY, GOAL_MIN_Y, GOAL_MAX_Y, CROSSBAR_HEIGHT
+)
+from reception import solve_reception, sample_trajectory
+from predict import ActionOutcomePredictor
+from descmodel import AIPlayerDecisionSystem
+from formations import FORMATION_ROLES, update_formation_positions
+from movement import update_off_ball_velocities
+from zones import update_zones
+from matchstats import MatchStats
+
+# Ball speeds used when executing on-ball actions (pitch units per second)
+PASS_ARRIVAL_SPEED = 10.0  # Speed a pass should still have at its target
+LOFTED_PASS_DISTANCE = 30.0  # Longer passes are played in the air
+SHOT_SPEED = 25.0
+OVER_BAR_CLEARANCE = 1.0  # Meters above the bar for a shot that goes over
+
+# Seconds after a kick during which the kicker cannot take the ball back
+KICKER_LOCKOUT = 1.0
+
+# Restarts after the ball goes out are taken this far inside the line
+RESTART_MARGIN = 1.0
+
+# How far ahead the reception solver looks when deciding who chases a loose ball
+CHASE_HORIZON = 10.0
+
+# Pass-target score of a receiver standing in a cell their team fully controls
+PASS_SPACE_WEIGHT = 10.0
 
 class SimpleMatchSimulator:
     """
     Simple simulation engine for a football match.
     """
     
-    def __init__(self, match: Match):
+    def __init__(self, match: Match, verbose: bool = True):
         """
         Initialize the match simulator.
         
         Args:
             match: The Match object containing teams, players, and state
+            verbose: Print match commentary (disable for batch/Monte Carlo runs)
         """
         self.match = match
         self.env = simpy.Environment()
         
         # Configuration
         self.time_step = 1.0  # Simulate in 1-second increments
+        self.verbose = verbose
         
-    def setup(self):
-        """Set up the simulation process"""
-        # Main match process
-        self.env.process(self.match_process())
+        # Boundary crossing of the free ball during the current tick, if any
+        self._ball_crossing = None
+        
+        # Decision making for the ball carrier and resolution of action outcomes
+        self.decision_system = AIPlayerDecisionSystem()
+        self.predictor = ActionOutcomePredictor()
         
-    def run(self, until=None):
+        # Random source for kickoffs, pass targets and kick placement
+        self.rng = random
+        
+        # Running statistics, fed by the predictor's outcomes and once per tick
+        self.stats = MatchStats(match)
+        self.predictor.observers.append(self.stats)
+        
+        # TrackingRecorder fed the match state after every tick, if any
+        self.recorder = None
+        
+    def reset(self, seed: Optional[int] = None):
         """
-        Run the simulation until the specified time.
+        Prepare to replay the match from kickoff, reusing the match objects.
         
         Args:
-            until: Time in seconds to run until, or None for full match
+            seed: Seed for the random module, or None to leave it as is
         """
-        if until is None:
-            # Run for full match (90 minutes)
-            until = 90 * 60
+        self.match.reset(seed)
+        
+        # simpy environments cannot be rewound; a new one is only a few small objects
+        self.env = simpy.Environment()
+        
+        self._ball_crossing = None
+        self.decision_system.state_history.clear()
+        self.stats.reset()
+        
+    def use_random_streams(self, kicks=random, outcomes=random, decisions=random):
+        """
+        Draw each kind of random decision from its own source.
+        
+        With separate streams, a change that alters how often one kind of
+        decision is made (e.g. a tactic) does not shift the draws of the
+        others, which keeps paired runs aligned (see variance.py). All three
+        default to the random module.
+        
+        Args:
+            kicks: Source for kickoffs, pass targets and kick placement
+            outcomes: Source for the predictor's success rolls
+            decisions: Source for the ball carrier's action choice
+        """
+        self.rng = kicks
+        self.predictor.rng = outcomes
+        self.decision_system.decision_model.rng = decisions
+        
+    def _log(self, message: str):
+        """Print a commentary line if verbose output is enabled"""
+        if self.verbose:
+            print(message)
+        
+    def setup(self, resume: bool = False):
+        """
+        Set up the simulation process.
+        
+        Args:
+            resume: Continue from the match's current state instead of kicking off
             
-        self.setup()
-        self.env.run(until=until)
+        Returns:
+            The simpy process running the match
+        """
+        # Main match process
+        return self.env.process(self.match_process(resume))
         
-    def match_process(self):
+    def run(self, until=None, resume: bool = False):
         """
-        Main process controlling the match progression.
+        Run the simulation until the specified time.
+        
+        Args:
+            until: Simulation time in seconds to run for, or None to play until full time
+            resume: Continue from the match's current state (e.g. a restored
+                    snapshot) instead of starting with a kickoff
         """
-        # Initialize match (kickoff)
-        self.match.game_phase = GamePhase.KICKOFF
-        self.match.period = MatchPeriod.FIRST_HALF
+        process = self.setup(resume)
+        self.env.run(until=process if until is None else until)
         
-        # Initial kickoff
-        starting_team = random.choice([self.match.home_team, self.match.away_team])
-        starting_player = random.choice(starting_team.lineup)
-        self.match.switch_possession(starting_team, starting_player)
+    def match_process(self, resume: bool = False):
+        """
+        Main process controlling the match progression.
         
-        print(f"Match started! {self.match.home_team.name} vs {self.match.away_team.name}")
-        print(f"Kickoff by {starting_team.name} ({starting_player.name})")
+        Args:
+            resume: Skip the kickoff and continue from the current match state
+        """
+        if not resume:
+            # Initialize match (kickoff)
+            self.match.game_phase = GamePhase.KICKOFF
+            self.match.period = MatchPeriod.FIRST_HALF
+            
+            # Initial kickoff
+            starting_team = self.rng.choice([self.match.home_team, self.match.away_team])
+            starting_player = self._kickoff(starting_team)
+            
+            self._log(f"Match started! {self.match.home_team.name} vs {self.match.away_team.name}")
+            self._log(f"Kickoff by {starting_team.name} ({starting_player.name})")
         
         # Main loop - run until end of match
         while self.match.period != MatchPeriod.FULLTIME:
@@ -73,63 +169,86 @@ class SimpleMatchSimulator:
             # Check for period transitions
             self._check_period_transitions()
             
+            # Nothing moves during the interval
+            if self.match.period == MatchPeriod.HALFTIME:
+                continue
+            
             # Update all players
             self._update_players()
             
             # Update ball
             self._update_ball()
             
+            # Classify every player and the ball into pitch zones in one lookup
+            update_zones(self.match)
+            
             # Process events (goals, fouls, etc.)
             self._process_events()
             
+            # Possession time and distance covered
+            self.stats.update(self.match, self.time_step)
+            
+            if self.recorder is not None:
+                self.recorder.record(self.match)
+            
             # Log current state (once per minute)
             if int(self.match.clock) % 60 == 0:
                 minute = int(self.match.clock / 60)
-                print(f"Minute {minute}: {self.match.home_team.goals_scored}-{self.match.away_team.goals_scored}")
+                self._log(f"Minute {minute}: {self.match.home_team.goals_scored}-{self.match.away_team.goals_scored}")
         
         # Match ended
-        print(f"Final score: {self.match.home_team.name} {self.match.home_team.goals_scored} - {self.match.away_team.goals_scored} {self.match.away_team.name}")
+        self._log(f"Final score: {self.match.home_team.name} {self.match.home_team.goals_scored} - {self.match.away_team.goals_scored} {self.match.away_team.name}")
             
     def _check_period_transitions(self):
         """Check and handle transitions between match periods"""
         if self.match.period == MatchPeriod.FIRST_HALF and self.match.clock >= 45 * 60:
             # First half ended
             self.match.period = MatchPeriod.HALFTIME
-            print("Halftime!")
+            self._log("Halftime!")
             
         elif self.match.period == MatchPeriod.HALFTIME and self.match.clock >= 45 * 60 + 15 * 60:
             # Second half started
             self.match.period = MatchPeriod.SECOND_HALF
             self.match.clock = 45 * 60  # Reset to beginning of second half
-            print("Second half started!")
+            self._log("Second half started!")
             
             # Second half kickoff
             second_half_team = self.match.away_team if self.match.team_in_possession == self.match.home_team else self.match.home_team
-            second_half_player = random.choice(second_half_team.lineup)
-            self.match.switch_possession(second_half_team, second_half_player)
+            self._kickoff(second_half_team)
             
         elif self.match.period == MatchPeriod.SECOND_HALF and self.match.clock >= 90 * 60:
             # Match ended
             self.match.period = MatchPeriod.FULLTIME
-            print("Full time!")
+            self._log("Full time!")
     
     def _update_players(self):
         """Update all player states"""
-        all_players = self.match.home_team.lineup + self.match.away_team.lineup
+        all_players = [p for p in self.match.home_team.lineup + self.match.away_team.lineup
+                       if p.is_available()]
+        
+        # Both teams' formation targets for this tick, from the ball position and tactics
+        update_formation_positions(self.match)
         
+        # Off-ball movement for both teams; the carrier and loose-ball chasers steer themselves
+        update_off_ball_velocities(self.match, self.time_step,
+                                   self.match.ball.chasers + [self.match.ball.possession_player])
+        
+        # Move everyone first so the geometry below is computed once per tick
         for player in all_players:
-            # Skip if player is unavailable
-            if not player.is_available():
-                continue
-                
             # Update position and physical state
             self._update_player_position(player)
             
             # Update stamina
             self._update_player_stamina(player)
             
+            # Progress the current action
+            player.update_action(self.time_step)
+        
+        geometry = self.match.geometry
+        
+        for player in all_players:
             # Update distance to ball
-            player.update_distance_to_ball(float(np.linalg.norm(player.position - self.match.ball.position)))
+            player.update_distance_to_ball(geometry.distance_to_ball(player))
             
             # Make decision if player is available for action
             if player.available_for_action:
@@ -141,11 +260,9 @@ class SimpleMatchSimulator:
         player.update_position(self.time_step)
         
         # Boundary check - keep players on the field
-        x, y = player.position
-        player.position = np.array([
-            max(0, min(100, x)),
-            max(0, min(100, y))
-        ])
+        position = player.position
+        if position.min() < 0.0 or position.max() > 100.0:
+            player.position = np.clip(position, 0.0, 100.0)
     
     def _update_player_stamina(self, player: Player):
         """Update player stamina based on activity"""
@@ -161,41 +278,233 @@ class SimpleMatchSimulator:
     def _player_decision(self, player: Player):
         """
         Decide what action the player should take next.
-        This is the placeholder for more complex AI/ML decision making.
+        The ball carrier asks the decision system what to do and the
+        ActionOutcomePredictor decides how well it is executed; the ball is
+        then moved by the physics and the reception solver.
         """
-        # TODO: Implement player decision logic 
-        # For now, just a placeholder that does nothing
-        # AI and ML models need to be refined and finished before implementation here
-        pass
+        # Off-ball decisions are not modelled yet
+        if self.match.ball.possession_player is not player:
+            return
+            
+        action = self.decision_system.decide_action(player, self.match)
+        
+        if action == PlayerAction.SHOOT:
+            self._take_shot(player)
+        elif action == PlayerAction.PASS:
+            self._make_pass(player)
+        elif action == PlayerAction.DRIBBLE:
+            self._dribble(player)
+            
+        player.start_action(action)
+    
+    def _choose_pass_target(self, player: Player) -> Optional[Player]:
+        """Pick a teammate to pass to, weighing progress, distance and the team's control of the receiver's cell"""
+        teammates = [p for p in player.team.lineup if p is not player and p.is_available()]
+        if not teammates:
+            return None
+            
+        geometry = self.match.geometry
+        spaces = self.match.pitch_control.controls_at([p.position for p in teammates], player.team)
+        direction = 1.0 if player.team == self.match.home_team else -1.0
+        directness = player.team.tactics.get('passing_directness', 50) / 100.0
+        
+        best_target, best_score = None, -np.inf
+        for teammate, space in zip(teammates, spaces):
+            distance = geometry.distance(player, teammate)
+            progress = (teammate.position[0] - player.position[0]) * direction
+            score = (directness * progress - (1.0 - directness) * distance +
+                     PASS_SPACE_WEIGHT * space + self.rng.uniform(0.0, 10.0))
+            if score > best_score:
+                best_target, best_score = teammate, score
+                
+        return best_target
+    
+    def _kick(self, player: Player, target: np.ndarray, speed: float, action: BallAction, loft: float = 0.0):
+        """Release the ball from the carrier and send it towards a target"""
+        ball = self.match.ball
+        self.match.release_ball(action)
+        kick_ball(ball, target, speed, loft)
+        ball.last_kicker = player
+        ball.kick_clock = self.match.clock
+    
+    def _make_pass(self, player: Player):
+        """Execute a pass, using the predictor to decide how accurate it is"""
+        target = self._choose_pass_target(player)
+        if target is None:
+            return
+            
+        success, outcome, details = self.predictor.predict_pass_outcome(player, target, self.match)
+        self.match.record_event('pass', player, player.team,
+                                {'target': target.player_id, 'outcome': outcome})
+        
+        if outcome == 'intercepted':
+            # Read by a defender before the ball got going
+            interceptor = details['interceptor']
+            self.match.switch_possession(interceptor.team, interceptor)
+            return
+            
+        aim = target.position.copy()
+        distance = float(np.linalg.norm(aim - player.position))
+        if outcome == 'misplaced':
+            error = 3.0 + 0.2 * distance
+            aim += np.array([self.rng.uniform(-error, error), self.rng.uniform(-error, error)])
+        elif outcome == 'overhit':
+            aim = player.position + (aim - player.position) * 1.5
+        distance = float(np.linalg.norm(aim - player.position))
+            
+        if distance > LOFTED_PASS_DISTANCE:
+            # Long ball in the air, timed to come down around the target
+            speed = launch_speed(distance, PASS_ARRIVAL_SPEED, AIR_DECAY)
+            loft = 0.5 * GRAVITY * distance / speed
+            self._kick(player, aim, speed, BallAction.PASSED, loft)
+        else:
+            self._kick(player, aim, launch_speed(distance, PASS_ARRIVAL_SPEED), BallAction.PASSED)
+    
+    def _take_shot(self, player: Player):
+        """Execute a shot; the predictor decides goal, save, wide or over"""
+        success, outcome, details = self.predictor.predict_shot_outcome(player, self.match)
+        self.match.record_event('shot', player, player.team, {'outcome': outcome})
+        
+        if outcome == 'saved':
+            goalkeeper = details['goalkeeper']
+            self.match.switch_possession(goalkeeper.team, goalkeeper)
+            return
+            
+        goal_x = 100.0 if player.team == self.match.home_team else 0.0
+        loft = 0.0
+        if outcome == 'goal':
+            aim_y = self.rng.uniform(GOAL_MIN_Y + 0.5, GOAL_MAX_Y - 0.5)
+        elif outcome == 'wide':
+            if self.rng.random() < 0.5:
+                aim_y = self.rng.uniform(GOAL_MIN_Y - 8.0, GOAL_MIN_Y - 0.5)
+            else:
+                aim_y = self.rng.uniform(GOAL_MAX_Y + 0.5, GOAL_MAX_Y + 8.0)
+        else:
+            # Over the bar - loft it so it is still rising clear of the bar at the line
+            aim_y = self.rng.uniform(GOAL_MIN_Y, GOAL_MAX_Y)
+            distance = float(np.linalg.norm(np.array([goal_x, aim_y]) - player.position))
+            flight_time = max(0.1, -np.log1p(-min(0.99, AIR_DECAY * distance / SHOT_SPEED)) / AIR_DECAY)
+            loft = (CROSSBAR_HEIGHT + OVER_BAR_CLEARANCE + 0.5 * GRAVITY * flight_time ** 2) / flight_time
+            
+        self._kick(player, np.array([goal_x, aim_y]), SHOT_SPEED, BallAction.SHOT, loft)
+    
+    def _dribble(self, player: Player):
+        """Execute a dribble; on failure the ball is lost to a defender or runs loose"""
+        success, outcome, details = self.predictor.predict_dribble_outcome(player, self.match)
+        
+        if success:
+            player.position = details['new_position']
+        elif outcome == 'dispossessed':
+            opponent = details['opponent']
+            self.match.record_event('dispossessed', player, player.team,
+                                    {'opponent': opponent.player_id})
+            self.match.switch_possession(opponent.team, opponent)
+        else:
+            # Heavy touch - the ball runs a few units ahead
+            direction = 1.0 if player.team == self.match.home_team else -1.0
+            self._kick(player, player.position + np.array([3.0 * direction, 0.0]), 3.0, BallAction.LOOSE)
     
     def _update_ball(self):
         """Update ball position and state"""
+        ball = self.match.ball
+        self._ball_crossing = None
+        
         # If possessed by a player, ball follows player
-        if self.match.ball.possession_player is not None:
-            self.match.ball.position = self.match.ball.possession_player.position.copy()
-        else:
-            # Ball moves according to its velocity
-            self.match.ball.update_position(self.time_step)
-            
-            # Apply friction to slow ball down
-            self.match.ball.velocity *= 0.95  # 5% slowdown per second
-            
-            # If ball is very slow, stop it
-            if np.linalg.norm(self.match.ball.velocity) < 0.1:
-                self.match.ball.velocity = np.array([0.0, 0.0])
-        
-        # Check for out of bounds
-        x, y = self.match.ball.position
-        if x < 0 or x > 100 or y < 0 or y > 100:
-            # Ball went out of bounds
-            self.match.ball.position = np.array([
-                max(0, min(100, x)),
-                max(0, min(100, y))
-            ])
-            self.match.ball.velocity = np.array([0.0, 0.0])
+        if ball.possession_player is not None:
+            ball.position = ball.possession_player.position.copy()
+            return
+        
+        # Free ball - solve who reaches it first, or whether it leaves the pitch first
+        exclude = []
+        if ball.last_kicker is not None and self.match.clock - ball.kick_clock < KICKER_LOCKOUT:
+            exclude.append(ball.last_kicker)
+        allow_players = not (ball.action == BallAction.SHOT and ball.speed > 0)
+        reception = solve_reception(self.match, CHASE_HORIZON, exclude, allow_players)
+        
+        if reception is not None and reception.player is not None and reception.time <= self.time_step:
+            advance_ball(ball, reception.time)
+            self._receive_ball(reception.player)
+            return
+        
+        # Nobody gets there this tick - exact flight, sub-stepped only at bounces/stops/boundaries
+        self._ball_crossing = advance_ball(ball, self.time_step)
+        
+        if self._ball_crossing is not None and not self._ball_crossing.is_goal:
+            # Ball went out of bounds - it stops on the line where it crossed
+            ball.velocity = np.array([0.0, 0.0])
+            ball.height = 0.0
+            ball.vertical_velocity = 0.0
+            ball.speed = 0.0
+            ball.action = BallAction.LOOSE
             
             # Handle out of bounds (simplified)
             # In a full implementation, would set appropriate game phase and handle throw-ins, etc.
+            self._restart_play()
+        elif reception is not None and self._ball_crossing is None:
+            self._send_chasers(reception)
+    
+    def _restart_play(self):
+        """Give a ball that left the pitch to the side that did not play it out"""
+        ball = self.match.ball
+        last_team = ball.last_kicker.team if ball.last_kicker is not None else self.match.team_in_possession
+        restart_team = self.match.away_team if last_team == self.match.home_team else self.match.home_team
+        
+        # Restart from just inside the line, taken by the nearest available player
+        ball.position = np.clip(ball.position, RESTART_MARGIN, 100.0 - RESTART_MARGIN)
+        takers = [p for p in restart_team.lineup if p.is_available()]
+        if not takers:
+            return
+        geometry = self.match.geometry
+        taker = min(takers, key=geometry.distance_to_ball)
+        taker.position = ball.position.copy()
+        taker.velocity = np.array([0.0, 0.0])
+        self.match.switch_possession(restart_team, taker)
+        ball.last_kicker = None
+        self._stop_chasers()
+    
+    def _receive_ball(self, player: Player):
+        """Give the ball to the player who reached it first"""
+        ball = self.match.ball
+        kicker = ball.last_kicker
+        self.match.record_event('reception', player, player.team, {
+            'from': kicker.player_id if kicker is not None else None,
+            'ball_action': ball.action.name,
+            'intercepted': kicker is not None and kicker.team != player.team
+        })
+        
+        # The player ran onto the ball
+        player.position = ball.position.copy()
+        player.velocity = np.array([0.0, 0.0])
+        self.match.switch_possession(player.team, player)
+        self._stop_chasers()
+    
+    def _send_chasers(self, reception):
+        """Send each team's quickest player towards where they can meet the loose ball"""
+        self._stop_chasers()
+        if reception.arrival_times is None:
+            return
+            
+        ball = self.match.ball
+        for team in (self.match.home_team, self.match.away_team):
+            times = [(t, p) for t, p in zip(reception.arrival_times, reception.players)
+                     if p.team == team and np.isfinite(t)]
+            if not times:
+                continue
+            arrival, chaser = min(times, key=lambda item: item[0])
+            meeting_point = sample_trajectory(ball.position, ball.velocity, ball.height,
+                                              ball.vertical_velocity, np.array([arrival]))[0][0]
+            direction = meeting_point - chaser.position
+            norm = np.linalg.norm(direction)
+            if norm > 0:
+                chaser.velocity = direction / norm * min(chaser.max_speed(), norm / self.time_step)
+                ball.chasers.append(chaser)
+    
+    def _stop_chasers(self):
+        """Stop players who were running onto a loose ball"""
+        ball = self.match.ball
+        for chaser in ball.chasers:
+            chaser.velocity = np.array([0.0, 0.0])
+        ball.chasers = []
     
     def _process_events(self):
         """Process match events like goals, fouls, etc."""
@@ -206,45 +515,83 @@ class SimpleMatchSimulator:
     
     def _check_for_goals(self):
         """Check if a goal has been scored"""
-        # Basic goal detection - ball crosses goal line between posts
-        x, y = self.match.ball.position
+        crossing = self._ball_crossing
+        if crossing is not None:
+            # Free ball - use the exact point where it crossed the line
+            if not crossing.is_goal:
+                return
+            x, y = crossing.position
+        elif self.match.ball.possession_player is not None:
+            # Ball carried over the line by a player
+            x, y = self.match.ball.position
+        else:
+            return
         
         # Simplified goal width (from y=45 to y=55)
-        goal_min_y, goal_max_y = 45, 55
+        goal_min_y, goal_max_y = GOAL_MIN_Y, GOAL_MAX_Y
         
         # Check if ball crossed goal line
+        scorer = self.match.ball.last_kicker if crossing is not None else self.match.ball.possession_player
+        
         if x <= 0 and goal_min_y <= y <= goal_max_y:
             # Goal for away team
-            self.match.away_team.goals_scored += 1
-            self.match.home_team.goals_conceded += 1
-            print(f"GOAL! {self.match.away_team.name} scored! ({self.match.home_team.goals_scored}-{self.match.away_team.goals_scored})")
+            self.match.record_event('goal', scorer, self.match.away_team,
+                                    {'own_goal': scorer is not None and scorer.team != self.match.away_team})
+            self._log(f"GOAL! {self.match.away_team.name} scored! ({self.match.home_team.goals_scored}-{self.match.away_team.goals_scored})")
             self._reset_after_goal(self.match.home_team)
             
         elif x >= 100 and goal_min_y <= y <= goal_max_y:
             # Goal for home team
-            self.match.home_team.goals_scored += 1
-            self.match.away_team.goals_conceded += 1
-            print(f"GOAL! {self.match.home_team.name} scored! ({self.match.home_team.goals_scored}-{self.match.away_team.goals_scored})")
+            self.match.record_event('goal', scorer, self.match.home_team,
+                                    {'own_goal': scorer is not None and scorer.team != self.match.home_team})
+            self._log(f"GOAL! {self.match.home_team.name} scored! ({self.match.home_team.goals_scored}-{self.match.away_team.goals_scored})")
             self._reset_after_goal(self.match.away_team)
     
     def _reset_after_goal(self, kickoff_team: Team):
         """Reset the match state after a goal"""
-        # Place ball at center
-        self.match.ball.position = np.array([50.0, 50.0])
-        self.match.ball.velocity = np.array([0.0, 0.0])
-        
         # Give kickoff to the team that conceded
-        starting_player = random.choice(kickoff_team.lineup)
-        self.match.switch_possession(kickoff_team, starting_player)
+        self._kickoff(kickoff_team)
         
         # Set game phase to kickoff
         self.match.game_phase = GamePhase.KICKOFF
+    
+    def _kickoff(self, team: Team) -> Player:
+        """
+        Line both teams up in formation and give the ball to a kickoff taker.
+        
+        Args:
+            team: The team kicking off
+            
+        Returns:
+            The player taking the kickoff
+        """
+        ball = self.match.ball
+        ball.position = np.array([50.0, 50.0])
+        ball.velocity = np.array([0.0, 0.0])
+        ball.height = 0.0
+        ball.vertical_velocity = 0.0
+        
+        for side in (self.match.home_team, self.match.away_team):
+            side.set_formation(side.formation)
+        
+        # The most advanced player steps onto the centre spot
+        taker = min((p for p in team.lineup if p.is_available()),
+                    key=lambda p: np.linalg.norm(p.position - ball.position))
+        taker.position = ball.position.copy()
+        self.match.switch_possession(team, taker)
+        ball.last_kicker = None
+        self._stop_chasers()
+        return taker
 
 # this is not for future, just current temporary testing
-def create_sample_match() -> Match:
+def create_sample_match(home_strength: float = 0.0, away_strength: float = 0.0) -> Match:
     """
     Create a sample match with two teams for testing.
     
+    Args:
+        home_strength: Points added to each home player's randomised attributes
+        away_strength: Points added to each away player's randomised attributes
+        
     Returns:
         A Match object with two teams and players
     """
@@ -255,93 +602,46 @@ def create_sample_match() -> Match:
     # Create match
     match = Match(home_team, away_team)
     
-    # Create players for home team
-    home_players = []
-    for i in range(11):
-        # Determine position based on index
-        if i == 0:
-            position_name = "GK"
-        elif i <= 4:
-            position_name = "DEF"
-        elif i <= 8:
-            position_name = "MID"
-        else:
-            position_name = "FWD"
-            
-        # Create player
-        player = Player(f"H{i+1}", f"Home {position_name} {i+1}", getattr(PlayingPosition, position_name), home_team)
-        
-        # Set initial position based on role (simplified)
-        if position_name == "GK":
-            player.position = np.array([5.0, 50.0])
-        elif position_name == "DEF":
-            x = 20.0
-            y = 20.0 + (i * 15)  # Spread defenders across the width
-            player.position = np.array([x, y])
-        elif position_name == "MID":
-            x = 50.0
-            y = 20.0 + ((i-4) * 15)  # Spread midfielders across the width
-            player.position = np.array([x, y])
-        else:  # FWD
-            x = 80.0
-            y = 35.0 + ((i-9) * 30)  # Spread forwards across the width
-            player.position = np.array([x, y])
-            
-        # Random attributes (simplified)
-        for attr in ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'stamina']:
-            player.attributes[attr] = 70 + random.randint(-10, 10)
-            
-        home_players.append(player)
-    
-    # Create players for away team
-    away_players = []
-    for i in range(11):
-        # Determine position based on index
-        if i == 0:
-            position_name = "GK"
-        elif i <= 4:
-            position_name = "DEF"
-        elif i <= 8:
-            position_name = "MID"
-        else:
-            position_name = "FWD"
-            
-        # Create player
-        player = Player(f"A{i+1}", f"Away {position_name} {i+1}", getattr(PlayingPosition, position_name), away_team)
-        
-        # Set initial position based on role (simplified)
-        if position_name == "GK":
-            player.position = np.array([95.0, 50.0])
-        elif position_name == "DEF":
-            x = 80.0
-            y = 20.0 + (i * 15)  # Spread defenders across the width
-            player.position = np.array([x, y])
-        elif position_name == "MID":
-            x = 50.0
-            y = 20.0 + ((i-4) * 15)  # Spread midfielders across the width
-            player.position = np.array([x, y])
-        else:  # FWD
-            x = 20.0
-            y = 35.0 + ((i-9) * 30)  # Spread forwards across the width
-            player.position = np.array([x, y])
-            
-        # Random attributes (simplified)
-        for attr in ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'stamina']:
-            player.attributes[attr] = 70 + random.randint(-10, 10)
-            
-        away_players.append(player)
-    
-    # Set team lineups
-    home_team.lineup = home_players
-    away_team.lineup = away_players
-    
-    # Add all players to teams
-    home_team.players = home_players.copy()
-    away_team.players = away_players.copy()
+    for team, prefix, label, strength in ((home_team, "H", "Home", home_strength),
+                                          (away_team, "A", "Away", away_strength)):
+        players = []
+        for i, role in enumerate(FORMATION_ROLES[team.formation]):
+            player = Player(f"{prefix}{i+1}", f"{label} {role.name} {i+1}", role, team)
+            
+            # Random attributes (simplified)
+            for attr in ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'stamina']:
+                player.attributes[attr] = 70 + strength + random.randint(-10, 10)
+                
+            players.append(player)
+        
+        # Add all players to the team, start all eleven and line them up in formation
+        team.players = players.copy()
+        team.select_lineup(players)
+        team.set_formation(team.formation)
     
     return match
 
 
+def run_replications(match: Match, seeds: List[int]) -> List[Tuple[int, int]]:
+    """
+    Play the same fixture from kickoff once per seed, reusing one object graph.
+    
+    Args:
+        match: The match to replay (reset before every run)
+        seeds: One random seed per replication
+        
+    Returns:
+        List of (home_goals, away_goals) final scores
+    """
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    results = []
+    for seed in seeds:
+        simulator.reset(seed)
+        simulator.run()
+        results.append((match.home_team.goals_scored, match.away_team.goals_scored))
+    return results
+
+
 def run_sample_simulation():
     """Run a sample match simulation"""
     match = create_sample_match()
@@ -353,7 +653,8 @@ def run_sample_simulation():
         'home_score': match.home_team.goals_scored,
         'away_score': match.away_team.goals_scored,
         'home_team': match.home_team.name,
-        'away_team': match.away_team.name
+        'away_team': match.away_team.name,
+        'stats': simulator.stats.summary()
     }
 
 
@@ -362,3 +663,8 @@ if __name__ == "__main__":
     results = run_sample_simulation()
     print("\nMatch Summary:")
     print(f"{results['home_team']} {results['home_score']} - {results['away_score']} {results['away_team']}")
+    for team_name in (results['home_team'], results['away_team']):
+        stats = results['stats'][team_name]
+        print(f"{team_name}: {stats['possession']:.0%} possession, {stats['shots']:.0f} shots "
+              f"({stats['shots_on_target']:.0f} on target), {stats['xg']:.2f} xG, "
+              f"{stats['passes_completed']:.0f}/{stats['passes']:.0f} passes")
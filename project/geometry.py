@@ -0,0 +1,268 @@
+# per-tick geometry cache shared by the simulator, predictors and feature extraction
+import numpy as np
+from typing import Optional, Tuple
+
+# Goal centres on the 0-100 pitch. Index 0 is the home goal (x = 0),
+# index 1 is the away goal (x = 100).
+HOME_GOAL = 0
+AWAY_GOAL = 1
+GOAL_POSITIONS = np.array([[0.0, 50.0], [100.0, 50.0]])
+
+# Unit vector that counts as "straight at goal" when attacking each goal
+GOAL_FORWARD = np.array([[-1.0, 0.0], [1.0, 0.0]])
+
+
+class MatchGeometry:
+    """
+    Lazily computed geometry for the current state of a match.
+
+    Entities are ordered as the home lineup, then the away lineup, then the
+    ball (23 rows for two full lineups). The distance matrix, goal vectors
+    and nearest-player lookups are rebuilt in one vectorized pass the first
+    time they are read after any position has changed, so every subsystem
+    reading them during a tick shares the same computation.
+    """
+
+    def __init__(self, match):
+        """
+        Initialize the geometry cache.
+
+        Args:
+            match: The Match whose entities are tracked
+        """
+        self.match = match
+        self._version = None
+
+        # Entity bookkeeping
+        self._entities = []
+        self._index = {}
+        self._n_home = 0
+
+        # Cached arrays (filled by _refresh)
+        self._positions = np.zeros((0, 2))
+        self._distances = np.zeros((0, 0))
+        self._goal_vectors = np.zeros((0, 2, 2))
+        self._goal_distances = np.zeros((0, 2))
+        self._goal_angles = np.zeros((0, 2))
+        self._nearest_teammate = np.zeros(0, dtype=int)
+        self._nearest_opponent = np.zeros(0, dtype=int)
+        self._teammate_mask = np.zeros((0, 0))
+        self._opponent_mask = np.zeros((0, 0))
+
+    def _refresh(self):
+        """Recompute all cached arrays if any position changed since the last read"""
+        version = self.match._positions_version
+        if version == self._version:
+            return
+
+        home = self.match.home_team.lineup
+        away = self.match.away_team.lineup
+        entities = home + away + [self.match.ball]
+        n_home = len(home)
+        n_players = n_home + len(away)
+
+        if entities != self._entities:
+            self._set_entities(entities, n_home, n_players)
+
+        positions = np.array([entity.position for entity in entities], dtype=float)
+
+        # Pairwise distances between every entity
+        delta = positions[:, None, :] - positions[None, :, :]
+        distances = np.hypot(delta[..., 0], delta[..., 1])
+
+        # Vectors, distances and angles to both goals (the straight line at
+        # each goal runs along the x axis, so only the x component matters)
+        to_goals = GOAL_POSITIONS[None, :, :] - positions[:, None, :]
+        goal_distances = np.hypot(to_goals[..., 0], to_goals[..., 1])
+        safe = np.where(goal_distances > 0, goal_distances, 1.0)
+        goal_vectors = to_goals / safe[..., None]
+        cos_angle = np.clip(goal_vectors[..., 0] * GOAL_FORWARD[:, 0], -1.0, 1.0)
+        goal_angles = np.where(goal_distances > 0, np.degrees(np.arccos(cos_angle)), 90.0)
+
+        # Nearest teammate / opponent for every player (ball excluded)
+        player_dist = distances[:n_players, :n_players]
+        if n_players:
+            self._nearest_teammate = (player_dist + self._teammate_mask).argmin(axis=1)
+            self._nearest_opponent = (player_dist + self._opponent_mask).argmin(axis=1)
+
+        self._positions = positions
+        self._distances = distances
+        self._goal_vectors = goal_vectors
+        self._goal_distances = goal_distances
+        self._goal_angles = goal_angles
+        self._version = version
+
+    def _set_entities(self, entities: list, n_home: int, n_players: int):
+        """Rebuild the entity index and team masks after a lineup change"""
+        self._entities = entities
+        self._index = {entity: i for i, entity in enumerate(entities)}
+        self._n_home = n_home
+
+        # Additive masks: +inf hides a pair from the nearest-player search
+        same_team = np.zeros((n_players, n_players), dtype=bool)
+        same_team[:n_home, :n_home] = True
+        same_team[n_home:, n_home:] = True
+        self._opponent_mask = np.where(same_team, np.inf, 0.0)
+        np.fill_diagonal(same_team, False)
+        self._teammate_mask = np.where(same_team, 0.0, np.inf)
+        self._nearest_teammate = np.zeros(n_players, dtype=int)
+        self._nearest_opponent = np.zeros(n_players, dtype=int)
+
+    # ---- Raw arrays ----
+
+    @property
+    def entities(self) -> list:
+        """Home lineup, away lineup and ball in matrix order"""
+        self._refresh()
+        return self._entities
+
+    @property
+    def n_home(self) -> int:
+        """Number of home players at the start of the entity list"""
+        self._refresh()
+        return self._n_home
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(n, 2) positions of all entities"""
+        self._refresh()
+        return self._positions
+
+    @property
+    def distances(self) -> np.ndarray:
+        """(n, n) pairwise distance matrix"""
+        self._refresh()
+        return self._distances
+
+    @property
+    def goal_vectors(self) -> np.ndarray:
+        """(n, 2, 2) unit vectors from every entity to the home and away goals"""
+        self._refresh()
+        return self._goal_vectors
+
+    @property
+    def goal_distances(self) -> np.ndarray:
+        """(n, 2) distances from every entity to the home and away goals"""
+        self._refresh()
+        return self._goal_distances
+
+    @property
+    def goal_angles(self) -> np.ndarray:
+        """(n, 2) angles in degrees off the straight line at each goal (0 = straight on)"""
+        self._refresh()
+        return self._goal_angles
+
+    @property
+    def ball_distances(self) -> np.ndarray:
+        """Distance from every player to the ball, in entity order"""
+        self._refresh()
+        return self._distances[:-1, -1]
+
+    # ---- Per-entity lookups ----
+
+    def index_of(self, entity) -> Optional[int]:
+        """
+        Get the matrix row of a player or the ball.
+
+        Args:
+            entity: A Player or the match Ball
+
+        Returns:
+            Row index, or None if the entity is not on the pitch
+        """
+        self._refresh()
+        return self._index.get(entity)
+
+    def attacking_goal(self, player) -> int:
+        """Index of the goal a player's team attacks"""
+        return AWAY_GOAL if player.team == self.match.home_team else HOME_GOAL
+
+    def distance(self, a, b) -> float:
+        """
+        Distance between two entities.
+
+        Args:
+            a: A Player or the Ball
+            b: A Player or the Ball
+
+        Returns:
+            Euclidean distance on the 0-100 pitch
+        """
+        i, j = self.index_of(a), self.index_of(b)
+        if i is None or j is None:
+            return float(np.linalg.norm(b.position - a.position))
+        return float(self._distances[i, j])
+
+    def distance_to_ball(self, player) -> float:
+        """Distance from a player to the ball"""
+        return self.distance(player, self.match.ball)
+
+    def goal_distance(self, player, goal: int) -> float:
+        """Distance from a player to the given goal"""
+        i = self.index_of(player)
+        if i is None:
+            return float(np.linalg.norm(GOAL_POSITIONS[goal] - player.position))
+        return float(self._goal_distances[i, goal])
+
+    def goal_angle(self, player, goal: int) -> float:
+        """Angle in degrees off the straight line from a player to the given goal"""
+        i = self.index_of(player)
+        if i is None:
+            to_goal = GOAL_POSITIONS[goal] - player.position
+            norm = np.linalg.norm(to_goal)
+            if norm == 0:
+                return 90.0
+            cos_angle = max(-1.0, min(1.0, float(np.dot(to_goal / norm, GOAL_FORWARD[goal]))))
+            return float(np.degrees(np.arccos(cos_angle)))
+        return float(self._goal_angles[i, goal])
+
+    def nearest_opponent(self, player) -> Tuple[Optional[object], float]:
+        """
+        Find the closest opposing player.
+
+        Args:
+            player: The reference player
+
+        Returns:
+            Tuple of (opponent or None, distance)
+        """
+        return self._nearest(player, same_team=False)
+
+    def nearest_teammate(self, player) -> Tuple[Optional[object], float]:
+        """
+        Find the closest teammate.
+
+        Args:
+            player: The reference player
+
+        Returns:
+            Tuple of (teammate or None, distance)
+        """
+        return self._nearest(player, same_team=True)
+
+    def _nearest(self, player, same_team: bool):
+        """Shared lookup for nearest teammate/opponent"""
+        i = self.index_of(player)
+        lookup = self._nearest_teammate if same_team else self._nearest_opponent
+        if i is not None and i < len(lookup):
+            j = int(lookup[i])
+            dist = float(self._distances[i, j])
+            if np.isfinite(dist) and j != i and self._same_side(i, j) == same_team:
+                return self._entities[j], dist
+            return None, float('inf')
+
+        # Player not on the pitch - fall back to a direct search
+        if same_team:
+            candidates = [p for p in player.team.lineup if p is not player]
+        else:
+            opponents = self.match.away_team if player.team == self.match.home_team else self.match.home_team
+            candidates = opponents.lineup
+        if not candidates:
+            return None, float('inf')
+        dists = [float(np.linalg.norm(c.position - player.position)) for c in candidates]
+        k = int(np.argmin(dists))
+        return candidates[k], dists[k]
+
+    def _same_side(self, i: int, j: int) -> bool:
+        """Whether two player rows belong to the same team"""
+        return (i < self._n_home) == (j < self._n_home)
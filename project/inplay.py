@@ -0,0 +1,293 @@
+# in-play win/draw/loss probabilities from a live match state
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from states import Match, MatchPeriod
+from snapshot import take_snapshot, restore_snapshot, match_skeleton, match_from_skeleton
+from gamesim import SimpleMatchSimulator
+from coarse import CoarseMatchSimulator
+from memory import cached
+
+OUTCOMES = ('home_win', 'draw', 'away_win')
+DEADLINE_CHECK_TICKS = 10  # Match seconds simulated between deadline checks
+FALLBACK_RESERVE = 0.15  # Seconds kept for the coarse top-up until one has been timed
+FALLBACK_SAFETY = 2.0  # Reserve as a multiple of the last top-up's time (covers jitter and the check interval)
+
+# Matches rebuilt inside this process, keyed by skeleton (most recent few), reused across calls
+_continuation_matches = {}
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Wilson score confidence interval for a binomial proportion.
+
+    Args:
+        successes: Number of successes
+        n: Number of trials
+        z: Normal quantile for the confidence level (1.96 = 95%)
+
+    Returns:
+        Tuple of (lower, upper) bounds
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def count_outcomes(results: List[Tuple[int, int]]) -> Dict[str, int]:
+    """
+    Tally home wins, draws and away wins.
+
+    Args:
+        results: (home_goals, away_goals) final scores
+
+    Returns:
+        Count per outcome name in OUTCOMES
+    """
+    counts = {name: 0 for name in OUTCOMES}
+    for home_goals, away_goals in results:
+        if home_goals > away_goals:
+            counts['home_win'] += 1
+        elif home_goals == away_goals:
+            counts['draw'] += 1
+        else:
+            counts['away_win'] += 1
+    return counts
+
+
+def simulate_continuations(skeleton: tuple, blob: bytes, seeds: List[int],
+                           deadline: Optional[float] = None) -> List[Tuple[int, int]]:
+    """
+    Play one continuation to full time per seed, starting from a snapshot.
+
+    Runs in worker processes as well as inline. The match object is rebuilt
+    once per skeleton and restored from the snapshot before every run, and
+    the caller's random state is left untouched. Once the deadline passes,
+    the continuation in progress is abandoned and no more are started.
+
+    Args:
+        skeleton: Teams and players, from snapshot.match_skeleton
+        blob: Snapshot of the live state, from snapshot.take_snapshot
+        seeds: One random seed per continuation
+        deadline: Wall-clock time (time.time()) to stop by, or None to play every seed
+
+    Returns:
+        List of (home_goals, away_goals) final scores of the finished continuations
+    """
+    match = cached(_continuation_matches, skeleton, lambda: match_from_skeleton(skeleton))
+
+    saved_state = random.getstate()
+    results = []
+    try:
+        for seed in seeds:
+            if deadline is not None and time.time() >= deadline:
+                break
+            restore_snapshot(match, blob, rng=None)
+            random.seed(seed)
+            simulator = SimpleMatchSimulator(match, verbose=False)
+            simulator.setup(resume=True)
+            tick = 0
+            while match.period != MatchPeriod.FULLTIME:
+                if deadline is not None and time.time() >= deadline:
+                    return results
+                tick += DEADLINE_CHECK_TICKS
+                simulator.env.run(until=tick)
+            results.append((match.home_team.goals_scored, match.away_team.goals_scored))
+    finally:
+        random.setstate(saved_state)
+    return results
+
+
+class InPlayEngine:
+    """
+    Estimates win/draw/loss probabilities for a match in progress.
+
+    Each call snapshots the live state and plays batches of continuations to
+    full time (inline or on a persistent process pool) until every outcome's
+    confidence interval is tight enough, the sample cap is hit or the time
+    budget runs out; continuations still running at the deadline are
+    dropped. A full continuation from early in a match takes seconds, so
+    when the budget ends before the target precision, the estimate is
+    topped up with coarse possession-chain continuations from the live
+    state, which take milliseconds, but only as many as the target
+    precision needs; the intervals and convergence are judged on the
+    full-engine samples alone. When the next call sees the same score,
+    period, cards and lineups, the previous full-engine samples generated
+    at most reuse_window match seconds earlier are kept and topped up
+    instead of starting from scratch; older ones are dropped.
+    """
+
+    def __init__(self, workers: int = 0, batch_size: int = 8, min_samples: int = 16,
+                 max_samples: int = 400, target_half_width: float = 0.05,
+                 time_budget: float = 0.75, reuse_window: float = 10.0,
+                 seed: Optional[int] = None, fallback: bool = True,
+                 runner: Callable[..., List[Tuple[int, int]]] = simulate_continuations):
+        """
+        Initialize the in-play engine.
+
+        Args:
+            workers: Worker processes to use (0 runs continuations inline)
+            batch_size: Continuations per task
+            min_samples: Samples required before early stopping is considered
+            max_samples: Hard cap on samples per call
+            target_half_width: Stop once every 95% interval is at most this wide on each side
+            time_budget: Wall-clock seconds allowed per call
+            reuse_window: Maximum match-clock age (seconds) of a reused sample
+            seed: Seed for the continuation seeds (None for nondeterministic)
+            fallback: Top up with coarse continuations when the budget runs out
+            runner: Function playing a batch of continuations by a deadline; a
+                    batched ensemble runner with the same signature can be swapped in
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.target_half_width = target_half_width
+        self.time_budget = time_budget
+        self.reuse_window = reuse_window
+        self.fallback = fallback
+        self.runner = runner
+
+        self._seeds = random.Random(seed)
+        self._executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+        # Wall-clock seconds kept free at the end of the budget for the coarse top-up
+        self._fallback_reserve = FALLBACK_RESERVE
+
+        # Full-engine samples from the previous call as (clock generated at, score), reused for nearby states
+        self._last_key = None
+        self._last_results = []
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _state_key(self, match: Match, skeleton: tuple) -> tuple:
+        """Parts of the state that must be unchanged for samples to be reused"""
+        teams = (match.home_team, match.away_team)
+        return (
+            skeleton, match.period,
+            match.home_team.goals_scored, match.away_team.goals_scored,
+            tuple(team.substitutions_made for team in teams),
+            tuple(tuple((p.player_id, p.yellow_cards, p.red_card) for p in team.lineup) for team in teams)
+        )
+
+    def _run_round(self, skeleton: tuple, blob: bytes, deadline: float) -> List[Tuple[int, int]]:
+        """Play one round of continuations (one batch per worker), stopping at the deadline"""
+        if self._executor is None:
+            seeds = [self._seeds.getrandbits(32) for _ in range(self.batch_size)]
+            return self.runner(skeleton, blob, seeds, deadline=deadline)
+
+        futures = [
+            self._executor.submit(self.runner, skeleton, blob,
+                                  [self._seeds.getrandbits(32) for _ in range(self.batch_size)],
+                                  deadline=deadline)
+            for _ in range(self.workers)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def estimate(self, match: Match) -> Dict[str, Any]:
+        """
+        Estimate final-result probabilities from the current match state.
+
+        Args:
+            match: The live match (left unchanged)
+
+        Returns:
+            Dictionary with home_win/draw/away_win probabilities over all
+            samples, 95% confidence intervals over the full-engine samples,
+            sample counts (all, full-engine, reused and coarse fallback),
+            elapsed time and whether the full-engine samples reached the
+            target precision
+        """
+        start = time.perf_counter()
+        # Full continuations stop early enough to leave time for a coarse top-up
+        deadline = time.time() + self.time_budget - (self._fallback_reserve if self.fallback else 0.0)
+        skeleton = match_skeleton(match)
+        blob = take_snapshot(match, rng=None)
+
+        # Keep the previous samples that were generated only a little earlier in the same state
+        key = self._state_key(match, skeleton)
+        stamped = []
+        if key == self._last_key:
+            stamped = [(clock, score) for clock, score in self._last_results
+                       if 0.0 <= match.clock - clock <= self.reuse_window]
+        reused = len(stamped)
+        results = [score for _, score in stamped]
+
+        while True:
+            counts = count_outcomes(results)
+            n = len(results)
+            intervals = {name: wilson_interval(counts[name], n) for name in OUTCOMES}
+            converged = n >= self.min_samples and \
+                max((hi - lo) / 2 for lo, hi in intervals.values()) <= self.target_half_width
+            if converged or n >= self.max_samples or time.time() >= deadline:
+                break
+            round_results = self._run_round(skeleton, blob, deadline)
+            results.extend(round_results)
+            stamped.extend((match.clock, score) for score in round_results)
+
+        fallback = []
+        if self.fallback and not converged and n < self.max_samples:
+            fallback_start = time.perf_counter()
+            fallback = self._coarse_continuations(match, self._samples_needed(counts, n) - n)
+            self._fallback_reserve = FALLBACK_SAFETY * (time.perf_counter() - fallback_start)
+
+        self._last_key = key
+        self._last_results = stamped
+
+        total = count_outcomes(results + fallback)
+        samples = n + len(fallback)
+        estimate = {name: (total[name] / samples if samples else 0.0) for name in OUTCOMES}
+        estimate.update({
+            'intervals': intervals,
+            'samples': samples,
+            'full': n,
+            'reused': reused,
+            'fallback': len(fallback),
+            'elapsed': time.perf_counter() - start,
+            'converged': converged
+        })
+        return estimate
+
+    def _samples_needed(self, counts: Dict[str, int], n: int, z: float = 1.96) -> int:
+        """
+        Samples that would bring every outcome's interval to the target width.
+
+        Uses the outcome shares seen so far (the worst case, one half, when
+        there are none), and stays within min_samples and max_samples.
+
+        Args:
+            counts: Outcome counts of the full-engine samples
+            n: Number of full-engine samples
+            z: Normal quantile for the confidence level (1.96 = 95%)
+
+        Returns:
+            Total sample count for the estimate
+        """
+        variance = max((counts[name] / n) * (1.0 - counts[name] / n) for name in OUTCOMES) if n else 0.25
+        needed = math.ceil(variance * (z / self.target_half_width) ** 2)
+        return min(self.max_samples, max(self.min_samples, needed))
+
+    def _coarse_continuations(self, match: Match, n: int) -> List[Tuple[int, int]]:
+        """Final scores of n possession-chain continuations from the live state"""
+        if n <= 0:
+            return []
+        return CoarseMatchSimulator(match).simulate(n, self._seeds.getrandbits(32), resume=True)
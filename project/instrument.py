@@ -0,0 +1,272 @@
+# opt-in phase timers, action counters and probability histograms for match runs
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+from gamesim import SimpleMatchSimulator
+from analytics import parallel_analytics
+
+PROBABILITY_BINS = 20  # Histogram bins over [0, 1] for success probabilities
+
+# Timed methods per component of the simulator: (timer name, attribute path, method)
+_TIMED = (
+    ('update_players', (), '_update_players'),
+    ('update_ball', (), '_update_ball'),
+    ('process_events', (), '_process_events'),
+    ('stats', ('stats',), 'update'),
+    ('decide_action', ('decision_system',), 'decide_action'),
+    ('predict_pass', ('predictor',), 'predict_pass_outcome'),
+    ('predict_shot', ('predictor',), 'predict_shot_outcome'),
+    ('predict_dribble', ('predictor',), 'predict_dribble_outcome'),
+)
+# Phases called directly by the tick loop; the rest run inside them
+TICK_PHASES = ('update_players', 'update_ball', 'process_events', 'stats')
+
+
+class Instrumentation:
+    """
+    Timers, counters and histograms collected from instrumented simulators.
+
+    Instrumenting a simulator replaces the measured methods on that
+    simulator's own objects with timing wrappers, and detaching deletes
+    them again, so simulators that were never attached run the plain
+    methods with no added cost. Timers are inclusive: the predictor and
+    decision timers are also part of update_players.
+    """
+
+    def __init__(self):
+        self.timers = {}  # Timer name -> [total nanoseconds, calls]
+        self.counters = {}  # Counter name -> count
+        self.histograms = {}  # Action name -> success probability counts per bin
+        self.matches = 0
+        self._attached = {}  # id(simulator) -> [(object, attribute name)]
+
+    # ---- Wrapping ----
+
+    def _timer(self, name: str) -> list:
+        entry = self.timers.get(name)
+        if entry is None:
+            entry = self.timers[name] = [0, 0]
+        return entry
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        """Wrap a bound method to add its wall time and call to a timer"""
+        entry = self._timer(name)
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                entry[0] += clock() - start
+                entry[1] += 1
+        return timed
+
+    def _counted_probability(self, function: Callable) -> Callable:
+        """Wrap success_probability to count calls per action and bin the probabilities"""
+        counters, histograms = self.counters, self.histograms
+
+        def counted(action, player, context):
+            probability = function(action, player, context)
+            key = f'predict.{action.name}'
+            counters[key] = counters.get(key, 0) + 1
+            bins = histograms.get(action.name)
+            if bins is None:
+                bins = histograms[action.name] = [0] * PROBABILITY_BINS
+            bins[min(int(probability * PROBABILITY_BINS), PROBABILITY_BINS - 1)] += 1
+            return probability
+        return counted
+
+    def _counted_decision(self, function: Callable) -> Callable:
+        """Wrap decide_action to count the chosen actions"""
+        counters = self.counters
+
+        def counted(player, match):
+            action = function(player, match)
+            key = f'decide.{action.name}'
+            counters[key] = counters.get(key, 0) + 1
+            return action
+        return counted
+
+    def attach(self, simulator: SimpleMatchSimulator) -> SimpleMatchSimulator:
+        """
+        Instrument a simulator until detach() is called.
+
+        Args:
+            simulator: Simulator to measure (its predictor, decision system
+                       and statistics are instrumented too)
+
+        Returns:
+            The simulator
+        """
+        if id(simulator) in self._attached:
+            return simulator
+        wrapped = []
+
+        def wrap(target, attribute: str, wrapper: Callable):
+            if attribute not in vars(target):
+                wrapped.append((target, attribute))
+            setattr(target, attribute, wrapper)
+
+        predictor = simulator.predictor
+        decision_system = simulator.decision_system
+        wrap(predictor, 'success_probability', self._counted_probability(predictor.success_probability))
+        wrap(decision_system, 'decide_action', self._counted_decision(decision_system.decide_action))
+        for name, path, method in _TIMED:
+            target = simulator
+            for attribute in path:
+                target = getattr(target, attribute)
+            wrap(target, method, self._timed(name, getattr(target, method)))
+        wrap(simulator, 'run', self._timed('match', simulator.run))
+
+        self._attached[id(simulator)] = wrapped
+        return simulator
+
+    def detach(self, simulator: SimpleMatchSimulator):
+        """Remove the instrumentation from a simulator, restoring its plain methods"""
+        for target, attribute in reversed(self._attached.pop(id(simulator), [])):
+            delattr(target, attribute)
+
+    # ---- Results ----
+
+    def reset(self):
+        """Zero every timer, counter and histogram (attached simulators keep reporting here)"""
+        for entry in self.timers.values():
+            entry[0] = entry[1] = 0
+        self.counters.clear()
+        self.histograms.clear()
+        self.matches = 0
+
+    def merge(self, other: 'Instrumentation') -> 'Instrumentation':
+        """
+        Add another run's measurements (e.g. from a worker process) to these.
+
+        Args:
+            other: Measurements to add
+
+        Returns:
+            This instrumentation
+        """
+        for name, (nanoseconds, calls) in other.timers.items():
+            entry = self._timer(name)
+            entry[0] += nanoseconds
+            entry[1] += calls
+        for name, count in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + count
+        for name, bins in other.histograms.items():
+            mine = self.histograms.setdefault(name, [0] * PROBABILITY_BINS)
+            for i, count in enumerate(bins):
+                mine[i] += count
+        self.matches += other.matches
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Measurements as plain data (JSON-serialisable)"""
+        return {
+            'matches': self.matches,
+            'timers': {name: {'ns': entry[0], 'calls': entry[1]} for name, entry in self.timers.items()},
+            'counters': dict(self.counters),
+            'histograms': {name: list(bins) for name, bins in self.histograms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Instrumentation':
+        """
+        Rebuild measurements exported with to_dict.
+
+        Args:
+            data: Output of to_dict
+
+        Returns:
+            A detached Instrumentation holding the measurements
+        """
+        instrumentation = cls()
+        instrumentation.matches = data['matches']
+        instrumentation.timers = {name: [t['ns'], t['calls']] for name, t in data['timers'].items()}
+        instrumentation.counters = dict(data['counters'])
+        instrumentation.histograms = {name: list(bins) for name, bins in data['histograms'].items()}
+        return instrumentation
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Timer totals with per-call means and their share of match time.
+
+        Time spent in the tick loop outside the measured tick phases (zone
+        updates, clock, recording) is reported as 'other'.
+
+        Returns:
+            Dictionary of timer name to total milliseconds, calls,
+            microseconds per call and fraction of match time
+        """
+        total = self.timers.get('match', [0, 0])[0]
+        rows = {}
+        for name, (nanoseconds, calls) in self.timers.items():
+            rows[name] = {
+                'ms': nanoseconds / 1e6,
+                'calls': calls,
+                'us_per_call': nanoseconds / calls / 1e3 if calls else 0.0,
+                'share': nanoseconds / total if total else 0.0,
+            }
+        if total:
+            other = total - sum(self.timers[name][0] for name in TICK_PHASES if name in self.timers)
+            rows['other'] = {'ms': other / 1e6, 'calls': 0, 'us_per_call': 0.0, 'share': other / total}
+        return rows
+
+
+def profile_fixture(seeds: List[int], factory: Callable) -> Optional[Instrumentation]:
+    """
+    Play one instrumented match per seed.
+
+    Runs in worker processes as well as inline; the caller's random state
+    is left untouched.
+
+    Args:
+        seeds: Replication seeds
+        factory: Picklable callable returning a new Match
+
+    Returns:
+        Measurements over all the matches, or None if there are no seeds
+    """
+    if not seeds:
+        return None
+    saved_state = random.getstate()
+    simulator = SimpleMatchSimulator(factory(), verbose=False)
+    instrumentation = Instrumentation()
+    instrumentation.attach(simulator)
+    try:
+        for seed in seeds:
+            simulator.reset(seed)
+            simulator.run()
+            instrumentation.matches += 1
+    finally:
+        instrumentation.detach(simulator)
+        random.setstate(saved_state)
+    return instrumentation
+
+
+def profile_matches(factory: Callable, seeds: List[int], workers: int = 0,
+                    chunk_size: int = 4) -> Optional[Instrumentation]:
+    """
+    Instrumented matches over a process pool, merged into one set of measurements.
+
+    Args:
+        factory: Picklable callable returning a new Match
+        seeds: One seed per match
+        workers: Number of worker processes (0 runs everything inline)
+        chunk_size: Matches per task
+
+    Returns:
+        Merged measurements, or None if there are no seeds
+    """
+    return parallel_analytics(profile_fixture, seeds, workers, chunk_size, factory=factory)
+
+
+if __name__ == "__main__":
+    from gamesim import create_sample_match
+
+    profile = profile_matches(create_sample_match, [0])
+    for name, row in sorted(profile.summary().items(), key=lambda item: -item[1]['ms']):
+        print(f"{name:16s} {row['ms']:9.1f} ms {row['calls']:8d} calls "
+              f"{row['us_per_call']:8.1f} us/call {row['share']:6.1%}")
+    for name, count in sorted(profile.counters.items()):
+        print(f"{name:24s} {count:8d}")
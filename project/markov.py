@@ -0,0 +1,133 @@
+# exact scoreline distribution of the possession chain by dynamic programming
+from typing import Any, Dict, Optional
+import numpy as np
+from states import Match
+from predict import ActionOutcomePredictor
+from coarse import (ZONES, MIDDLE, ACTION_SECONDS, MATCH_SECONDS, ACTION_OUTCOMES,
+                    _NEXT_ZONE, _SWITCHES, _SCORES, transition_table)
+
+MAX_GOALS = 15  # Goals per side tracked exactly; higher scores are pooled at the cap
+ACTIONS = int(MATCH_SECONDS / ACTION_SECONDS)
+
+
+def chain_moves(table: np.ndarray) -> np.ndarray:
+    """
+    Possession-state transition matrices of the chain, split by who scores.
+
+    States are (team in possession, zone) flattened to side * zones + zone.
+
+    Args:
+        table: Output of coarse.transition_table
+
+    Returns:
+        Array of shape (3, states, states): moves without a goal, moves on
+        a home goal and moves on an away goal; together each row sums to 1
+    """
+    n_zones = len(ZONES)
+    moves = np.zeros((3, 2 * n_zones, 2 * n_zones))
+    for side in range(2):
+        for zone in range(n_zones):
+            for outcome in range(len(ACTION_OUTCOMES)):
+                next_side = 1 - side if _SWITCHES[outcome] else side
+                kind = 1 + side if _SCORES[outcome] else 0
+                moves[kind, side * n_zones + zone, next_side * n_zones + _NEXT_ZONE[zone, outcome]] += \
+                    table[side, zone, outcome]
+    return moves
+
+
+def scoreline_distribution(table: np.ndarray, actions: int = ACTIONS,
+                           max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Exact final-score distribution of coarse.simulate_chains.
+
+    Carries the probability of every (first kickoff, home goals, away goals,
+    possession state) forward one on-ball action at a time, applying the
+    half-time kickoff at the same step as the sampler.
+
+    Args:
+        table: Output of coarse.transition_table
+        actions: On-ball actions per match
+        max_goals: Largest goal count per side kept separately
+
+    Returns:
+        Matrix of shape (max_goals + 1, max_goals + 1), [home goals, away goals]
+    """
+    n_zones = len(ZONES)
+    stay, home_goal, away_goal = chain_moves(table)
+    size = max_goals + 1
+
+    # Leading axis: which team kicked off the first half (even odds)
+    dist = np.zeros((2, size, size, 2 * n_zones))
+    for kickoff in range(2):
+        dist[kickoff, 0, 0, kickoff * n_zones + MIDDLE] = 0.5
+
+    for step in range(actions):
+        if step == actions // 2:
+            scores = dist.sum(axis=3)
+            dist = np.zeros_like(dist)
+            for kickoff in range(2):
+                dist[kickoff, :, :, (1 - kickoff) * n_zones + MIDDLE] = scores[kickoff]
+
+        after = dist @ stay
+        scored = dist @ home_goal
+        after[:, 1:] += scored[:, :-1]
+        after[:, -1] += scored[:, -1]
+        scored = dist @ away_goal
+        after[:, :, 1:] += scored[:, :, :-1]
+        after[:, :, -1] += scored[:, :, -1]
+        dist = after
+
+    return dist.sum(axis=(0, 3))
+
+
+def solve_match(match: Match, predictor: Optional[ActionOutcomePredictor] = None,
+                max_goals: int = MAX_GOALS) -> Dict[str, Any]:
+    """
+    Exact result and scoreline probabilities of the coarse model for a fixture.
+
+    Args:
+        match: The fixture (current lineups and tactics are read)
+        predictor: Source of success probabilities (a default one if None)
+        max_goals: Largest goal count per side kept separately
+
+    Returns:
+        Dictionary with expected goals for each side, the scoreline matrix,
+        home_win/draw/away_win probabilities, the most likely scoreline and
+        the probability pooled at the goal cap
+    """
+    matrix = scoreline_distribution(transition_table(match, predictor), max_goals=max_goals)
+    goals = np.arange(max_goals + 1)
+    likeliest = np.unravel_index(matrix.argmax(), matrix.shape)
+    return {
+        'home_goals': float(matrix.sum(axis=1) @ goals),
+        'away_goals': float(matrix.sum(axis=0) @ goals),
+        'scorelines': matrix,
+        'home_win': float(np.tril(matrix, -1).sum()),
+        'draw': float(np.trace(matrix)),
+        'away_win': float(np.triu(matrix, 1).sum()),
+        'likeliest_score': (int(likeliest[0]), int(likeliest[1])),
+        'capped': float(matrix[-1].sum() + matrix[:, -1].sum() - matrix[-1, -1])
+    }
+
+
+def cross_check(solution: Dict[str, Any], estimate: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare a Monte Carlo estimate with the exact answer.
+
+    Args:
+        solution: Output of solve_match
+        estimate: AdaptiveMonteCarlo.estimate() of the same fixture on the coarse engine
+
+    Returns:
+        Per result and mean goals: the exact value, the estimate, its 95%
+        interval and whether the interval covers the exact value
+    """
+    rows = {}
+    for name in ('home_win', 'draw', 'away_win'):
+        interval = estimate['intervals'][name]
+        rows[name] = (solution[name], estimate[name], interval)
+    for name in ('home_goals', 'away_goals'):
+        rows[name] = (solution[name], estimate[name]['mean'], estimate[name]['interval'])
+    return {name: {'exact': exact, 'estimate': value, 'interval': interval,
+                   'inside': interval[0] <= exact <= interval[1]}
+            for name, (exact, value, interval) in rows.items()}
@@ -0,0 +1,185 @@
+# online match statistics updated during the tick loop
+import numpy as np
+from typing import Dict, List, Optional
+from states import Match
+
+# Per-team counters, one row per team (home, away)
+TEAM_STATS = (
+    'possession_seconds',
+    'passes', 'passes_completed', 'passes_intercepted',
+    'shots', 'shots_on_target', 'goals_from_shots', 'xg',
+    'dribbles', 'dribbles_completed', 'dispossessed',
+)
+_COLUMN = {name: i for i, name in enumerate(TEAM_STATS)}
+
+HOME, AWAY = 0, 1
+
+
+class MatchStats:
+    """
+    Running team and player statistics for one or more matches.
+
+    Counters are updated as things happen instead of being derived from
+    the event log afterwards: possession time and distance covered once
+    per tick through update(), and pass, shot and dribble counts and xG
+    through on_outcome(), which the ActionOutcomePredictor calls for every
+    outcome it decides. Each update touches a fixed number of counters, so
+    the cost per tick does not grow with the length of the match.
+
+    Stats for the same fixture can be merged, which makes Monte Carlo
+    aggregates a sum over replications; to_array() flattens everything
+    into one float vector for storage or stacking.
+    """
+
+    def __init__(self, match: Match):
+        """
+        Initialize empty statistics for a match's squads.
+
+        Args:
+            match: The match whose teams and players are tracked
+        """
+        self.match = match
+        self.matches = 1
+        self.player_ids = [p.player_id for p in match.home_team.players + match.away_team.players]
+        self._player_index = {p: i for i, p in
+                              enumerate(match.home_team.players + match.away_team.players)}
+        self.team = np.zeros((2, len(TEAM_STATS)))
+        self.distance = np.zeros(len(self.player_ids))
+
+    def reset(self):
+        """Clear all counters (for reuse with a reset match)"""
+        self.matches = 1
+        self.team[:] = 0.0
+        self.distance[:] = 0.0
+
+    def _side(self, team) -> int:
+        return HOME if team == self.match.home_team else AWAY
+
+    # ---- Updates ----
+
+    def update(self, match: Match, dt: float):
+        """
+        Add one tick of possession time and running distance.
+
+        Args:
+            match: The current match state
+            dt: Length of the tick in seconds
+        """
+        holder = match.ball.possession_team
+        if holder is not None:
+            self.team[self._side(holder), 0] += dt
+
+        players = match.geometry.entities[:-1]
+        velocities = np.array([p.velocity for p in players])
+        rows = [self._player_index[p] for p in players]
+        self.distance[rows] += np.hypot(velocities[:, 0], velocities[:, 1]) * dt
+
+    def on_outcome(self, kind: str, player, success: bool, outcome: str, details: Dict):
+        """
+        Count an action outcome decided by the predictor.
+
+        Args:
+            kind: 'pass', 'shot' or 'dribble'
+            player: The player who attempted the action
+            success: Whether the action succeeded
+            outcome: The predictor's outcome type
+            details: The predictor's outcome details
+        """
+        row = self.team[self._side(player.team)]
+        if kind == 'pass':
+            if outcome == 'no_target':
+                return
+            row[_COLUMN['passes']] += 1
+            row[_COLUMN['passes_completed']] += success
+            row[_COLUMN['passes_intercepted']] += outcome == 'intercepted'
+        elif kind == 'shot':
+            row[_COLUMN['shots']] += 1
+            row[_COLUMN['shots_on_target']] += outcome in ('goal', 'saved')
+            row[_COLUMN['goals_from_shots']] += outcome == 'goal'
+            row[_COLUMN['xg']] += details.get('xg', 0.0)
+        elif kind == 'dribble':
+            row[_COLUMN['dribbles']] += 1
+            row[_COLUMN['dribbles_completed']] += success
+            row[_COLUMN['dispossessed']] += outcome == 'dispossessed'
+
+    # ---- Aggregation ----
+
+    def merge(self, other: 'MatchStats') -> 'MatchStats':
+        """
+        Add another set of statistics for the same squads into this one.
+
+        Args:
+            other: Statistics from another replication of the fixture
+
+        Returns:
+            This object, for chaining
+        """
+        if other.player_ids != self.player_ids:
+            raise ValueError("Cannot merge statistics for different squads")
+        self.matches += other.matches
+        self.team += other.team
+        self.distance += other.distance
+        return self
+
+    def column_names(self) -> List[str]:
+        """Labels for the entries of to_array()"""
+        return (['matches'] +
+                [f'{side}_{name}' for side in ('home', 'away') for name in TEAM_STATS] +
+                [f'distance_{player_id}' for player_id in self.player_ids])
+
+    def to_array(self) -> np.ndarray:
+        """
+        Flatten the statistics: match count, home and away team counters, then player distances.
+
+        Returns:
+            float64 vector labelled by column_names()
+        """
+        return np.concatenate(([self.matches], self.team.ravel(), self.distance))
+
+    def load_array(self, values: np.ndarray) -> 'MatchStats':
+        """
+        Set the statistics from a vector produced by to_array() for the same squads.
+
+        Args:
+            values: Flat statistics vector
+
+        Returns:
+            This object, for chaining
+        """
+        n_team = self.team.size
+        self.matches = int(values[0])
+        self.team[:] = np.reshape(values[1:1 + n_team], self.team.shape)
+        self.distance[:] = values[1 + n_team:]
+        return self
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-match averages for each team, with possession as a share of the ball-held time.
+
+        Returns:
+            Dictionary of team name to statistic averages
+        """
+        held = self.team[:, 0].sum()
+        summary = {}
+        for side, team in ((HOME, self.match.home_team), (AWAY, self.match.away_team)):
+            stats = {name: float(value) / self.matches for name, value in zip(TEAM_STATS, self.team[side])}
+            stats['possession'] = float(self.team[side, 0] / held) if held else 0.5
+            stats['distance'] = float(self.team_distance(side)) / self.matches
+            summary[team.name] = stats
+        return summary
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the statistics arrays"""
+        return self.team.nbytes + self.distance.nbytes
+
+    def team_distance(self, side: int) -> float:
+        """Total distance covered by one side's squad (HOME or AWAY)"""
+        n_home = len(self.match.home_team.players)
+        return float(self.distance[:n_home].sum() if side == HOME else self.distance[n_home:].sum())
+
+    def player_distance(self, player_id: str) -> Optional[float]:
+        """Distance covered by a player, or None if they are not in the squads"""
+        if player_id not in self.player_ids:
+            return None
+        return float(self.distance[self.player_ids.index(player_id)])
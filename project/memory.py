@@ -0,0 +1,310 @@
+# memory footprint of match objects, for sizing large ensemble runs
+import os
+import random
+import sys
+import tracemalloc
+from enum import Enum
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Process-wide caches of the engines, as (module, attribute); measured only if the module is loaded
+MODULE_CACHES = (
+    ('montecarlo', '_fixture_matches'),
+    ('coarse', '_fixture_tables'),
+    ('surrogate', '_query_matches'),
+    ('surrogate', 'SHARED_SURROGATE'),
+)
+MAX_CACHED_FIXTURES = 8  # Entries kept per engine cache before the least recently used is dropped
+
+
+def cached(cache: Dict, key: Any, build: Callable[[], Any], limit: int = MAX_CACHED_FIXTURES) -> Any:
+    """
+    Look up an entry of a bounded per-process cache, building it if missing.
+
+    The cache is a plain dict kept in least-recently-used order: hits move
+    to the end and the oldest entries are dropped once limit is exceeded.
+
+    Args:
+        cache: The module-level cache
+        key: Entry key (a factory or skeleton)
+        build: Called with no arguments to make a missing entry
+        limit: Most entries to keep
+
+    Returns:
+        The cached or newly built entry
+    """
+    value = cache.pop(key, None)
+    if value is None:
+        value = build()
+    cache[key] = value
+    while len(cache) > limit:
+        del cache[next(iter(cache))]
+    return value
+
+
+def deep_sizeof(obj, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes held by an object and everything reachable from it.
+
+    Follows instance dictionaries and __slots__, containers and numpy
+    arrays (counting the data buffer only for arrays that own it). Objects
+    shared by every match - enum members, classes, modules, functions and
+    cached small integers - are not counted. Pass the same seen set when
+    measuring several objects so shared parts are counted once.
+
+    Args:
+        obj: The object to measure
+        seen: Ids of objects already counted
+
+    Returns:
+        Size in bytes
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if (item is None or isinstance(item, (Enum, type, ModuleType, FunctionType, bool)) or
+                (type(item) is int and -5 <= item <= 256)):
+            continue
+
+        total += sys.getsizeof(item)
+        if isinstance(item, np.ndarray):
+            # getsizeof already includes the buffer of arrays that own their data
+            if item.base is not None:
+                stack.append(item.base)
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+
+        instance_dict = getattr(item, '__dict__', None)
+        if instance_dict is not None and not isinstance(item, type):
+            stack.append(instance_dict)
+        for klass in type(item).__mro__:
+            for slot in klass.__dict__.get('__slots__', ()):
+                if hasattr(item, slot) and slot not in ('__dict__', '__weakref__'):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+def match_footprint(factory: Callable, n: int = 100) -> Dict[str, float]:
+    """
+    Average memory held per match for many live matches.
+
+    All matches are kept alive while measuring, so shared objects such as
+    interned strings are counted once rather than once per match.
+
+    Args:
+        factory: Callable returning a new Match
+        n: Number of matches to build
+
+    Returns:
+        Dictionary with bytes per match and per player
+    """
+    matches = [factory() for _ in range(n)]
+    seen = set()
+    total = sum(deep_sizeof(match, seen) for match in matches)
+    players = sum(len(m.home_team.players) + len(m.away_team.players) for m in matches)
+    return {
+        'matches': n,
+        'bytes_per_match': total / n,
+        'bytes_per_player': total / players if players else 0.0
+    }
+
+
+def simulator_memory(simulator) -> Dict[str, int]:
+    """
+    Bytes held by one simulated match, split by what holds them.
+
+    Each part is counted once: the match state excludes the event log and
+    the geometry caches, and the engine (decision model, predictor, event
+    loop) excludes the match and the statistics. A tracking recorder's
+    buffers are memory-mapped files, so they are reported separately from
+    its sizes on the heap.
+
+    Args:
+        simulator: A SimpleMatchSimulator, typically after a run
+
+    Returns:
+        Dictionary with bytes for match_state, engine, event_store,
+        decision_history, caches, statistics and recording, their total,
+        and tracking_mapped
+    """
+    match = simulator.match
+    parts = {
+        'event_store': [match.events],
+        'decision_history': [simulator.decision_system.state_history],
+        'caches': [match._geometry, match._pitch_control],
+        'statistics': [simulator.stats],
+        'recording': [simulator.recorder],
+    }
+    seen = {id(obj) for objects in parts.values() for obj in objects if obj is not None}
+    sizes = {'match_state': deep_sizeof(match, seen), 'engine': deep_sizeof(simulator, seen)}
+    for name, objects in parts.items():
+        sizes[name] = 0
+        for obj in objects:
+            if obj is not None:
+                seen.discard(id(obj))
+                sizes[name] += deep_sizeof(obj, seen)
+    sizes['total'] = sum(sizes.values())
+    sizes['tracking_mapped'] = simulator.recorder.nbytes if simulator.recorder is not None else 0
+    return sizes
+
+
+def module_caches() -> Dict[str, int]:
+    """Bytes held by the engines' process-wide caches (see MODULE_CACHES), for loaded modules"""
+    seen = set()
+    sizes = {}
+    for module_name, attribute in MODULE_CACHES:
+        module = sys.modules.get(module_name)
+        if module is not None and hasattr(module, attribute):
+            sizes[f'{module_name}.{attribute}'] = deep_sizeof(getattr(module, attribute), seen)
+    return sizes
+
+
+def traced_allocations(function: Callable, *args, top: int = 10, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Call a function under tracemalloc and report what it allocated.
+
+    Tracing is started for the call unless it is already running, in
+    which case it is left on.
+
+    Args:
+        function: Function to call
+        *args: Its positional arguments
+        top: Number of source files to list by allocated bytes
+        **kwargs: Its keyword arguments
+
+    Returns:
+        Tuple of (the function's result, dictionary with bytes still
+        allocated after the call, the peak during it and the top source
+        files by bytes allocated)
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    try:
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        result = function(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    by_file = after.compare_to(before, 'filename')[:top]
+    return result, {
+        'allocated': current - start_bytes,
+        'peak': peak - start_bytes,
+        'top_files': [(os.path.basename(stat.traceback[0].filename), stat.size_diff) for stat in by_file],
+    }
+
+
+def ensemble_memory(factory: Callable, n: int = 4, seconds: Optional[float] = None,
+                    seed: int = 0) -> Dict[str, Any]:
+    """
+    Memory per match with many played matches held at once, as in an ensemble run.
+
+    Every match is built and played under tracemalloc and kept alive until
+    all are done, then each is also measured part by part. Tracing slows
+    play several times over, so seconds can cap the play per match (the
+    event store grows with match time).
+
+    Args:
+        factory: Callable returning a new Match
+        n: Number of matches
+        seconds: Match seconds to play each (None for full matches)
+        seed: Seed of the first match (match i uses seed + i)
+
+    Returns:
+        Dictionary with traced bytes per match, the peak while playing,
+        the top allocating files, mean bytes per match by category (see
+        simulator_memory) and the engines' module caches
+    """
+    from gamesim import SimpleMatchSimulator
+
+    def play() -> List:
+        simulators = []
+        for i in range(n):
+            random.seed(seed + i)
+            simulator = SimpleMatchSimulator(factory(), verbose=False)
+            simulator.reset(seed + i)
+            simulator.run(until=seconds)
+            simulators.append(simulator)
+        return simulators
+
+    saved_state = random.getstate()
+    try:
+        simulators, traced = traced_allocations(play)
+    finally:
+        random.setstate(saved_state)
+
+    per_match = [simulator_memory(simulator) for simulator in simulators]
+    return {
+        'matches': n,
+        'seconds': seconds,
+        'traced_bytes_per_match': traced['allocated'] / n,
+        'peak_bytes': traced['peak'],
+        'top_files': traced['top_files'],
+        'categories': {name: sum(sizes[name] for sizes in per_match) / n for name in per_match[0]},
+        'module_caches': module_caches(),
+    }
+
+
+def budget_violations(report: Dict[str, Any], budget: float) -> List[str]:
+    """
+    Ways an ensemble_memory report exceeds a per-match memory budget.
+
+    Both the traced allocation and the accounted total per match are
+    checked against the budget.
+
+    Args:
+        report: Output of ensemble_memory
+        budget: Bytes allowed per match
+
+    Returns:
+        One message per exceeded measure (empty if within budget)
+    """
+    measures = {'traced': report['traced_bytes_per_match'], 'accounted': report['categories']['total']}
+    return [f"{name} memory per match {value:.0f} B exceeds the budget of {budget:.0f} B"
+            for name, value in measures.items() if value > budget]
+
+
+if __name__ == "__main__":
+    import argparse
+    from gamesim import create_sample_match
+
+    parser = argparse.ArgumentParser(description="Report memory per match")
+    parser.add_argument('--matches', type=int, default=2, help="played matches held at once")
+    parser.add_argument('--seconds', type=float, help="match seconds to play each (default: full match)")
+    parser.add_argument('--budget', type=float, help="bytes allowed per match; exit 1 if exceeded")
+    args = parser.parse_args()
+
+    footprint = match_footprint(create_sample_match)
+    print(f"{footprint['bytes_per_match']:.0f} bytes per new match "
+          f"({footprint['bytes_per_player']:.0f} per player, {footprint['matches']} matches)")
+
+    report = ensemble_memory(create_sample_match, args.matches, args.seconds)
+    print(f"{report['traced_bytes_per_match']:.0f} bytes traced per played match, "
+          f"peak {report['peak_bytes']:.0f} bytes for {report['matches']}")
+    for name, size in report['categories'].items():
+        print(f"  {name:18s} {size:12.0f}")
+    for name, size in report['module_caches'].items():
+        print(f"  {name:32s} {size:12.0f}")
+
+    if args.budget is not None:
+        violations = budget_violations(report, args.budget)
+        for message in violations:
+            print(message)
+        sys.exit(1 if violations else 0)
@@ -0,0 +1,278 @@
+# adaptive Monte Carlo over many fixtures with confidence-interval stopping
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from gamesim import run_replications
+from inplay import OUTCOMES, count_outcomes, wilson_interval
+from surrogate import sample_fixture
+from coarse import coarse_fixture
+from memory import cached
+
+# Matches built inside this process, keyed by factory (most recent few), reset between replications
+_fixture_matches = {}
+
+
+def simulate_fixture(factory: Callable, seeds: List[int]) -> List[Tuple[int, int]]:
+    """
+    Play one full match per seed with the match simulator.
+
+    Runs in worker processes as well as inline. The match is built once per
+    factory and process (only the most recently used few are kept) and reset before every replication, and the
+    caller's random state is left untouched.
+
+    Args:
+        factory: Picklable callable returning a new Match
+        seeds: One random seed per replication
+
+    Returns:
+        List of (home_goals, away_goals) final scores
+    """
+    match = cached(_fixture_matches, factory, factory)
+
+    saved_state = random.getstate()
+    try:
+        return run_replications(match, seeds)
+    finally:
+        random.setstate(saved_state)
+
+
+# Replication runners by engine name; each is called as runner(factory, seeds)
+ENGINES = {
+    'simulation': simulate_fixture,
+    'surrogate': sample_fixture,  # Fast mode: draws from the fitted scoreline model
+    'coarse': coarse_fixture,  # Fast mode: possession chains calibrated to the full engine
+}
+
+# Engines cheap enough to run in the coordinating process even with a pool
+# (the surrogate's calibration then lives in one place, not in every worker)
+INLINE_ENGINES = {'surrogate', 'coarse'}
+
+
+def _timed_batch(runner: Callable, factory: Callable, seeds: List[int]) -> Tuple[List[Tuple[int, int]], float]:
+    """Run a batch and report the wall-clock seconds it took"""
+    start = time.perf_counter()
+    results = runner(factory, seeds)
+    return results, time.perf_counter() - start
+
+
+class Fixture:
+    """A match to estimate: how to build it and which engine plays it"""
+
+    def __init__(self, name: str, factory: Callable, engine: str = 'simulation'):
+        """
+        Initialize a fixture.
+
+        Args:
+            name: Label for the fixture in the results
+            factory: Picklable callable returning a new Match
+            engine: Key into ENGINES
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self.name = name
+        self.factory = factory
+        self.engine = engine
+
+        # Sampling state, filled by AdaptiveMonteCarlo
+        self.results = []
+        self.spent = 0.0
+        self.in_flight = 0
+        self.stop_reason = None
+
+    @property
+    def done(self) -> bool:
+        """Whether sampling has stopped for this fixture"""
+        return self.stop_reason is not None
+
+
+class AdaptiveMonteCarlo:
+    """
+    Estimates result and scoreline probabilities for many fixtures at once.
+
+    Replications are played in batches. After every batch the fixture's
+    win/draw/loss confidence intervals are recomputed, and the fixture stops
+    once every interval is tight enough, it reaches its sample cap or it has
+    used its share of worker time. With a process pool, batches are handed
+    out one at a time as workers free up, always to the unfinished fixture
+    with the fewest samples, so workers move from converged fixtures to
+    the ones that still need samples.
+    """
+
+    def __init__(self, workers: int = 0, batch_size: int = 8, min_samples: int = 32,
+                 max_samples: int = 2000, target_half_width: float = 0.03,
+                 fixture_budget: Optional[float] = None, time_budget: Optional[float] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the sampler.
+
+        Args:
+            workers: Worker processes to use (0 runs batches inline)
+            batch_size: Replications per batch
+            min_samples: Samples required before early stopping is considered
+            max_samples: Hard cap on samples per fixture
+            target_half_width: Stop once every 95% interval is at most this wide on each side
+            fixture_budget: Worker seconds allowed per fixture (None for no limit)
+            time_budget: Wall-clock seconds allowed for a whole run (None for no limit)
+            seed: Seed for the replication seeds (None for nondeterministic)
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.target_half_width = target_half_width
+        self.fixture_budget = fixture_budget
+        self.time_budget = time_budget
+
+        self._seeds = random.Random(seed)
+        self._executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- Stopping ----
+
+    def _half_width(self, fixture: Fixture) -> float:
+        """Widest half-width of the three result intervals"""
+        counts = count_outcomes(fixture.results)
+        n = len(fixture.results)
+        return max((hi - lo) / 2 for lo, hi in
+                   (wilson_interval(counts[name], n) for name in OUTCOMES))
+
+    def _update_stop(self, fixture: Fixture):
+        """Decide whether a fixture needs more samples"""
+        n = len(fixture.results)
+        if n >= self.min_samples and self._half_width(fixture) <= self.target_half_width:
+            fixture.stop_reason = 'converged'
+        elif n >= self.max_samples:
+            fixture.stop_reason = 'max_samples'
+        elif self.fixture_budget is not None and fixture.spent >= self.fixture_budget:
+            fixture.stop_reason = 'fixture_budget'
+
+    def _next_fixture(self, fixtures: List[Fixture]) -> Optional[Fixture]:
+        """Unfinished fixture with the fewest samples counting batches in flight"""
+        open_fixtures = [f for f in fixtures if not f.done and
+                         len(f.results) + f.in_flight * self.batch_size < self.max_samples]
+        if not open_fixtures:
+            return None
+        return min(open_fixtures, key=lambda f: len(f.results) + f.in_flight * self.batch_size)
+
+    def _batch_seeds(self) -> List[int]:
+        return [self._seeds.getrandbits(32) for _ in range(self.batch_size)]
+
+    # ---- Running ----
+
+    def _run_inline(self, fixture: Fixture):
+        """Play one batch of a fixture in this process"""
+        results, elapsed = _timed_batch(ENGINES[fixture.engine], fixture.factory, self._batch_seeds())
+        fixture.results.extend(results)
+        fixture.spent += elapsed
+        self._update_stop(fixture)
+
+    def run(self, fixtures: List[Fixture]) -> Dict[str, Dict[str, Any]]:
+        """
+        Sample every fixture until it converges or runs out of budget.
+
+        Args:
+            fixtures: Fixtures to estimate (their sampling state is reset)
+
+        Returns:
+            Dictionary of fixture name to its estimate (see estimate())
+        """
+        start = time.perf_counter()
+        for fixture in fixtures:
+            fixture.results, fixture.spent, fixture.in_flight, fixture.stop_reason = [], 0.0, 0, None
+
+        def out_of_time() -> bool:
+            return self.time_budget is not None and time.perf_counter() - start >= self.time_budget
+
+        if self._executor is None:
+            while not out_of_time():
+                fixture = self._next_fixture(fixtures)
+                if fixture is None:
+                    break
+                self._run_inline(fixture)
+        else:
+            pending = {}
+            while True:
+                # Keep every worker busy with the neediest fixtures
+                while len(pending) < self.workers and not out_of_time():
+                    fixture = self._next_fixture(fixtures)
+                    if fixture is None:
+                        break
+                    if fixture.engine in INLINE_ENGINES:
+                        self._run_inline(fixture)
+                        continue
+                    future = self._executor.submit(_timed_batch, ENGINES[fixture.engine],
+                                                   fixture.factory, self._batch_seeds())
+                    pending[future] = fixture
+                    fixture.in_flight += 1
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    fixture = pending.pop(future)
+                    fixture.in_flight -= 1
+                    # Batches finishing after a fixture stopped still count
+                    results, elapsed = future.result()
+                    fixture.results.extend(results)
+                    fixture.spent += elapsed
+                    if not fixture.done:
+                        self._update_stop(fixture)
+
+        for fixture in fixtures:
+            if not fixture.done:
+                fixture.stop_reason = 'time_budget'
+        return {fixture.name: self.estimate(fixture) for fixture in fixtures}
+
+    def estimate(self, fixture: Fixture, top_scorelines: int = 10) -> Dict[str, Any]:
+        """
+        Result and scoreline probabilities from a fixture's samples.
+
+        Args:
+            fixture: A sampled fixture
+            top_scorelines: Number of most likely scorelines to report
+
+        Returns:
+            Dictionary with home_win/draw/away_win probabilities and their 95%
+            intervals, the most likely scorelines with intervals, mean goals
+            with normal 95% intervals, the sample count, worker seconds spent
+            and why sampling stopped
+        """
+        results = fixture.results
+        n = len(results)
+        counts = count_outcomes(results)
+        estimate = {name: (counts[name] / n if n else 0.0) for name in OUTCOMES}
+        estimate['intervals'] = {name: wilson_interval(counts[name], n) for name in OUTCOMES}
+
+        scorelines = Counter(results)
+        estimate['scorelines'] = {
+            score: {'probability': count / n, 'interval': wilson_interval(count, n)}
+            for score, count in scorelines.most_common(top_scorelines)
+        }
+
+        for side, index in (('home_goals', 0), ('away_goals', 1)):
+            goals = [result[index] for result in results]
+            mean = sum(goals) / n if n else 0.0
+            variance = sum((g - mean) ** 2 for g in goals) / (n - 1) if n > 1 else 0.0
+            half_width = 1.96 * math.sqrt(variance / n) if n else 0.0
+            estimate[side] = {'mean': mean, 'interval': (mean - half_width, mean + half_width)}
+
+        estimate.update({
+            'samples': n,
+            'spent': fixture.spent,
+            'converged': fixture.stop_reason == 'converged',
+            'stop_reason': fixture.stop_reason
+        })
+        return estimate
@@ -0,0 +1,168 @@
+# vectorized off-ball movement and steering for both teams
+import numpy as np
+from typing import Iterable
+from states import Match, PlayingPosition
+from geometry import GOAL_POSITIONS
+
+JOG_FRACTION = 0.6  # Share of top speed a player can use without sprinting
+
+# Ball attraction
+PRESS_RADIUS = 15.0  # Defenders this close to the ball are drawn towards it
+SUPPORT_PULL = 0.15  # How far attackers drift from their slot towards the ball
+
+# Marking
+MARK_RADIUS = 15.0  # Defenders pick up the nearest attacker within this distance
+MARK_DISTANCE = 2.0  # Marker stands this far goal-side of the attacker
+MARK_WEIGHT = 0.6  # Blend between formation slot (0) and marking spot (1)
+
+# Separation
+SEPARATION_RADIUS = 3.0  # Players closer than this push apart
+SEPARATION_SPEED = 2.0  # Push speed at zero distance (units per second)
+
+
+def steering_velocities(positions: np.ndarray, targets: np.ndarray, speed_caps: np.ndarray,
+                        distances: np.ndarray, dt: float) -> np.ndarray:
+    """
+    Velocities that bring players to their targets without overshooting, plus separation.
+
+    Args:
+        positions: Player positions, shape (n, 2)
+        targets: Where each player wants to be, shape (n, 2)
+        speed_caps: Maximum speed per player, shape (n,)
+        distances: Pairwise player distances, shape (n, n)
+        dt: Time step in seconds
+
+    Returns:
+        Velocities, shape (n, 2)
+    """
+    to_target = targets - positions
+    gap = np.hypot(to_target[:, 0], to_target[:, 1])
+
+    # Arrive: cover the gap in one step if possible, otherwise run at the cap
+    speed = np.minimum(gap / dt, speed_caps)
+    velocities = to_target * (speed / np.where(gap > 0.0, gap, 1.0))[:, None]
+
+    # Separation: linear push away from everyone inside the radius
+    close = (distances < SEPARATION_RADIUS) & (distances > 0.0)
+    if close.any():
+        weight = np.where(close, SEPARATION_SPEED * (1.0 - distances / SEPARATION_RADIUS) /
+                          np.where(close, distances, 1.0), 0.0)
+        push = (positions * weight.sum(axis=1)[:, None]) - weight @ positions
+        velocities += push
+
+    # Separation may not push anyone past their cap
+    total = np.hypot(velocities[:, 0], velocities[:, 1])
+    over = total > speed_caps
+    if over.any():
+        velocities[over] *= (speed_caps[over] / total[over])[:, None]
+    return velocities
+
+
+def movement_targets(match: Match, players: list, positions: np.ndarray, targets: np.ndarray,
+                     outfield: np.ndarray, available: np.ndarray, distances: np.ndarray,
+                     ball_distances: np.ndarray, n_home: int) -> np.ndarray:
+    """
+    Where every player wants to be this tick.
+
+    Starts from the formation slot, draws the attacking team slightly
+    towards the ball in support, moves defenders goal-side of the nearest
+    attacker and pulls the defending team's nearby players towards the
+    ball according to pressing_intensity. Marking assignments are stored
+    on the players.
+
+    Args:
+        match: The current match state
+        players: Players in geometry order
+        positions: Their positions, shape (n, 2)
+        targets: Formation slot targets, shape (n, 2); updated in place
+        outfield: Available outfield players, shape (n,)
+        available: Available players, shape (n,)
+        distances: Pairwise player distances, shape (n, n)
+        ball_distances: Distance from each player to the ball, shape (n,)
+        n_home: Number of home players at the start of the list
+
+    Returns:
+        Target positions, shape (n, 2)
+    """
+    n = len(players)
+    ball = match.ball.position
+    home, away = match.home_team, match.away_team
+    is_home = np.arange(n) < n_home
+
+    # Nobody defends a loose ball in particular
+    if home.possession or away.possession:
+        defending = outfield & (is_home != home.possession)
+    else:
+        defending = np.zeros(n, dtype=bool)
+
+    # Attacking side drifts towards the ball in support
+    targets += (SUPPORT_PULL * (outfield & ~defending))[:, None] * (ball - targets)
+
+    # Marking: each defender takes the nearest available attacker in range
+    if defending.any():
+        opponent = (is_home[:, None] != is_home[None, :]) & available[None, :]
+        block = np.where(opponent, distances, np.inf)
+        nearest = block.argmin(axis=1)
+        marking = defending & (block[np.arange(n), nearest] < MARK_RADIUS)
+
+        attackers = positions[nearest]
+        goal_side = np.where(is_home[:, None], GOAL_POSITIONS[0], GOAL_POSITIONS[1]) - attackers
+        goal_side /= np.maximum(np.hypot(goal_side[:, 0], goal_side[:, 1]), 1e-9)[:, None]
+        spot = attackers + MARK_DISTANCE * goal_side
+        targets += (MARK_WEIGHT * marking)[:, None] * (spot - targets)
+
+        for p, k, marks in zip(players, nearest.tolist(), marking.tolist()):
+            p.marking_assignment = players[k] if marks else None
+    else:
+        for p in players:
+            p.marking_assignment = None
+
+    # Pressing: defenders near the ball close it down, harder with more intensity
+    intensity = np.where(is_home, home.tactics['pressing_intensity'],
+                         away.tactics['pressing_intensity']) / 100.0
+    pull = defending * intensity * np.maximum(0.0, 1.0 - ball_distances / PRESS_RADIUS)
+    targets += pull[:, None] * (ball - targets)
+
+    return targets
+
+
+def update_off_ball_velocities(match: Match, dt: float, exclude: Iterable = ()):
+    """
+    Set the velocity of every off-ball player in both teams in one array pass.
+
+    Speeds are capped by pace through Player.max_speed, and players who
+    cannot sprint (low stamina) are held to a jog.
+
+    Args:
+        match: The current match state
+        dt: Time step in seconds
+        exclude: Players whose velocity is controlled elsewhere (the ball
+                 carrier, players chasing a loose ball)
+    """
+    geometry = match.geometry
+    players = geometry.entities[:-1]
+    if not players:
+        return
+    n = len(players)
+    positions = geometry.positions[:n]
+
+    # One pass over the players for everything the array code needs
+    excluded = set(exclude)
+    targets, available, outfield, speed_caps, steered = [], [], [], [], []
+    for p in players:
+        is_available = p.is_available()
+        targets.append(p.formation_position if p.formation_position is not None else p.position)
+        available.append(is_available)
+        outfield.append(is_available and p.assigned_position != PlayingPosition.GK)
+        speed_caps.append(p.max_speed() * (1.0 if p.sprint_available else JOG_FRACTION))
+        steered.append(is_available and p not in excluded)
+
+    targets = movement_targets(match, players, positions, np.array(targets, dtype=float),
+                               np.array(outfield), np.array(available),
+                               geometry.distances[:n, :n], geometry.ball_distances, geometry.n_home)
+    velocities = steering_velocities(positions, targets, np.array(speed_caps),
+                                     geometry.distances[:n, :n], dt)
+
+    for player, velocity, steer in zip(players, velocities, steered):
+        if steer:
+            player.velocity = velocity
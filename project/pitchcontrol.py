@@ -0,0 +1,174 @@
+# grid-based pitch control and open-space surface
+import numpy as np
+
+DEFAULT_GRID_SIZE = 20  # Cells along each axis of the 0-100 pitch
+REACTION_TIME = 0.7  # Seconds a player keeps running on their current velocity
+CONTROL_TEMPERATURE = 0.75  # Seconds; smaller makes control flip more sharply between teams
+REFRESH_TOLERANCE = 0.5  # Players whose projected position moved less than this keep their cached row
+OPEN_SPACE_RADIUS = 10.0
+
+
+class PitchControl:
+    """
+    Probability that each team controls every cell of a grid over the pitch.
+
+    Every player's arrival time at every cell is estimated from where they
+    will be after a short reaction time (position plus velocity) and their
+    top speed. A team's strength at a cell is the sum of exp(-time / T)
+    over its players, and home control is its share of the two strengths.
+
+    The (players x cells) weights are cached per player. On refresh only
+    the rows of players whose projected position moved by more than the
+    tolerance are recomputed, and refreshes happen only when the match's
+    positions (the same version counter as the geometry cache) or any
+    player's velocity changed, so every caller in a tick shares one surface.
+    """
+
+    def __init__(self, match, grid_size: int = DEFAULT_GRID_SIZE,
+                 tolerance: float = REFRESH_TOLERANCE):
+        """
+        Initialize the pitch control surface.
+
+        Args:
+            match: The Match whose players are tracked
+            grid_size: Number of cells along each axis
+            tolerance: Movement below which a player's cached row is reused
+        """
+        self.match = match
+        self.grid_size = grid_size
+        self.tolerance = tolerance
+
+        centres = (np.arange(grid_size) + 0.5) * 100.0 / grid_size
+        grid_x, grid_y = np.meshgrid(centres, centres)
+        self.cell_centres = np.column_stack((grid_x.ravel(), grid_y.ravel()))
+
+        # Per-player cache
+        self._version = None
+        self._velocities = np.zeros((0, 2))
+        self._players = []
+        self._available = []
+        self._n_home = 0
+        self._projected = np.zeros((0, 2))
+        self._weights = np.zeros((0, len(self.cell_centres)))
+        self._home_control = np.full(len(self.cell_centres), 0.5)
+
+        # Rows recomputed since creation (full rebuilds included)
+        self.rows_recomputed = 0
+
+    def _player_weights(self, projected: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+        """Control weights of several players over every cell, shape (k, cells)"""
+        delta = self.cell_centres[None, :, :] - projected[:, None, :]
+        arrival = REACTION_TIME + np.hypot(delta[..., 0], delta[..., 1]) / speeds[:, None]
+        return np.exp(-arrival / CONTROL_TEMPERATURE)
+
+    def refresh(self):
+        """Bring the surface up to date with the current player positions and velocities"""
+        home = self.match.home_team.lineup
+        players = home + self.match.away_team.lineup
+        version = self.match._positions_version
+        velocities = np.array([p.velocity for p in players], dtype=float).reshape(-1, 2)
+        # Positions are versioned by the match; velocities are set freely, so compare them
+        if version == self._version and np.array_equal(velocities, self._velocities):
+            return
+
+        available = [p.is_available() for p in players]
+        projected = np.array([p.position for p in players], dtype=float).reshape(-1, 2) + \
+            velocities * REACTION_TIME
+
+        if players != self._players or available != self._available:
+            # Lineup or availability changed - rebuild every row
+            speeds = np.array([p.max_speed() for p in players], dtype=float)
+            self._weights = self._player_weights(projected, speeds) * np.array(available)[:, None]
+            self._projected = projected
+            self._players = players
+            self._available = available
+            self._n_home = len(home)
+            self.rows_recomputed += len(players)
+        else:
+            moved = np.hypot(*(projected - self._projected).T) > self.tolerance
+            rows = np.flatnonzero(moved & np.array(available, dtype=bool))
+            if len(rows):
+                speeds = np.array([players[i].max_speed() for i in rows], dtype=float)
+                self._weights[rows] = self._player_weights(projected[rows], speeds)
+                self._projected[rows] = projected[rows]
+                self.rows_recomputed += len(rows)
+
+        home_strength = self._weights[:self._n_home].sum(axis=0)
+        total = home_strength + self._weights[self._n_home:].sum(axis=0)
+        self._home_control = np.divide(home_strength, total, out=np.full_like(total, 0.5),
+                                       where=total > 0)
+        self._version = version
+        self._velocities = velocities
+
+    def _team_control(self, team) -> np.ndarray:
+        """Flat per-cell control probability for a team"""
+        self.refresh()
+        if team == self.match.home_team:
+            return self._home_control
+        return 1.0 - self._home_control
+
+    def surface(self, team=None) -> np.ndarray:
+        """
+        Control probability over the grid.
+
+        Args:
+            team: Team to report control for (defaults to the home team)
+
+        Returns:
+            Array of shape (grid_size, grid_size) indexed [y, x]
+        """
+        control = self._team_control(team if team is not None else self.match.home_team)
+        return control.reshape(self.grid_size, self.grid_size)
+
+    def _cell_index(self, position: np.ndarray) -> int:
+        """Flat index of the cell containing a pitch position"""
+        cell = np.clip((np.asarray(position, dtype=float) * self.grid_size / 100.0).astype(int),
+                       0, self.grid_size - 1)
+        return int(cell[1] * self.grid_size + cell[0])
+
+    def control_at(self, position: np.ndarray, team) -> float:
+        """
+        Probability that a team controls the cell containing a position.
+
+        Args:
+            position: Pitch position
+            team: The team to report for
+
+        Returns:
+            Control probability between 0 and 1
+        """
+        return float(self._team_control(team)[self._cell_index(position)])
+
+    def controls_at(self, positions: np.ndarray, team) -> np.ndarray:
+        """
+        Control probabilities of a team at several positions with one refresh.
+
+        Args:
+            positions: Pitch positions, shape (k, 2)
+            team: The team to report for
+
+        Returns:
+            Array of k control probabilities
+        """
+        cells = np.clip((np.asarray(positions, dtype=float).reshape(-1, 2) * self.grid_size / 100.0).astype(int),
+                        0, self.grid_size - 1)
+        return self._team_control(team)[cells[:, 1] * self.grid_size + cells[:, 0]]
+
+    def open_space(self, player, radius: float = OPEN_SPACE_RADIUS) -> float:
+        """
+        Amount of open space around a player.
+
+        Args:
+            player: The player to measure around
+            radius: Radius of the neighbourhood in pitch units
+
+        Returns:
+            Mean control of the player's team over cells within the radius
+            (0 = smothered by opponents, 1 = all space owned by the team)
+        """
+        control = self._team_control(player.team)
+        delta = self.cell_centres - player.position
+        nearby = np.hypot(delta[:, 0], delta[:, 1]) <= radius
+        if not nearby.any():
+            return float(control[self._cell_index(player.position)])
+        return float(control[nearby].mean())
@@ -1,5 +1,6 @@
 # Statistics models to predict outcome during the game
 # currently implimented with simple probabilities, future to use player stats to dictate success rates
+import functools
 import random
 import numpy as np
 from typing import Optional, Dict, Any, Tuple
@@ -9,6 +10,19 @@ from states import (
     PhysicalState, BallAction
 )
 
+def _observed(kind: str):
+    """Report the (success, outcome, details) result of a predict_*_outcome method to the observers"""
+    def decorate(method):
+        @functools.wraps(method)
+        def predict(self, player, *args, **kwargs):
+            result = method(self, player, *args, **kwargs)
+            for observer in self.observers:
+                observer.on_outcome(kind, player, *result)
+            return result
+        return predict
+    return decorate
+
+
 class ActionOutcomePredictor:
     """
     Simple probability-based predictor for football action outcomes.
@@ -45,11 +59,19 @@ class ActionOutcomePredictor:
             # Default for other actions
             "DEFAULT": 0.75
         }
+        
+        # Random source for every roll (anything with the random module's
+        # interface; see variance.py for common and antithetic streams)
+        self.rng = random
+        
+        # Objects with an on_outcome(kind, player, success, outcome, details)
+        # method, told about every pass, shot and dribble outcome
+        self.observers = []
     
-    def predict_success(self, action: PlayerAction, player: Player, 
-                       context: Dict[str, Any]) -> bool:
+    def success_probability(self, action: PlayerAction, player: Player,
+                            context: Dict[str, Any]) -> float:
         """
-        Predict if an action will be successful.
+        Probability that an action succeeds.
         
         Args:
             action: The action being attempted
@@ -57,7 +79,7 @@ class ActionOutcomePredictor:
             context: Additional context (distance, pressure, etc.)
             
         Returns:
-            True if the action is successful, False otherwise
+            Success probability between 0.05 and 0.95
         """
         # Get base probability
         base_prob = self.base_probabilities.get(action, self.base_probabilities["DEFAULT"])
@@ -75,10 +97,23 @@ class ActionOutcomePredictor:
         final_probability = base_prob * attribute_modifier * context_modifier * stamina_modifier
         
         # Cap probability between 0.05 and 0.95 to avoid guarantees
-        final_probability = max(0.05, min(0.95, final_probability))
+        return max(0.05, min(0.95, final_probability))
+    
+    def predict_success(self, action: PlayerAction, player: Player, 
+                       context: Dict[str, Any]) -> bool:
+        """
+        Predict if an action will be successful.
         
+        Args:
+            action: The action being attempted
+            player: The player performing the action
+            context: Additional context (distance, pressure, etc.)
+            
+        Returns:
+            True if the action is successful, False otherwise
+        """
         # Roll the dice
-        return random.random() < final_probability
+        return self.rng.random() < self.success_probability(action, player, context)
     
     def _get_attribute_modifier(self, action: PlayerAction, player: Player) -> float:
         """
@@ -191,6 +226,7 @@ class ActionOutcomePredictor:
         # At full stamina, no penalty. At 0 stamina, performance is 70% of normal
         return 0.7 + (0.3 * stamina_percentage)
     
+    @_observed('pass')
     def predict_pass_outcome(self, player: Player, target_player: Optional[Player], 
                            match: Match) -> Tuple[bool, str, Dict[str, Any]]:
         """
@@ -209,7 +245,8 @@ class ActionOutcomePredictor:
             return False, "no_target", {}
         
         # Calculate distance between players
-        distance = np.linalg.norm(target_player.position - player.position)
+        geometry = match.geometry
+        distance = geometry.distance(player, target_player)
         
         # Check if it's a through pass or regular pass
         is_through_pass = False
@@ -224,8 +261,8 @@ class ActionOutcomePredictor:
         
         # Find nearest opponent to estimate pressure
         opponents = match.away_team.lineup if player.team == match.home_team else match.home_team.lineup
-        if opponents:
-            nearest_opponent_dist = min(np.linalg.norm(opp.position - player.position) for opp in opponents)
+        nearest_opponent, nearest_opponent_dist = geometry.nearest_opponent(player)
+        if nearest_opponent is not None:
             pressure = max(0.0, min(1.0, 1.0 - (nearest_opponent_dist / 10)))
         else:
             pressure = 0.0
@@ -276,18 +313,19 @@ class ActionOutcomePredictor:
         pass_success = self.predict_success(action, player, context)
         
         # Even if pass is successful, it might be intercepted
-        if pass_success and random.random() < interception_chance:
+        if pass_success and self.rng.random() < interception_chance:
             return False, "intercepted", {'interceptor': interceptor}
         
         if pass_success:
             return True, "completed", {'distance': distance}
         else:
             # Different failure types
-            if random.random() < 0.7:
+            if self.rng.random() < 0.7:
                 return False, "misplaced", {'distance': distance}
             else:
                 return False, "overhit", {'distance': distance}
     
+    @_observed('shot')
     def predict_shot_outcome(self, player: Player, match: Match) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Predict the outcome of a shot.
@@ -300,37 +338,16 @@ class ActionOutcomePredictor:
             Tuple of (success, outcome_type, details)
         """
         # Determine which goal the player is shooting at
-        if player.team == match.home_team:
-            goal_position = np.array([100.0, 50.0])  # Away team's goal
-        else:
-            goal_position = np.array([0.0, 50.0])    # Home team's goal
-        
-        # Calculate distance to goal
-        distance = np.linalg.norm(goal_position - player.position)
-        
-        # Calculate angle to goal
-        # First, get vector from player to goal
-        to_goal = goal_position - player.position
+        geometry = match.geometry
+        goal = geometry.attacking_goal(player)
         
-        # For angle calculation, we need to know which direction is "straight at goal"
-        straight_vector = np.array([1.0, 0.0]) if player.team == match.home_team else np.array([-1.0, 0.0])
-        
-        # Calculate angle between vectors (in degrees)
-        dot_product = np.dot(to_goal, straight_vector)
-        magnitudes = np.linalg.norm(to_goal) * np.linalg.norm(straight_vector)
-        
-        if magnitudes > 0:
-            cos_angle = dot_product / magnitudes
-            # Clamp to valid range due to potential floating-point errors
-            cos_angle = max(-1.0, min(1.0, cos_angle))
-            angle = np.arccos(cos_angle) * 180 / np.pi
-        else:
-            angle = 90  # Default to 90 degrees if vectors have zero magnitude
+        # Distance to goal and angle off the straight line at goal (in degrees)
+        distance = geometry.goal_distance(player, goal)
+        angle = geometry.goal_angle(player, goal)
         
         # Find nearest opponent to estimate pressure
-        opponents = match.away_team.lineup if player.team == match.home_team else match.home_team.lineup
-        if opponents:
-            nearest_opponent_dist = min(np.linalg.norm(opp.position - player.position) for opp in opponents)
+        nearest_opponent, nearest_opponent_dist = geometry.nearest_opponent(player)
+        if nearest_opponent is not None:
             pressure = max(0.0, min(1.0, 1.0 - (nearest_opponent_dist / 5)))
         else:
             pressure = 0.0
@@ -342,28 +359,12 @@ class ActionOutcomePredictor:
             'pressure': pressure
         }
         
-        # Check if shot is on target
-        on_target = self.predict_success(PlayerAction.SHOOT, player, context)
-        
-        if not on_target:
-            # Shot is off target
-            if random.random() < 0.6:
-                return False, "wide", {'distance': distance, 'angle': angle}
-            else:
-                return False, "over", {'distance': distance, 'angle': angle}
-        
-        # Shot is on target, check if it's a goal or saved
-        
         # Find goalkeeper
         if player.team == match.home_team:
             goalkeeper = next((p for p in match.away_team.lineup if p.assigned_position.name == "GK"), None)
         else:
             goalkeeper = next((p for p in match.home_team.lineup if p.assigned_position.name == "GK"), None)
         
-        # If no goalkeeper, shot automatically scores
-        if goalkeeper is None:
-            return True, "goal", {'distance': distance, 'angle': angle}
-        
         # Goalkeeper save probability
         # Base on distance, angle, and goalkeeper attributes
         save_context = {
@@ -377,18 +378,40 @@ class ActionOutcomePredictor:
         # Create modified context for the save attempt
         save_context['modifier'] = save_modifier
         
+        # Expected goals: on target and not saved (an empty goal cannot be saved)
+        on_target_probability = self.success_probability(PlayerAction.SHOOT, player, context)
+        save_probability = (self.success_probability(PlayerAction.SAVE_SHOT, goalkeeper, save_context)
+                            if goalkeeper is not None else 0.0)
+        xg = on_target_probability * (1.0 - save_probability)
+        
+        # Check if shot is on target
+        on_target = self.rng.random() < on_target_probability
+        
+        if not on_target:
+            # Shot is off target
+            if self.rng.random() < 0.6:
+                return False, "wide", {'distance': distance, 'angle': angle, 'xg': xg}
+            else:
+                return False, "over", {'distance': distance, 'angle': angle, 'xg': xg}
+        
+        # Shot is on target, check if it's a goal or saved
+        
+        # If no goalkeeper, shot automatically scores
+        if goalkeeper is None:
+            return True, "goal", {'distance': distance, 'angle': angle, 'xg': xg}
+        
         # Check if goalkeeper saves
-        save_success = self.predict_success(PlayerAction.SAVE_SHOT, goalkeeper, save_context)
+        save_success = self.rng.random() < save_probability
         
         if save_success:
             # Determine if it's a clean catch or a parry
-            if random.random() < 0.7:
-                return False, "saved", {'goalkeeper': goalkeeper, 'clean_catch': True}
+            if self.rng.random() < 0.7:
+                return False, "saved", {'goalkeeper': goalkeeper, 'clean_catch': True, 'xg': xg}
             else:
-                return False, "saved", {'goalkeeper': goalkeeper, 'clean_catch': False}
+                return False, "saved", {'goalkeeper': goalkeeper, 'clean_catch': False, 'xg': xg}
         else:
             # Goal!
-            return True, "goal", {'distance': distance, 'angle': angle}
+            return True, "goal", {'distance': distance, 'angle': angle, 'xg': xg}
     
     def predict_tackle_outcome(self, player: Player, target_player: Player, 
                              match: Match) -> Tuple[bool, str, Dict[str, Any]]:
@@ -404,7 +427,7 @@ class ActionOutcomePredictor:
             Tuple of (success, outcome_type, details)
         """
         # Calculate distance between players
-        distance = np.linalg.norm(target_player.position - player.position)
+        distance = match.geometry.distance(player, target_player)
         
         # If players are too far apart, tackle automatically fails
         if distance > 2.0:
@@ -441,14 +464,14 @@ class ActionOutcomePredictor:
                     foul_chance += 0.3
             
             # Check for foul
-            is_foul = random.random() < foul_chance
+            is_foul = self.rng.random() < foul_chance
             
             if is_foul:
                 # Determine if it's a card offense
                 yellow_card_chance = 0.3  # 30% chance of yellow card for a foul
                 
                 # Check for yellow card
-                is_yellow = random.random() < yellow_card_chance
+                is_yellow = self.rng.random() < yellow_card_chance
                 
                 return False, "foul", {'is_yellow_card': is_yellow}
             else:
@@ -458,6 +481,7 @@ class ActionOutcomePredictor:
             # Tackle failed - player dribbled past
             return False, "missed_tackle", {'beaten': True}
     
+    @_observed('dribble')
     def predict_dribble_outcome(self, player: Player, match: Match) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Predict the outcome of a dribble attempt.
@@ -470,16 +494,7 @@ class ActionOutcomePredictor:
             Tuple of (success, outcome_type, details)
         """
         # Find nearest opponent
-        opponents = match.away_team.lineup if player.team == match.home_team else match.home_team.lineup
-        
-        nearest_opponent = None
-        nearest_dist = float('inf')
-        
-        for opponent in opponents:
-            dist = np.linalg.norm(opponent.position - player.position)
-            if dist < nearest_dist:
-                nearest_dist = dist
-                nearest_opponent = opponent
+        nearest_opponent, nearest_dist = match.geometry.nearest_opponent(player)
         
         # Context for dribble success prediction
         context = {
@@ -493,9 +508,9 @@ class ActionOutcomePredictor:
             # Calculate new position after successful dribble
             # Move in attacking direction
             if player.team == match.home_team:
-                new_position = player.position + np.array([3.0, random.uniform(-1.0, 1.0)])
+                new_position = player.position + np.array([3.0, self.rng.uniform(-1.0, 1.0)])
             else:
-                new_position = player.position + np.array([-3.0, random.uniform(-1.0, 1.0)])
+                new_position = player.position + np.array([-3.0, self.rng.uniform(-1.0, 1.0)])
                 
             # Keep within pitch boundaries
             new_position[0] = max(0.0, min(100.0, new_position[0]))
@@ -0,0 +1,166 @@
+# continuous-time ball reception and interception solver
+import numpy as np
+from typing import Iterable, Optional
+from states import Match, PlayingPosition
+from ballphysics import flight_segments, travel, BoundaryCrossing, GRAVITY
+
+REACTION_TIME = 0.3  # Seconds before a player starts moving towards the ball
+CONTROL_RADIUS = 1.0  # Distance at which a player can take the ball
+REACH_HEIGHT = 2.0  # Highest ball (meters) an outfield player can control
+GOALKEEPER_REACH_HEIGHT = 2.6
+SAMPLE_RATE = 20  # Trajectory samples per second
+
+
+class Reception:
+    """First thing to happen to a free ball: a player reaching it, or the ball leaving the pitch"""
+
+    def __init__(self, time: float, player=None, position: Optional[np.ndarray] = None,
+                 crossing: Optional[BoundaryCrossing] = None,
+                 arrival_times: Optional[np.ndarray] = None, players: Optional[list] = None):
+        """
+        Initialize the reception result.
+
+        Args:
+            time: Seconds from now until the event
+            player: The first player to reach the ball, or None
+            position: Ball position at that moment
+            crossing: The boundary crossing, if the ball leaves the pitch first
+            arrival_times: Earliest arrival time of every candidate player (inf if never)
+            players: Candidate players in the same order as arrival_times
+        """
+        self.time = time
+        self.player = player
+        self.position = position
+        self.crossing = crossing
+        self.arrival_times = arrival_times
+        self.players = players if players is not None else []
+
+
+def sample_trajectory(position: np.ndarray, velocity: np.ndarray, height: float,
+                      vertical_velocity: float, times: np.ndarray):
+    """
+    Evaluate the exact free-ball trajectory at many times at once.
+
+    Args:
+        position: Starting position
+        velocity: Starting horizontal velocity
+        height: Starting height in meters
+        vertical_velocity: Starting vertical speed in m/s
+        times: Sorted sample times in seconds
+
+    Returns:
+        Tuple of (positions (T, 2), heights (T,), on_pitch (T,), crossing) where
+        on_pitch is False after the ball has left the pitch and crossing is the
+        BoundaryCrossing (or None)
+    """
+    positions = np.empty((len(times), 2))
+    positions[:] = position
+    heights = np.zeros(len(times))
+    on_pitch = np.ones(len(times), dtype=bool)
+    crossing = None
+    horizon = float(times[-1]) if len(times) else 0.0
+
+    end_time, end_state = 0.0, None
+    for start, step, state, decay, airborne, event, end in flight_segments(
+            position, velocity, height, vertical_velocity, horizon):
+        lo, hi = np.searchsorted(times, [start, start + step], side='left')
+        t = times[lo:hi] - start
+        p0, v0, h0, vz0 = state
+        positions[lo:hi] = p0 + travel(v0[None, :], decay, t[:, None])
+        if airborne:
+            heights[lo:hi] = np.maximum(0.0, h0 + vz0 * t - 0.5 * GRAVITY * t * t)
+        end_time, end_state = start + step, end
+        if event not in (None, 'land', 'stop'):
+            crossing = BoundaryCrossing(end_time, end[0].copy(), end[2], event)
+
+    # After the last segment the ball is at rest (or has left the pitch)
+    if end_state is not None:
+        rest = np.searchsorted(times, end_time, side='left')
+        positions[rest:] = end_state[0]
+        heights[rest:] = end_state[2]
+        if crossing is not None:
+            on_pitch[rest:] = False
+
+    return positions, heights, on_pitch, crossing
+
+
+def solve_reception(match: Match, horizon: float, exclude: Iterable = (),
+                    allow_players: bool = True) -> Optional[Reception]:
+    """
+    Find who reaches a free ball first, or whether it leaves the pitch first.
+
+    Every available player is assumed to run straight at the ball at top
+    speed after a short reaction time. The ball trajectory is sampled once
+    and compared against every player's reachable radius in one array pass;
+    each player's first reachable sample is refined by interpolation. A ball
+    crossing a line before anyone arrives is reported exactly, so nothing can
+    tunnel through players or the goal line at large time steps.
+
+    Args:
+        match: The current match state (the ball must not be in possession)
+        horizon: How far ahead to look in seconds
+        exclude: Players who may not take the ball (e.g. the player who just kicked it)
+        allow_players: False to only report the boundary crossing (e.g. for a shot
+                       whose outcome was already decided)
+
+    Returns:
+        A Reception, or None if nothing happens within the horizon
+    """
+    ball = match.ball
+    n_samples = max(2, int(np.ceil(horizon * SAMPLE_RATE)) + 1)
+    times = np.linspace(0.0, horizon, n_samples)
+    ball_positions, ball_heights, on_pitch, crossing = sample_trajectory(
+        ball.position, ball.velocity, ball.height, ball.vertical_velocity, times)
+
+    crossing_time = crossing.time if crossing is not None else np.inf
+    best_time, best_player = np.inf, None
+    arrival_times = None
+
+    geometry = match.geometry
+    excluded = set(exclude)
+    players = [p for p in geometry.entities[:-1] if p.is_available() and p not in excluded]
+    if allow_players and players:
+        rows = [geometry.index_of(p) for p in players]
+        player_positions = geometry.positions[rows]
+        max_speed = np.array([p.max_speed() for p in players])
+        reach_height = np.array([GOALKEEPER_REACH_HEIGHT if p.assigned_position == PlayingPosition.GK
+                                 else REACH_HEIGHT for p in players])
+
+        # (players, samples) distance to the ball vs distance the player can cover
+        delta = ball_positions[None, :, :] - player_positions[:, None, :]
+        distance = np.hypot(delta[..., 0], delta[..., 1])
+        reach = CONTROL_RADIUS + max_speed[:, None] * np.maximum(0.0, times - REACTION_TIME)[None, :]
+        slack = reach - distance
+        eligible = (ball_heights[None, :] <= reach_height[:, None]) & on_pitch[None, :]
+        can_reach = (slack >= 0.0) & eligible
+
+        reached = can_reach.any(axis=1)
+        first = can_reach.argmax(axis=1)
+        arrival_times = np.where(reached, times[first], np.inf)
+
+        # Interpolate between the last miss and the first hit for sub-sample timing
+        prev = np.maximum(first - 1, 0)
+        idx = np.arange(len(players))
+        slack_prev = slack[idx, prev]
+        slack_hit = slack[idx, first]
+        refine = reached & (first > 0) & eligible[idx, prev] & (slack_prev < 0.0)
+        fraction = np.where(refine, -slack_prev / np.where(refine, slack_hit - slack_prev, 1.0), 1.0)
+        arrival_times = np.where(refine, times[prev] + fraction * (times[first] - times[prev]),
+                                 arrival_times)
+
+        k = int(np.argmin(arrival_times))
+        if arrival_times[k] < np.inf:
+            best_time, best_player = float(arrival_times[k]), players[k]
+
+    if best_player is not None and best_time < crossing_time:
+        position_at, _, _, _ = sample_trajectory(
+            ball.position, ball.velocity, ball.height, ball.vertical_velocity,
+            np.array([best_time]))
+        return Reception(best_time, player=best_player, position=position_at[0],
+                         arrival_times=arrival_times, players=players)
+    if crossing is not None:
+        return Reception(crossing.time, position=crossing.position, crossing=crossing,
+                         arrival_times=arrival_times, players=players)
+    if arrival_times is not None:
+        return Reception(np.inf, arrival_times=arrival_times, players=players)
+    return None
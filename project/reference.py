@@ -0,0 +1,125 @@
+# full-engine results over a spread of fixture strengths, for calibrating the fast engines
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional
+from states import Match
+from gamesim import SimpleMatchSimulator, create_sample_match
+from matchstats import TEAM_STATS, HOME, AWAY
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'reference_fixtures.json')
+STRENGTH_SPREAD = 8.0  # Largest attribute offset of a reference team from the sample fixture
+_SHOTS = TEAM_STATS.index('shots')
+
+# Loaded reference sets, keyed by path
+_loaded = {}
+
+
+def reference_match(entry: Dict[str, Any]) -> Match:
+    """
+    Rebuild the match of a reference fixture.
+
+    The caller's random state is left untouched.
+
+    Args:
+        entry: One fixture of the reference set
+
+    Returns:
+        The fixture's Match, as it was simulated
+    """
+    saved_state = random.getstate()
+    try:
+        random.seed(entry['seed'])
+        return create_sample_match(entry['home_strength'], entry['away_strength'])
+    finally:
+        random.setstate(saved_state)
+
+
+def simulate_reference(entry: Dict[str, Any], seeds: List[int]) -> Dict[str, Any]:
+    """
+    Play a reference fixture with the full engine once per seed.
+
+    Args:
+        entry: Fixture description (seed, home_strength, away_strength)
+        seeds: One seed per match
+
+    Returns:
+        The entry with the final scores and shots of every match added
+    """
+    saved_state = random.getstate()
+    match = reference_match(entry)
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    scores, shots = [], []
+    try:
+        for seed in seeds:
+            simulator.reset(seed)
+            simulator.run()
+            scores.append([match.home_team.goals_scored, match.away_team.goals_scored])
+            shots.append([int(simulator.stats.team[HOME, _SHOTS]), int(simulator.stats.team[AWAY, _SHOTS])])
+    finally:
+        random.setstate(saved_state)
+    return dict(entry, scores=scores, shots=shots)
+
+
+def build_reference(n_fixtures: int = 24, matches_per_fixture: int = 12,
+                    seed: Optional[int] = 0) -> List[Dict[str, Any]]:
+    """
+    Simulate fixtures with team strengths spread around the sample fixture.
+
+    The first fixture is the sample fixture itself; the others add a
+    uniform offset of up to STRENGTH_SPREAD points to each team's
+    randomised attributes.
+
+    Args:
+        n_fixtures: Fixtures to simulate
+        matches_per_fixture: Full-engine matches per fixture
+        seed: Seed for the fixtures and matches (None for nondeterministic)
+
+    Returns:
+        List of fixtures with their simulated scores and shots
+    """
+    seeder = random.Random(seed)
+    fixtures = []
+    for k in range(n_fixtures):
+        spread = STRENGTH_SPREAD if k else 0.0
+        entry = {'seed': seeder.getrandbits(32),
+                 'home_strength': round(seeder.uniform(-spread, spread), 2),
+                 'away_strength': round(seeder.uniform(-spread, spread), 2)}
+        seeds = [seeder.getrandbits(32) for _ in range(matches_per_fixture)]
+        fixtures.append(simulate_reference(entry, seeds))
+    return fixtures
+
+
+def save_reference(fixtures: List[Dict[str, Any]], path: str = REFERENCE_PATH):
+    """Write a reference set as JSON"""
+    with open(path, 'w') as f:
+        json.dump({'fixtures': fixtures}, f, separators=(',', ':'))
+
+
+def load_reference(path: str = REFERENCE_PATH) -> List[Dict[str, Any]]:
+    """
+    Read a reference set (cached per path for the life of the process).
+
+    Args:
+        path: JSON file written by save_reference
+
+    Returns:
+        List of fixtures with their simulated scores and shots
+    """
+    fixtures = _loaded.get(path)
+    if fixtures is None:
+        with open(path) as f:
+            fixtures = _loaded[path] = json.load(f)['fixtures']
+    return fixtures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the reference fixtures used to calibrate the fast engines")
+    parser.add_argument('--fixtures', type=int, default=24, help="Fixtures to simulate")
+    parser.add_argument('--matches', type=int, default=12, help="Matches per fixture")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for fixtures and matches")
+    parser.add_argument('--output', default=REFERENCE_PATH, help="Where to write the reference set")
+    args = parser.parse_args()
+
+    save_reference(build_reference(args.fixtures, args.matches, args.seed), args.output)
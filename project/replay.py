@@ -0,0 +1,295 @@
+# random-access replay reader over recorded tracking files
+import json
+import os
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from tracking import header_path, events_path, FORMAT_NAME, BALL_ROW
+
+INDEX_VERSION = 1
+
+
+def index_path(path: str) -> str:
+    """Path of the event index sidecar kept next to a tracking data file"""
+    return path + '.index.npz'
+
+
+def build_event_index(path: str, header: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Map every logged event of a recording to the tick it happened on and save the index.
+
+    Events are placed on the first recorded tick whose clock is not earlier
+    than the event time (the clock only moves forward across the recorded
+    ticks; the interval is not recorded).
+
+    Args:
+        path: Path of the tracking data file
+        header: Its parsed header, if already loaded
+
+    Returns:
+        Index arrays: per-event tick, type code and roster index, plus the type names
+    """
+    if header is None:
+        with open(header_path(path)) as header_file:
+            header = json.load(header_file)
+    with open(events_path(path)) as events_file:
+        events = json.load(events_file)
+
+    section = header['sections']['clock']
+    clock = np.memmap(path, dtype=section['dtype'], mode='r', offset=section['offset'],
+                      shape=(header['ticks'],))
+    roster = {entry['player_id']: i for i, entry in enumerate(header['roster'])}
+
+    times = np.array([event['time'] for event in events], dtype=float)
+    ticks = np.minimum(np.searchsorted(clock, times, side='left'), max(header['ticks'] - 1, 0))
+    type_names, type_codes = np.unique([event['type'] for event in events], return_inverse=True)
+
+    index = {
+        'version': np.array(INDEX_VERSION),
+        'ticks': ticks.astype(np.int32),
+        'types': type_codes.astype(np.int16),
+        'players': np.array([roster.get(event['player_id'], -1) for event in events], dtype=np.int16),
+        'type_names': np.asarray(type_names, dtype=str),
+    }
+    with open(index_path(path), 'wb') as index_file:
+        np.savez(index_file, **index)
+    return index
+
+
+class Replay:
+    """
+    Read-only view of one recorded match with seeking by time, player and event.
+
+    Opening only reads the small JSON header and maps the data file; the
+    event log and its index are loaded on first use (the index is built and
+    saved as a sidecar if it is missing or older than the log). Everything
+    returned for a tick range or a fixed row is a NumPy view into the
+    mapped file, so nothing is read from disk until it is touched.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a recording.
+
+        Args:
+            path: Path of the tracking data file written by TrackingRecorder
+        """
+        self.path = path
+        with open(header_path(path)) as header_file:
+            self.header = json.load(header_file)
+        if self.header.get('format') != FORMAT_NAME:
+            raise ValueError(f"Not a tracking recording: {path}")
+
+        self.ticks = self.header['ticks']
+        self.time_step = self.header['time_step']
+        self.roster = self.header['roster']
+        self._roster_index = {entry['player_id']: i for i, entry in enumerate(self.roster)}
+
+        # One mapping of the whole file, sliced into the recorded ticks of each section
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        sections = {}
+        for name, section in self.header['sections'].items():
+            shape = (self.ticks,) + tuple(section['shape'][1:])
+            sections[name] = np.ndarray(shape, dtype=section['dtype'], buffer=raw,
+                                        offset=section['offset'])
+        self.frames = sections['frames']
+        self.clock = sections['clock']
+        self.codes = sections['codes']
+        self.period = sections['period']
+
+        self._events = None
+        self._index = None
+
+    # ---- Seeking by time ----
+
+    def tick_at(self, seconds: float) -> int:
+        """
+        First recorded tick at or after a match clock time.
+
+        Args:
+            seconds: Match clock in seconds
+
+        Returns:
+            Tick index (clamped to the recording)
+        """
+        tick = int(np.searchsorted(self.clock, seconds, side='left'))
+        return min(tick, max(self.ticks - 1, 0))
+
+    def minute(self, minute: float) -> int:
+        """Tick at the start of a match minute (minute 67 starts at 66:00)"""
+        return self.tick_at(max(minute - 1, 0) * 60.0)
+
+    def time_range(self, start: float, end: float) -> slice:
+        """
+        Ticks whose clock lies in [start, end) seconds.
+
+        Args:
+            start: Start of the range in seconds
+            end: End of the range in seconds
+
+        Returns:
+            Slice over the tick axis
+        """
+        first, last = np.searchsorted(self.clock, [start, end], side='left')
+        return slice(int(first), int(last))
+
+    def window(self, ticks: slice) -> Dict[str, np.ndarray]:
+        """
+        Every section for a range of ticks.
+
+        Args:
+            ticks: Slice over the tick axis
+
+        Returns:
+            Views of frames, codes, clock and period
+        """
+        return {
+            'frames': self.frames[ticks],
+            'codes': self.codes[ticks],
+            'clock': self.clock[ticks],
+            'period': self.period[ticks],
+        }
+
+    # ---- Players and ball ----
+
+    def player_rows(self, player_id: str) -> np.ndarray:
+        """
+        Frame row the player occupied on every tick.
+
+        Args:
+            player_id: The player's id as in the header roster
+
+        Returns:
+            int array of rows, -1 on ticks the player was not on the pitch
+        """
+        code = self._roster_index[player_id]
+        present = self.codes[:, :BALL_ROW, 0] == code
+        return np.where(present.any(axis=1), present.argmax(axis=1), -1)
+
+    def player_track(self, player_id: str) -> np.ndarray:
+        """
+        Float channels for a player over the ticks they were on the pitch.
+
+        A player keeps the same lineup slot for the whole time they are on
+        the pitch (a substitute takes the slot of the player replaced), so
+        this is a view into the mapped file. If the recorded rows are not
+        contiguous in a single slot, the rows are gathered into a copy.
+
+        Args:
+            player_id: The player's id as in the header roster
+
+        Returns:
+            Array of shape (ticks on pitch, channels)
+        """
+        rows = self.player_rows(player_id)
+        on_pitch = np.flatnonzero(rows >= 0)
+        if not len(on_pitch):
+            return self.frames[:0, 0]
+        first, last = on_pitch[0], on_pitch[-1] + 1
+        if len(on_pitch) == last - first and (rows[first:last] == rows[first]).all():
+            return self.frames[first:last, rows[first]]
+        return self.frames[on_pitch, rows[on_pitch]]
+
+    def ball_track(self) -> np.ndarray:
+        """Float channels of the ball over the whole recording, shape (ticks, channels)"""
+        return self.frames[:, BALL_ROW]
+
+    # ---- Events ----
+
+    @property
+    def events(self) -> List[dict]:
+        """The match event log, loaded on first use"""
+        if self._events is None:
+            with open(events_path(self.path)) as events_file:
+                self._events = json.load(events_file)
+        return self._events
+
+    @property
+    def event_index(self) -> Dict[str, np.ndarray]:
+        """Per-event ticks, type codes and roster indices, from the sidecar index"""
+        if self._index is None:
+            sidecar = index_path(self.path)
+            log = events_path(self.path)
+            if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(log):
+                with np.load(sidecar) as stored:
+                    index = {name: stored[name] for name in stored.files}
+                if int(index['version']) == INDEX_VERSION:
+                    self._index = index
+            if self._index is None:
+                self._index = build_event_index(self.path, self.header)
+        return self._index
+
+    def _event_numbers(self, event_type: Optional[str] = None,
+                       player_id: Optional[str] = None) -> np.ndarray:
+        """Positions in the event log of the events matching the filters"""
+        index = self.event_index
+        keep = np.ones(len(index['ticks']), dtype=bool)
+        if event_type is not None:
+            names = index['type_names'].tolist()
+            if event_type not in names:
+                return np.zeros(0, dtype=int)
+            keep &= index['types'] == names.index(event_type)
+        if player_id is not None:
+            keep &= index['players'] == self._roster_index.get(player_id, -2)
+        return np.flatnonzero(keep)
+
+    def event_ticks(self, event_type: Optional[str] = None,
+                    player_id: Optional[str] = None) -> np.ndarray:
+        """
+        Ticks of the events matching the filters, in log order.
+
+        Args:
+            event_type: Event type such as 'goal' or 'pass' (all types if None)
+            player_id: Only events of this player (all players if None)
+
+        Returns:
+            int array of tick indices
+        """
+        return self.event_index['ticks'][self._event_numbers(event_type, player_id)]
+
+    def find_events(self, event_type: Optional[str] = None,
+                    player_id: Optional[str] = None) -> List[dict]:
+        """
+        Logged events matching the filters, each with its tick added.
+
+        Args:
+            event_type: Event type such as 'goal' or 'pass' (all types if None)
+            player_id: Only events of this player (all players if None)
+
+        Returns:
+            List of event dictionaries
+        """
+        numbers = self._event_numbers(event_type, player_id)
+        ticks = self.event_index['ticks'][numbers].tolist()
+        return [dict(self.events[n], tick=tick) for n, tick in zip(numbers.tolist(), ticks)]
+
+    def event_window(self, event_type: str, occurrence: int = 0, before: float = 5.0,
+                     after: float = 5.0) -> Dict[str, np.ndarray]:
+        """
+        Every section around one occurrence of an event ("the 3rd goal" is occurrence 2).
+
+        Args:
+            event_type: Event type such as 'goal'
+            occurrence: Zero-based occurrence of the event in the match
+            before: Seconds of play to include before the event
+            after: Seconds of play to include after the event
+
+        Returns:
+            Views of frames, codes, clock and period
+        """
+        tick = int(self.event_ticks(event_type)[occurrence])
+        first = max(tick - int(round(before / self.time_step)), 0)
+        last = min(tick + int(round(after / self.time_step)) + 1, self.ticks)
+        return self.window(slice(first, last))
+
+
+def open_replays(paths: Iterable[str]) -> List[Replay]:
+    """
+    Open many recordings at once (headers only; data and indices load on use).
+
+    Args:
+        paths: Paths of tracking data files
+
+    Returns:
+        List of Replay objects
+    """
+    return [Replay(path) for path in paths]
@@ -0,0 +1,362 @@
+# compact binary snapshots of a match, for resuming and forking simulations
+import json
+import random
+import struct
+import numpy as np
+from typing import Optional
+from states import (
+    Player, Team, Match,
+    PlayerAction, ActionPhase, FieldZone, InjuryStatus, TeamPhase, PlayingPosition,
+    MatchPeriod, GamePhase, SetPieceStatus, Formation,
+    PhysicalState, BallAction, PlayerAttribute
+)
+from zones import update_zones
+
+SNAPSHOT_MAGIC = b'UCLS'
+SNAPSHOT_VERSION = 3
+
+# Header: magic, version, home roster size, away roster size, trailer length
+_HEADER = struct.Struct('<4sHHHI')
+
+# Attribute order inside each player row (the player's attribute array, as is)
+ATTRIBUTE_NAMES = tuple(attribute.name.lower() for attribute in PlayerAttribute)
+
+# Dynamic per-player state, one float64 column each, followed by the attributes
+PLAYER_COLUMNS = (
+    'x', 'y', 'vx', 'vy', 'ax', 'ay', 'orientation', 'speed', 'distance_to_ball',
+    'has_ball', 'current_action', 'action_phase', 'action_timer', 'available_for_action',
+    'target_kind', 'target_x', 'target_y', 'current_zone', 'marking', 'formation_x',
+    'formation_y', 'current_stamina', 'fatigue', 'injury_status', 'sprint_available',
+    'yellow_cards', 'red_card', 'lineup_slot', 'bench_slot', 'starting_slot'
+)
+_N_PLAYER_FIELDS = len(PLAYER_COLUMNS) + len(ATTRIBUTE_NAMES)
+
+TEAM_FIELDS = ('possession', 'goals_scored', 'goals_conceded', 'formation', 'phase',
+               'substitutions_made', 'substitutions_available', 'captain')
+BALL_FIELDS = ('x', 'y', 'vx', 'vy', 'height', 'vertical_velocity', 'speed', 'possession_team',
+               'possession_player', 'physical_state', 'action', 'zone', 'last_kicker', 'kick_clock')
+MATCH_FIELDS = ('clock', 'period', 'game_phase', 'set_piece_status',
+                'team_in_possession', 'events_cursor')
+
+# Action targets: nothing, a player (roster index in target_x) or a pitch position
+_TARGET_NONE, _TARGET_PLAYER, _TARGET_POSITION = 0, 1, 2
+
+# random.getstate(): version, 625-word Mersenne Twister state, cached gauss value
+_RNG_WORDS = 625
+_RNG_BYTES = 12 + 4 * _RNG_WORDS
+
+
+def _roster(match: Match) -> list:
+    """All players of both squads in snapshot order (home squad, then away squad)"""
+    return match.home_team.players + match.away_team.players
+
+
+def _team_code(match: Match, team: Optional[Team]) -> int:
+    """Encode a team reference as 0 (none), 1 (home) or 2 (away)"""
+    if team is None:
+        return 0
+    return 1 if team is match.home_team else 2
+
+
+def _team_from_code(match: Match, code: int) -> Optional[Team]:
+    """Decode a team reference written by _team_code"""
+    return {0: None, 1: match.home_team, 2: match.away_team}[int(code)]
+
+
+def _pack_rng(rng) -> bytes:
+    """Pack a random.Random-style state into fixed-size bytes"""
+    version, words, gauss = rng.getstate()
+    header = struct.pack('<Id', version, float('nan') if gauss is None else gauss)
+    return header + np.asarray(words, dtype=np.uint32).tobytes()
+
+
+def _unpack_rng(data: bytes):
+    """Inverse of _pack_rng, returning a state usable by setstate"""
+    version, gauss = struct.unpack_from('<Id', data)
+    words = np.frombuffer(data, dtype=np.uint32, offset=12, count=_RNG_WORDS)
+    return version, tuple(int(w) for w in words), (None if np.isnan(gauss) else gauss)
+
+
+def take_snapshot(match: Match, rng=random) -> bytes:
+    """
+    Serialize the complete simulation state of a match.
+
+    Args:
+        match: The match to capture
+        rng: Random source whose state is stored (the random module by default),
+             or None to leave it out
+
+    Returns:
+        A compact binary blob accepted by restore_snapshot and fork_match
+    """
+    roster = _roster(match)
+    roster_index = {player: i for i, player in enumerate(roster)}
+
+    # ---- Players ----
+    rows = []
+    for player in roster:
+        target = player.action_target
+        if isinstance(target, Player) and target in roster_index:
+            target_fields = (_TARGET_PLAYER, roster_index[target], 0.0)
+        elif isinstance(target, np.ndarray):
+            target_fields = (_TARGET_POSITION, target[0], target[1])
+        else:
+            target_fields = (_TARGET_NONE, 0.0, 0.0)
+
+        formation = player.formation_position
+        if formation is None:
+            formation = (np.nan, np.nan)
+
+        lineup = player.team.lineup
+        bench = player.team.bench
+        starting = player.team.starting_lineup or ()
+        rows.append((
+            player.position[0], player.position[1],
+            player.velocity[0], player.velocity[1],
+            player.acceleration[0], player.acceleration[1],
+            player.orientation, player.speed, player.distance_to_ball,
+            player.has_ball, player.current_action.value, player.action_phase.value,
+            player.action_timer, player.available_for_action) + target_fields + (
+            player.current_zone.value, roster_index.get(player.marking_assignment, -1),
+            formation[0], formation[1], player.current_stamina, player.fatigue,
+            player.injury_status.value, player.sprint_available,
+            player.yellow_cards, player.red_card,
+            lineup.index(player) if player in lineup else -1,
+            bench.index(player) if player in bench else -1,
+            starting.index(player) if player in starting else -1
+        ) + tuple(player.attributes.array.tolist()))
+    rows = np.array(rows, dtype=float).reshape(len(roster), _N_PLAYER_FIELDS)
+
+    # ---- Teams ----
+    teams = np.zeros((2, len(TEAM_FIELDS)))
+    tactics = []
+    for k, team in enumerate((match.home_team, match.away_team)):
+        teams[k] = (team.possession, team.goals_scored, team.goals_conceded,
+                    team.formation.value, team.phase.value, team.substitutions_made,
+                    team.substitutions_available, roster_index.get(team.captain, -1))
+        tactics.append(team.tactics)
+
+    # ---- Ball and match ----
+    ball = match.ball
+    ball_row = np.array([
+        ball.position[0], ball.position[1], ball.velocity[0], ball.velocity[1],
+        ball.height, ball.vertical_velocity, ball.speed, _team_code(match, ball.possession_team),
+        roster_index.get(ball.possession_player, -1), ball.physical_state.value,
+        ball.action.value, ball.zone.value, roster_index.get(ball.last_kicker, -1),
+        np.nan if ball.kick_clock is None else ball.kick_clock
+    ], dtype=float)
+    match_row = np.array([
+        match.clock, match.period.value, match.game_phase.value,
+        match.set_piece_status.value, _team_code(match, match.team_in_possession),
+        len(match.events)
+    ], dtype=float)
+
+    rng_bytes = _pack_rng(rng) if rng is not None else b''
+    chasers = [roster_index[p] for p in ball.chasers]
+    trailer = json.dumps({'tactics': tactics, 'chasers': chasers, 'rng': bool(rng_bytes)},
+                         separators=(',', ':')).encode('utf-8')
+
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(match.home_team.players),
+                          len(match.away_team.players), len(trailer))
+    return b''.join((header, match_row.tobytes(), ball_row.tobytes(), teams.tobytes(),
+                     rows.tobytes(), rng_bytes, trailer))
+
+
+def restore_snapshot(match: Match, blob: bytes, rng=random) -> Match:
+    """
+    Restore a match in place from a snapshot.
+
+    The match must have the same squads (same number of players, in the same
+    order) as the match the snapshot was taken from.
+
+    Args:
+        match: The match to overwrite
+        blob: Bytes produced by take_snapshot
+        rng: Random source to restore (the random module by default), or None
+             to leave the current random state untouched
+
+    Returns:
+        The restored match
+    """
+    magic, version, n_home, n_away, trailer_len = _HEADER.unpack_from(blob)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a match snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    if n_home != len(match.home_team.players) or n_away != len(match.away_team.players):
+        raise ValueError("Snapshot squads do not match the target match")
+
+    offset = _HEADER.size
+    match_row = np.frombuffer(blob, dtype=float, count=len(MATCH_FIELDS), offset=offset)
+    offset += match_row.nbytes
+    ball_row = np.frombuffer(blob, dtype=float, count=len(BALL_FIELDS), offset=offset)
+    offset += ball_row.nbytes
+    teams = np.frombuffer(blob, dtype=float, count=2 * len(TEAM_FIELDS),
+                          offset=offset).reshape(2, len(TEAM_FIELDS))
+    offset += teams.nbytes
+    n_players = n_home + n_away
+    rows = np.frombuffer(blob, dtype=float, count=n_players * _N_PLAYER_FIELDS,
+                         offset=offset).reshape(n_players, _N_PLAYER_FIELDS)
+    offset += rows.nbytes
+    trailer = json.loads(blob[len(blob) - trailer_len:].decode('utf-8'))
+
+    roster = _roster(match)
+
+    # ---- Players ----
+    lineups = {match.home_team: {}, match.away_team: {}}
+    benches = {match.home_team: {}, match.away_team: {}}
+    startings = {match.home_team: {}, match.away_team: {}}
+    n_columns = len(PLAYER_COLUMNS)
+    for player, row in zip(roster, rows.tolist()):
+        (x, y, vx, vy, ax, ay, orientation, speed, distance_to_ball,
+         has_ball, current_action, action_phase, action_timer, available_for_action,
+         target_kind, target_x, target_y, current_zone, marking, formation_x,
+         formation_y, current_stamina, fatigue, injury_status, sprint_available,
+         yellow_cards, red_card, lineup_slot, bench_slot, starting_slot) = row[:n_columns]
+
+        player.position = np.array([x, y])
+        player.velocity = np.array([vx, vy])
+        player.acceleration = np.array([ax, ay])
+        player.orientation = orientation
+        player.speed = speed
+        player.distance_to_ball = distance_to_ball
+        player.has_ball = bool(has_ball)
+        player.current_action = PlayerAction(int(current_action))
+        player.action_phase = ActionPhase(int(action_phase))
+        player.action_timer = action_timer
+        player.available_for_action = bool(available_for_action)
+
+        if target_kind == _TARGET_PLAYER:
+            player.action_target = roster[int(target_x)]
+        elif target_kind == _TARGET_POSITION:
+            player.action_target = np.array([target_x, target_y])
+        else:
+            player.action_target = None
+
+        player.current_zone = FieldZone(int(current_zone))
+        player.marking_assignment = roster[int(marking)] if marking >= 0 else None
+        player.formation_position = None if np.isnan(formation_x) else np.array([formation_x, formation_y])
+        player.current_stamina = current_stamina
+        player.fatigue = fatigue
+        player.injury_status = InjuryStatus(int(injury_status))
+        player.sprint_available = bool(sprint_available)
+        player.yellow_cards = int(yellow_cards)
+        player.red_card = bool(red_card)
+
+        player.attributes.array[:] = row[n_columns:]
+
+        if lineup_slot >= 0:
+            lineups[player.team][int(lineup_slot)] = player
+        if bench_slot >= 0:
+            benches[player.team][int(bench_slot)] = player
+        if starting_slot >= 0:
+            startings[player.team][int(starting_slot)] = player
+
+    # ---- Teams ----
+    for team, values, tactics in zip((match.home_team, match.away_team), teams, trailer['tactics']):
+        team.possession = bool(values[0])
+        team.goals_scored = int(values[1])
+        team.goals_conceded = int(values[2])
+        team.formation = Formation(int(values[3]))
+        team.phase = TeamPhase(int(values[4]))
+        team.substitutions_made = int(values[5])
+        team.substitutions_available = int(values[6])
+        team.captain = roster[int(values[7])] if values[7] >= 0 else None
+        team.tactics = dict(tactics)
+        team.lineup = [lineups[team][k] for k in sorted(lineups[team])]
+        team.bench = [benches[team][k] for k in sorted(benches[team])]
+        team.starting_lineup = [startings[team][k] for k in sorted(startings[team])] or None
+
+    # ---- Ball ----
+    ball = match.ball
+    ball.position = ball_row[0:2].copy()
+    ball.velocity = ball_row[2:4].copy()
+    ball.height = float(ball_row[4])
+    ball.vertical_velocity = float(ball_row[5])
+    ball.speed = float(ball_row[6])
+    ball.possession_team = _team_from_code(match, ball_row[7])
+    ball.possession_player = roster[int(ball_row[8])] if ball_row[8] >= 0 else None
+    ball.physical_state = PhysicalState(int(ball_row[9]))
+    ball.action = BallAction(int(ball_row[10]))
+    ball.zone = FieldZone(int(ball_row[11]))
+    ball.last_kicker = roster[int(ball_row[12])] if ball_row[12] >= 0 else None
+    ball.kick_clock = None if np.isnan(ball_row[13]) else float(ball_row[13])
+    ball.chasers = [roster[i] for i in trailer['chasers']]
+
+    # ---- Match ----
+    match.clock = float(match_row[0])
+    match.period = MatchPeriod(int(match_row[1]))
+    match.game_phase = GamePhase(int(match_row[2]))
+    match.set_piece_status = SetPieceStatus(int(match_row[3]))
+    match.team_in_possession = _team_from_code(match, match_row[4])
+    del match.events[int(match_row[5]):]
+    match.invalidate_geometry()
+    update_zones(match)
+
+    if rng is not None and trailer['rng']:
+        rng.setstate(_unpack_rng(blob[offset:offset + _RNG_BYTES]))
+
+    return match
+
+
+def match_skeleton(match: Match) -> tuple:
+    """
+    Capture the static identity of a match's teams and players.
+
+    The skeleton is a small hashable tuple, suitable for shipping to worker
+    processes that rebuild the match and then restore snapshots into it.
+
+    Args:
+        match: The source match
+
+    Returns:
+        Tuple of (team_id, name, ((player_id, name, position name), ...)) per team
+    """
+    return tuple(
+        (team.team_id, team.name,
+         tuple((p.player_id, p.name, p.assigned_position.name) for p in team.players))
+        for team in (match.home_team, match.away_team)
+    )
+
+
+def match_from_skeleton(skeleton: tuple) -> Match:
+    """
+    Build an empty match with the teams and players described by a skeleton.
+
+    Args:
+        skeleton: Tuple produced by match_skeleton
+
+    Returns:
+        A new Match ready for restore_snapshot
+    """
+    teams = []
+    for team_id, name, players in skeleton:
+        team = Team(team_id, name)
+        team.players = [Player(player_id, player_name, PlayingPosition[position], team)
+                        for player_id, player_name, position in players]
+        teams.append(team)
+    return Match(teams[0], teams[1])
+
+
+def fork_match(match: Match, blob: Optional[bytes] = None) -> Match:
+    """
+    Create an independent copy of a match for exploring a continuation.
+
+    Only the static identity of teams and players is copied from the source;
+    everything else is restored from the snapshot. Recorded events up to the
+    snapshot's cursor are shared (events are never modified once recorded).
+    The random state is not touched, so each fork can be seeded separately.
+
+    Args:
+        match: The source match
+        blob: Snapshot to restore, or None to snapshot the source now
+
+    Returns:
+        A new Match with its own teams, players and ball
+    """
+    if blob is None:
+        blob = take_snapshot(match, rng=None)
+
+    forked = match_from_skeleton(match_skeleton(match))
+    forked.events = list(match.events)
+    return restore_snapshot(forked, blob, rng=None)
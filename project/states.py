@@ -1,7 +1,12 @@
 # includes all the custom datatypes for different states for a match
-from enum import Enum, auto
-from typing import List, Optional
+from collections.abc import MutableMapping
+from enum import Enum, IntEnum, auto
+from typing import Iterator, List, Optional
+import math
+import random
 import numpy as np
+from geometry import MatchGeometry
+from pitchcontrol import PitchControl
 
 
 class PhysicalState(Enum):
@@ -182,13 +187,84 @@ class Formation(Enum):
     F_3_4_3 = auto()
 
 
+class PlayerAttribute(IntEnum):
+    """Player attributes, numbered by their column in a player's attribute array"""
+    PACE = 0
+    SHOOTING = 1
+    PASSING = 2
+    DRIBBLING = 3
+    DEFENDING = 4
+    PHYSICAL = 5
+    STAMINA = 6
+    AGILITY = 7
+    BALANCE = 8
+    REACTIONS = 9
+    BALL_CONTROL = 10
+    COMPOSURE = 11
+
+
+# Attribute values for a new player, in PlayerAttribute order
+DEFAULT_ATTRIBUTES = np.array([70, 70, 70, 70, 70, 70, 100, 70, 70, 70, 70, 70], dtype=float)
+DEFAULT_ATTRIBUTES.flags.writeable = False
+
+_ATTRIBUTE_INDEX = {attribute.name.lower(): int(attribute) for attribute in PlayerAttribute}
+
+
+class PlayerAttributes(MutableMapping):
+    """
+    Dict-like view of a player's attribute array keyed by name, e.g. attributes['passing'].
+    The set of attributes is fixed; values live in a float array (the array
+    attribute) indexed by PlayerAttribute.
+    """
+    
+    __slots__ = ('array',)
+    
+    def __init__(self, array: Optional[np.ndarray] = None):
+        self.array = DEFAULT_ATTRIBUTES.copy() if array is None else array
+        
+    def __getitem__(self, name: str) -> float:
+        return float(self.array[_ATTRIBUTE_INDEX[name]])
+        
+    def __setitem__(self, name: str, value: float):
+        self.array[_ATTRIBUTE_INDEX[name]] = value
+        
+    def __delitem__(self, name: str):
+        raise TypeError("player attributes cannot be removed")
+        
+    def __iter__(self) -> Iterator[str]:
+        return iter(_ATTRIBUTE_INDEX)
+        
+    def __len__(self) -> int:
+        return len(_ATTRIBUTE_INDEX)
+        
+    def __contains__(self, name) -> bool:
+        return name in _ATTRIBUTE_INDEX
+        
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
 class Ball:
     """Represents the ball state in the simulation"""
     
+    __slots__ = (
+        'match', '_position', 'height', 'vertical_velocity', 'velocity', 'speed',
+        'possession_team', 'possession_player', 'physical_state', 'action', 'zone', 'zone_mask',
+        'last_kicker', 'kick_clock', 'chasers'
+    )
+    
     def __init__(self):
+        self.match = None  # Set by the owning Match
+
+        # Dynamic match state
+        self.reset()
+
+    def reset(self):
+        """Put the ball back on the centre spot, at rest and out of possession"""
         # Core states
         self.position = np.array([50.0, 50.0])  # x, y coordinates (0-100 scale)
         self.height = 0.0  # Height above ground in meters
+        self.vertical_velocity = 0.0  # Upward speed in m/s while in the air
         self.velocity = np.array([0.0, 0.0])  # velocity vector (x, y)
         self.speed = 0.0  # magnitude of velocity
         
@@ -198,6 +274,23 @@ class Ball:
         self.physical_state = PhysicalState.STATIONARY
         self.action = BallAction.STATIC
         self.zone = FieldZone.CENTER
+        self.zone_mask = 0  # Bitmask of every zone the ball is in (see zones.py)
+        
+        # Last player to kick the ball and when, and players running onto it while loose
+        self.last_kicker = None
+        self.kick_clock = None
+        self.chasers = []
+
+    @property
+    def position(self) -> np.ndarray:
+        """Ball position; assigning (or updating in place with +=) invalidates match geometry"""
+        return self._position
+
+    @position.setter
+    def position(self, value: np.ndarray):
+        self._position = value
+        if self.match is not None:
+            self.match.invalidate_geometry()
         
     def update_position(self, dt: float):
         """Update ball position based on velocity and time step"""
@@ -209,17 +302,11 @@ class Ball:
         
     def _update_zone(self):
         """Update the field zone based on current position"""
-        x, y = self.position
+        # Imported here because zones depends on the enums in this module
+        from zones import zone_mask, primary_zone
         
-        # Update third (vertical zones)
-        if x < 33.3:
-            self.zone = FieldZone.DEFENSIVE_THIRD
-        elif x < 66.6:
-            self.zone = FieldZone.MIDDLE_THIRD
-        else:
-            self.zone = FieldZone.ATTACKING_THIRD
-            
-        # We could add more detailed zone logic here
+        self.zone_mask = zone_mask(self.position)
+        self.zone = primary_zone(self.zone_mask)
         
     def set_possession(self, team, player):
         """Set the team and player in possession of the ball"""
@@ -230,6 +317,8 @@ class Ball:
             # Update ball position to player position
             self.position = player.position.copy()
             self.velocity = np.array([0.0, 0.0])
+            self.height = 0.0
+            self.vertical_velocity = 0.0
             self.physical_state = PhysicalState.ON_GROUND
             self.action = BallAction.DRIBBLED
         
@@ -243,28 +332,31 @@ class Ball:
 class Player:
     """Represents a player in the simulation"""
     
+    __slots__ = (
+        'player_id', 'name', 'assigned_position', 'team', 'attributes',
+        '_position', 'orientation', 'velocity', 'speed', 'acceleration',
+        'has_ball', 'distance_to_ball',
+        'current_action', 'action_phase', 'action_target', 'action_timer', 'available_for_action',
+        'current_zone', 'zone_mask', 'marking_assignment', 'formation_position',
+        'current_stamina', 'fatigue', 'injury_status', 'sprint_available',
+        'yellow_cards', 'red_card'
+    )
+    
     def __init__(self, player_id: str, name: str, position: PlayingPosition, team):
         self.player_id = player_id
         self.name = name
         self.assigned_position = position
         self.team = team
         
-        # Physical attributes (could be loaded from player database)
-        self.attributes = {
-            'pace': 70,
-            'shooting': 70,
-            'passing': 70,
-            'dribbling': 70,
-            'defending': 70,
-            'physical': 70,
-            'stamina': 100,
-            'agility': 70,
-            'balance': 70,
-            'reactions': 70,
-            'ball_control': 70,
-            'composure': 70
-        }
+        # Physical attributes (could be loaded from player database), stored
+        # as a float array indexed by PlayerAttribute behind a dict-like view
+        self.attributes = PlayerAttributes()
         
+        # Dynamic match state
+        self.reset()
+
+    def reset(self):
+        """Return the player to their pre-match state (identity and attributes are kept)"""
         # Physical state
         self.position = np.array([50.0, 50.0])  # Default to center, would be set by formation
         self.orientation = 0.0  # Angle in radians
@@ -285,6 +377,7 @@ class Player:
         
         # Tactical state
         self.current_zone = FieldZone.CENTER
+        self.zone_mask = 0  # Bitmask of every zone the player is in (see zones.py)
         self.marking_assignment = None  # Player being marked
         self.formation_position = None  # Position in current formation
         
@@ -298,28 +391,40 @@ class Player:
         self.yellow_cards = 0
         self.red_card = False
 
+    @property
+    def position(self) -> np.ndarray:
+        """Player position; assigning (or updating in place with +=) invalidates match geometry"""
+        return self._position
+
+    @position.setter
+    def position(self, value: np.ndarray):
+        self._position = value
+        if self.team is not None and self.team.match is not None:
+            self.team.match.invalidate_geometry()
+
+    def max_speed(self) -> float:
+        """Top running speed in pitch units per second, based on pace"""
+        return 4.0 + 5.0 * self.attributes.array[PlayerAttribute.PACE] / 100.0
+
     def update_distance_to_ball(self, dis: float):
         self.distance_to_ball = dis
         
     def update_position(self, dt: float):
-        """Update player position based on velocity and time step"""
+        """
+        Update player position based on velocity and time step.
+        Zones are not updated here; the simulator classifies every player
+        and the ball at once each tick (zones.update_zones).
+        """
         self.position += self.velocity * dt
-        self.speed = np.linalg.norm(self.velocity)
-        
-        # Update zone based on position
-        self._update_zone()
+        self.speed = math.hypot(self.velocity[0], self.velocity[1])
         
     def _update_zone(self):
         """Update the player's current zone based on position"""
-        x, y = self.position
+        # Imported here because zones depends on the enums in this module
+        from zones import zone_mask, primary_zone
         
-        # Update third (vertical zones)
-        if x < 33.3:
-            self.current_zone = FieldZone.DEFENSIVE_THIRD
-        elif x < 66.6:
-            self.current_zone = FieldZone.MIDDLE_THIRD
-        else:
-            self.current_zone = FieldZone.ATTACKING_THIRD
+        self.zone_mask = zone_mask(self.position)
+        self.current_zone = primary_zone(self.zone_mask)
     
     def start_action(self, action: PlayerAction, target=None):
         """Start a new player action"""
@@ -386,9 +491,16 @@ class Player:
 class Team:
     """Represents a team in the simulation"""
     
+    __slots__ = (
+        'team_id', 'name', 'match', 'possession', 'goals_scored', 'goals_conceded',
+        'players', 'lineup', 'bench', 'captain', 'formation', 'phase', 'tactics',
+        'substitutions_made', 'substitutions_available', 'starting_lineup'
+    )
+    
     def __init__(self, team_id: str, name: str):
         self.team_id = team_id
         self.name = name
+        self.match = None  # Set when the team is added to a Match
         
         # Core states
         self.possession = False
@@ -400,6 +512,7 @@ class Team:
         self.lineup = []   # Starting 11
         self.bench = []    # Substitutes
         self.captain = None
+        self.starting_lineup = None  # Lineup restored by reset(), set by select_lineup
         
         # Tactical states
         self.formation = Formation.F_4_3_3
@@ -418,6 +531,21 @@ class Team:
         self.substitutions_made = 0
         self.substitutions_available = 3
         
+    def reset(self):
+        """Return the team to its pre-match state: no goals or substitutions, starting lineup restored"""
+        self.possession = False
+        self.goals_scored = 0
+        self.goals_conceded = 0
+        self.phase = TeamPhase.DEFENDING
+        self.substitutions_made = 0
+        
+        if self.starting_lineup is not None:
+            self.lineup = list(self.starting_lineup)
+            self.bench = [p for p in self.players if p not in self.starting_lineup]
+            
+        if self.match is not None:
+            self.match.invalidate_geometry()
+        
     def add_player(self, player: Player):
         """Add a player to the team"""
         self.players.append(player)
@@ -426,6 +554,10 @@ class Team:
         """Set the starting lineup"""
         self.lineup = starting_eleven
         self.bench = [p for p in self.players if p not in starting_eleven]
+        self.starting_lineup = list(starting_eleven)
+
+        if self.match is not None:
+            self.match.invalidate_geometry()
         
     def set_formation(self, formation: Formation):
         """Set the team's formation"""
@@ -436,9 +568,15 @@ class Team:
         
     def _position_players(self):
         """Position players on the field according to formation"""
-        # This would contain logic to place players based on formation
-        # For example, a 4-3-3 would have different positions than a 4-4-2
-        pass
+        # Imported here because formations depends on the enums in this module
+        from formations import kickoff_shape
+        
+        attacking_right = self.match is None or self.match.home_team is self
+        shape = kickoff_shape(self.formation, self.tactics, attacking_right)
+        for player, position in zip(self.lineup, shape):
+            player.position = position.copy()
+            player.formation_position = position.copy()
+            player.velocity = np.array([0.0, 0.0])
         
     def make_substitution(self, player_off: Player, player_on: Player) -> bool:
         """Substitute a player"""
@@ -447,11 +585,14 @@ class Team:
                 player_on not in self.bench):
             return False
             
-        self.lineup.remove(player_off)
+        # The substitute takes over the same formation slot
+        self.lineup[self.lineup.index(player_off)] = player_on
         self.bench.remove(player_on)
-        self.lineup.append(player_on)
         self.bench.append(player_off)
         self.substitutions_made += 1
+
+        if self.match is not None:
+            self.match.invalidate_geometry()
         
         return True
         
@@ -465,12 +606,25 @@ class Team:
 class Match:
     """Represents a football match in the simulation"""
     
+    __slots__ = (
+        'home_team', 'away_team', '_positions_version', '_geometry', '_pitch_control',
+        'ball', 'clock', 'period', 'game_phase', 'set_piece_status', 'team_in_possession', 'events'
+    )
+    
     def __init__(self, home_team: Team, away_team: Team):
         self.home_team = home_team
         self.away_team = away_team
+        home_team.match = self
+        away_team.match = self
+
+        # Geometry cache, rebuilt lazily whenever a position changes
+        self._positions_version = 0
+        self._geometry = None
+        self._pitch_control = None
         
         # Ball state
         self.ball = Ball()
+        self.ball.match = self
         
         # Match state
         self.clock = 0.0  # Time in seconds
@@ -484,6 +638,56 @@ class Match:
         # Event history
         self.events = []
         
+    def reset(self, seed: Optional[int] = None, rng=random):
+        """
+        Return the match to its kickoff state, reusing every object.
+        
+        Clock, period, score, cards, stamina and the event log are cleared,
+        both teams get their starting lineups back and line up in formation.
+        Player identities, attributes, formations and tactics are kept, so
+        one match object can be replayed many times without rebuilding it.
+        
+        Args:
+            seed: Seed for the random source, or None to leave it as is
+            rng: Random source to seed (the random module by default)
+        """
+        if seed is not None:
+            rng.seed(seed)
+            
+        self.clock = 0.0
+        self.period = MatchPeriod.FIRST_HALF
+        self.game_phase = GamePhase.KICKOFF
+        self.set_piece_status = SetPieceStatus.NONE
+        self.team_in_possession = None
+        self.events.clear()
+        self.ball.reset()
+        
+        for team in (self.home_team, self.away_team):
+            team.reset()
+            for player in team.players:
+                player.reset()
+            team.set_formation(team.formation)
+            
+        self.invalidate_geometry()
+        
+    @property
+    def geometry(self) -> MatchGeometry:
+        """Shared per-tick distance matrix and goal geometry for all entities"""
+        if self._geometry is None:
+            self._geometry = MatchGeometry(self)
+        return self._geometry
+
+    @property
+    def pitch_control(self) -> PitchControl:
+        """Shared pitch control surface, refreshed lazily when positions change"""
+        if self._pitch_control is None:
+            self._pitch_control = PitchControl(self)
+        return self._pitch_control
+
+    def invalidate_geometry(self):
+        """Mark cached geometry as stale (called automatically when positions change)"""
+        self._positions_version += 1
+        
     def get_current_minute(self) -> int:
         """Get the current minute of the match"""
         return int(self.clock / 60.0)
@@ -510,12 +714,25 @@ class Match:
         other_team = self.away_team if team == self.home_team else self.home_team
         other_team.possession = False
         
+        # The previous carrier no longer has the ball
+        previous = self.ball.possession_player
+        if previous is not None and previous is not player:
+            previous.has_ball = False
+        
         # Update ball possession
         self.ball.set_possession(team, player)
         
         if player:
             player.has_ball = True
             
+    def release_ball(self, action: BallAction):
+        """Release the ball from its carrier (pass, shot, clearance, ...)"""
+        carrier = self.ball.possession_player
+        if carrier is not None:
+            carrier.has_ball = False
+        self.ball.clear_possession()
+        self.ball.action = action
+            
     def record_event(self, event_type: str, player=None, team=None, details=None):
         """Record a match event"""
         event = {
@@ -523,6 +740,7 @@ class Match:
             'minute': self.get_current_minute(),
             'type': event_type,
             'player': player.name if player else None,
+            'player_id': player.player_id if player else None,
             'team': team.name if team else None,
             'details': details or {}
         }
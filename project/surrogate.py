@@ -0,0 +1,366 @@
+# fitted Dixon-Coles scoreline surrogate for instant fixture queries
+import math
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from states import Match, PlayerAttribute, PlayingPosition
+from gamesim import run_replications
+from snapshot import fork_match
+from reference import REFERENCE_PATH, load_reference, reference_match
+from memory import cached
+
+MAX_GOALS = 15  # Scoreline matrix covers 0..MAX_GOALS goals per side
+RIDGE = 1.0  # L2 penalty on the attribute coefficients (keeps small calibration sets stable)
+CALIBRATION_MARGIN = 2.0  # Attribute points a query may always lie outside the calibrated box
+TRUST_FRACTION = 0.25  # Share of each feature's calibrated range a query may lie outside it, if wider
+FALLBACK_MATCHES = 32  # Matches simulated for a query outside the calibrated region
+IRLS_ITERATIONS = 50
+RHO_GRID = np.linspace(-0.3, 0.3, 121)
+
+# Team features (each an average attribute over the lineup)
+FEATURES = ('attack', 'defence', 'keeper')
+FEATURE_CENTRE = 70.0  # Features are centred and scaled before fitting
+FEATURE_SCALE = 10.0
+
+# Coefficients of the log scoring rate, in design-matrix column order
+COEFFICIENTS = ('intercept', 'home_advantage', 'attack', 'opponent_defence', 'opponent_keeper')
+
+_ATTACKING = [PlayerAttribute.PACE, PlayerAttribute.SHOOTING,
+              PlayerAttribute.PASSING, PlayerAttribute.DRIBBLING]
+
+
+def team_features(team) -> np.ndarray:
+    """
+    Strength features of a team's current lineup.
+
+    Args:
+        team: The team
+
+    Returns:
+        Array of (attack, defence, keeper): mean attacking attributes
+        (pace, shooting, passing, dribbling) and mean defending of the
+        outfield players, and the goalkeeper's reactions
+    """
+    outfield = [p.attributes.array for p in team.lineup if p.assigned_position != PlayingPosition.GK]
+    keeper = next((p for p in team.lineup if p.assigned_position == PlayingPosition.GK), None)
+    values = np.array(outfield) if outfield else np.full((1, len(PlayerAttribute)), FEATURE_CENTRE)
+    return np.array([
+        values[:, _ATTACKING].mean(),
+        values[:, PlayerAttribute.DEFENDING].mean(),
+        keeper.attributes.array[PlayerAttribute.REACTIONS] if keeper is not None else 0.0
+    ])
+
+
+def match_features(match: Match) -> np.ndarray:
+    """Home then away team features, shape (6,)"""
+    return np.concatenate((team_features(match.home_team), team_features(match.away_team)))
+
+
+def _design(features: np.ndarray) -> np.ndarray:
+    """
+    Design rows for the home and away scoring rates of each match.
+
+    Args:
+        features: Match features, shape (n, 6)
+
+    Returns:
+        Array of shape (2n, len(COEFFICIENTS)); row 2i is match i's home
+        rate, row 2i + 1 its away rate
+    """
+    scaled = (np.atleast_2d(features) - FEATURE_CENTRE) / FEATURE_SCALE
+    home, away = scaled[:, :3], scaled[:, 3:]
+    n = len(scaled)
+    design = np.empty((2 * n, len(COEFFICIENTS)))
+    design[:, 0] = 1.0
+    design[0::2, 1], design[1::2, 1] = 1.0, 0.0
+    design[0::2, 2:] = np.column_stack((home[:, 0], away[:, 1], away[:, 2]))
+    design[1::2, 2:] = np.column_stack((away[:, 0], home[:, 1], home[:, 2]))
+    return design
+
+
+def fit_poisson(design: np.ndarray, goals: np.ndarray, ridge: float = RIDGE) -> np.ndarray:
+    """
+    Poisson regression with a log link by iteratively reweighted least squares.
+
+    Args:
+        design: Design matrix, shape (n, k)
+        goals: Observed counts, shape (n,)
+        ridge: L2 penalty on every coefficient except the intercept and home advantage
+
+    Returns:
+        Coefficients, shape (k,)
+    """
+    penalty = np.diag([0.0, 0.0] + [ridge] * (design.shape[1] - 2))
+    beta = np.zeros(design.shape[1])
+    beta[0] = math.log(max(goals.mean(), 1e-3))
+    for _ in range(IRLS_ITERATIONS):
+        eta = design @ beta
+        mu = np.exp(eta)
+        z = eta + (goals - mu) / mu
+        weighted = design * mu[:, None]
+        updated = np.linalg.solve(design.T @ weighted + penalty, weighted.T @ z)
+        if np.max(np.abs(updated - beta)) < 1e-8:
+            return updated
+        beta = updated
+    return beta
+
+
+def _low_score_factors(home_goals: np.ndarray, away_goals: np.ndarray, home_rate: np.ndarray,
+                       away_rate: np.ndarray, rho: float) -> np.ndarray:
+    """Dixon-Coles dependence factor for each scoreline (1 above one goal each)"""
+    tau = np.ones(np.broadcast(home_goals, away_goals, home_rate).shape)
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1.0 - home_rate * away_rate * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1.0 + home_rate * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1.0 + away_rate * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1.0 - rho, tau)
+    return tau
+
+
+def fit_rho(home_goals: np.ndarray, away_goals: np.ndarray, home_rate: np.ndarray,
+            away_rate: np.ndarray) -> float:
+    """
+    Dixon-Coles low-score dependence by profile likelihood over a grid.
+
+    Args:
+        home_goals: Observed home goals per match
+        away_goals: Observed away goals per match
+        home_rate: Fitted home scoring rate per match
+        away_rate: Fitted away scoring rate per match
+
+    Returns:
+        The rho maximising the dependence part of the likelihood (0 if none is valid)
+    """
+    best_rho, best_likelihood = 0.0, -math.inf
+    for rho in RHO_GRID:
+        tau = _low_score_factors(home_goals, away_goals, home_rate, away_rate, rho)
+        if (tau <= 0).any():
+            continue
+        likelihood = np.log(tau).sum()
+        if likelihood > best_likelihood:
+            best_rho, best_likelihood = float(rho), likelihood
+    return best_rho
+
+
+class ScorelineSurrogate:
+    """
+    Dixon-Coles scoreline model fitted to simulated results.
+
+    Log scoring rates are linear in lineup strength features (attack of the
+    scoring side, defence and keeper of the other, plus home advantage),
+    fitted by Poisson IRLS on every simulated match seen, with the
+    Dixon-Coles low-score correction on top. Queries are a handful of
+    array operations. The model only answers inside the box of features it
+    was calibrated on, widened by a margin that grows with the spread of
+    the calibration data; a query outside it is simulated for real on a
+    copy of the match, the results are added and the model is refitted,
+    which also widens the box. calibrate_reference() fits the model to the
+    shipped full-engine results over a spread of team strengths.
+    """
+
+    def __init__(self, max_goals: int = MAX_GOALS, margin: float = CALIBRATION_MARGIN,
+                 fallback_matches: int = FALLBACK_MATCHES, seed: Optional[int] = None):
+        """
+        Initialize an empty surrogate.
+
+        Args:
+            max_goals: Largest goal count per side in the scoreline matrix
+            margin: Attribute points a query may always lie outside the calibrated box
+            fallback_matches: Matches simulated for a query outside it
+            seed: Seed for the fallback simulations (None for nondeterministic)
+        """
+        self.max_goals = max_goals
+        self.margin = margin
+        self.fallback_matches = fallback_matches
+        self._seeds = random.Random(seed)
+
+        # Training data: match features and final scores
+        self._features = []
+        self._scores = []
+
+        # Fitted model
+        self.coefficients = None
+        self.rho = 0.0
+        self.low = None
+        self.high = None
+        self.fallbacks = 0
+
+    @property
+    def fitted(self) -> bool:
+        """Whether the model has been fitted"""
+        return self.coefficients is not None
+
+    def add_results(self, features: np.ndarray, scores: List[Tuple[int, int]]):
+        """
+        Add simulated results for a fixture to the training data (call fit() afterwards).
+
+        Args:
+            features: The fixture's match features
+            scores: (home_goals, away_goals) per simulated match
+        """
+        for score in scores:
+            self._features.append(np.asarray(features, dtype=float))
+            self._scores.append(score)
+
+    def fit(self):
+        """Fit the scoring-rate coefficients and rho, and record the calibrated box"""
+        features = np.array(self._features)
+        scores = np.array(self._scores, dtype=float)
+        self.coefficients = fit_poisson(_design(features), scores.ravel())
+        rates = np.exp(_design(features) @ self.coefficients)
+        self.rho = fit_rho(scores[:, 0], scores[:, 1], rates[0::2], rates[1::2])
+        self.low = features.min(axis=0)
+        self.high = features.max(axis=0)
+
+    def calibrate(self, factory: Callable, n_fixtures: int = 16, matches_per_fixture: int = 16,
+                  seed: Optional[int] = None):
+        """
+        Simulate a spread of fixtures and fit the model to them.
+
+        The factory is called under different random seeds so that player
+        attributes vary between fixtures; the caller's random state is left
+        untouched.
+
+        Args:
+            factory: Callable returning a new Match with randomised players
+            n_fixtures: Fixtures to build
+            matches_per_fixture: Simulated matches per fixture
+            seed: Seed for the fixtures and matches (None for nondeterministic)
+        """
+        seeder = random.Random(seed)
+        saved_state = random.getstate()
+        try:
+            for _ in range(n_fixtures):
+                random.seed(seeder.getrandbits(32))
+                match = factory()
+                features = match_features(match)
+                seeds = [seeder.getrandbits(32) for _ in range(matches_per_fixture)]
+                self.add_results(features, run_replications(match, seeds))
+        finally:
+            random.setstate(saved_state)
+        self.fit()
+
+    def calibrate_reference(self, path: str = REFERENCE_PATH):
+        """
+        Fit the model to the reference fixtures' full-engine results (see reference.py).
+
+        Args:
+            path: Reference set to load
+        """
+        for entry in load_reference(path):
+            self.add_results(match_features(reference_match(entry)), [tuple(score) for score in entry['scores']])
+        self.fit()
+
+    def in_region(self, features: np.ndarray) -> bool:
+        """Whether features lie inside the calibrated box (with the margin)"""
+        if not self.fitted:
+            return False
+        margin = np.maximum(self.margin, TRUST_FRACTION * (self.high - self.low))
+        return bool(np.all(features >= self.low - margin) and np.all(features <= self.high + margin))
+
+    def _fallback(self, match: Match, features: np.ndarray):
+        """Simulate a query fixture for real, add the results and refit"""
+        saved_state = random.getstate()
+        try:
+            seeds = [self._seeds.getrandbits(32) for _ in range(self.fallback_matches)]
+            self.add_results(features, run_replications(fork_match(match), seeds))
+        finally:
+            random.setstate(saved_state)
+        self.fallbacks += 1
+        self.fit()
+
+    def rates(self, features: np.ndarray) -> Tuple[float, float]:
+        """Expected home and away goals for match features"""
+        home_rate, away_rate = np.exp(_design(features) @ self.coefficients)
+        return float(home_rate), float(away_rate)
+
+    def scoreline_matrix(self, home_rate: float, away_rate: float) -> np.ndarray:
+        """
+        Probability of every scoreline up to max_goals each.
+
+        Args:
+            home_rate: Expected home goals
+            away_rate: Expected away goals
+
+        Returns:
+            Array indexed [home_goals, away_goals], summing to 1
+        """
+        goals = np.arange(self.max_goals + 1)
+        log_factorial = np.cumsum(np.log(np.maximum(goals, 1)))
+        home = np.exp(goals * math.log(home_rate) - home_rate - log_factorial)
+        away = np.exp(goals * math.log(away_rate) - away_rate - log_factorial)
+        matrix = np.outer(home, away) * _low_score_factors(goals[:, None], goals[None, :],
+                                                           home_rate, away_rate, self.rho)
+        return matrix / matrix.sum()
+
+    def predict(self, match: Match, allow_fallback: bool = True) -> Dict[str, Any]:
+        """
+        Scoreline and result probabilities for a fixture.
+
+        Args:
+            match: The fixture (only its lineups are read; it is not modified)
+            allow_fallback: Simulate and refit when the fixture is outside the
+                            calibrated region (otherwise extrapolate)
+
+        Returns:
+            Dictionary with expected goals for each side, the scoreline
+            matrix, home_win/draw/away_win probabilities, the most likely
+            scoreline and whether the answer needed a fallback simulation
+        """
+        features = match_features(match)
+        fell_back = False
+        if not self.in_region(features):
+            if not allow_fallback and not self.fitted:
+                raise ValueError("Surrogate has not been calibrated")
+            if allow_fallback:
+                self._fallback(match, features)
+                fell_back = True
+
+        home_rate, away_rate = self.rates(features)
+        matrix = self.scoreline_matrix(home_rate, away_rate)
+        likeliest = np.unravel_index(matrix.argmax(), matrix.shape)
+        return {
+            'home_goals': home_rate,
+            'away_goals': away_rate,
+            'scorelines': matrix,
+            'home_win': float(np.tril(matrix, -1).sum()),
+            'draw': float(np.trace(matrix)),
+            'away_win': float(np.triu(matrix, 1).sum()),
+            'likeliest_score': (int(likeliest[0]), int(likeliest[1])),
+            'fallback': fell_back
+        }
+
+
+# Surrogate used by the Monte Carlo 'surrogate' engine, and its query matches by factory (most recent few)
+SHARED_SURROGATE = ScorelineSurrogate()
+_query_matches = {}
+
+
+def sample_fixture(factory: Callable, seeds: List[int],
+                   surrogate: Optional[ScorelineSurrogate] = None) -> List[Tuple[int, int]]:
+    """
+    Draw one scoreline per seed from the surrogate instead of simulating.
+
+    Has the same signature as montecarlo.simulate_fixture so it can serve
+    as an engine there. An uncalibrated surrogate is first fitted to the
+    reference fixtures; a fixture outside their range runs the fallback
+    simulation.
+
+    Args:
+        factory: Callable returning the fixture's Match
+        seeds: One random seed per draw
+        surrogate: Model to use (defaults to SHARED_SURROGATE)
+
+    Returns:
+        List of (home_goals, away_goals) scorelines
+    """
+    surrogate = surrogate if surrogate is not None else SHARED_SURROGATE
+    if not surrogate.fitted:
+        surrogate.calibrate_reference()
+    match = cached(_query_matches, factory, factory)
+
+    cumulative = np.cumsum(surrogate.predict(match)['scorelines'].ravel())
+    size = surrogate.max_goals + 1
+    cells = np.searchsorted(cumulative, [random.Random(seed).random() * cumulative[-1] for seed in seeds],
+                            side='right')
+    cells = np.minimum(cells, size * size - 1)
+    return [(int(cell) // size, int(cell) % size) for cell in cells]
@@ -0,0 +1,180 @@
+# tactics search with successive halving over a process pool
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from gamesim import SimpleMatchSimulator
+from inplay import wilson_interval
+from variance import Arm, play_arm, goal_difference
+
+# Numeric tactic knobs searched, with their ranges. The two style entries of
+# Team.tactics are labels the simulation does not read yet, so they are kept
+# at the team's own values.
+TACTIC_RANGES = {
+    'pressing_intensity': (0, 100),
+    'defensive_line_height': (0, 100),
+    'width': (0, 100),
+    'tempo': (0, 100),
+    'passing_directness': (0, 100),
+}
+
+
+def sample_tactics(n: int, rng: random.Random) -> List[Dict[str, int]]:
+    """
+    Spread n tactic vectors over the search space (Latin hypercube sampling).
+
+    Every knob's range is cut into n equal strata and each stratum is used
+    by exactly one candidate, so even a small sample covers every range.
+
+    Args:
+        n: Number of candidates
+        rng: Random source
+
+    Returns:
+        List of tactic override dictionaries
+    """
+    candidates = [{} for _ in range(n)]
+    for knob, (low, high) in TACTIC_RANGES.items():
+        strata = list(range(n))
+        rng.shuffle(strata)
+        for candidate, stratum in zip(candidates, strata):
+            candidate[knob] = int(round(low + (stratum + rng.random()) * (high - low) / n))
+    return candidates
+
+
+def evaluate_tactics(factory: Callable, tactics: Dict[str, Any], side: str,
+                     seeds: List[int]) -> List[float]:
+    """
+    Play one match per seed with a team using the given tactics.
+
+    Runs in worker processes as well as inline; the caller's random state
+    is left untouched. Every candidate plays the same seeds on the same
+    random streams (common random numbers), so differences between
+    candidates are not swamped by luck.
+
+    Args:
+        factory: Picklable callable returning a new Match
+        tactics: Tactic overrides for the optimised team
+        side: 'home' or 'away', the team being optimised
+        seeds: Replication seeds
+
+    Returns:
+        Goal difference from the optimised team's point of view, per seed
+    """
+    saved_state = random.getstate()
+    match = factory()
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    base_tactics = (dict(match.home_team.tactics), dict(match.away_team.tactics))
+    arm = Arm(home=tactics) if side == 'home' else Arm(away=tactics)
+    sign = 1.0 if side == 'home' else -1.0
+    try:
+        return [sign * play_arm(simulator, base_tactics, arm, seed, False, goal_difference)
+                for seed in seeds]
+    finally:
+        random.setstate(saved_state)
+
+
+class TacticsOptimizer:
+    """
+    Searches tactic settings for one team against a fixed opponent.
+
+    Many candidates are sampled and each is played a few matches. The best
+    1 / eta of them (by points per match) go through to the next rung,
+    where every survivor is topped up to eta times as many matches, until
+    one remains or the budget cap is reached (successive halving). Each
+    candidate's matches for a rung are one task on the process pool, and
+    all candidates share the same seeds.
+    """
+
+    def __init__(self, workers: int = 0, n_candidates: int = 27, min_budget: int = 2,
+                 eta: int = 3, max_budget: int = 64, seed: Optional[int] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            workers: Worker processes to use (0 evaluates inline)
+            n_candidates: Tactic vectors sampled in the first rung
+            min_budget: Matches per candidate in the first rung
+            eta: Reduction factor; keep 1 / eta of the candidates and
+                 multiply their budget by eta in each rung
+            max_budget: Largest number of matches per candidate
+            seed: Seed for sampling and match seeds (None for nondeterministic)
+        """
+        self.workers = workers
+        self.n_candidates = n_candidates
+        self.min_budget = min_budget
+        self.eta = eta
+        self.max_budget = max_budget
+        self._rng = random.Random(seed)
+
+    @staticmethod
+    def _score(differences: List[float]) -> tuple:
+        """Ranking key: points per match, then goal difference per match"""
+        n = len(differences)
+        points = sum(3.0 if d > 0 else 1.0 if d == 0 else 0.0 for d in differences)
+        return points / n, sum(differences) / n
+
+    def optimize(self, factory: Callable, side: str = 'home') -> Dict[str, Any]:
+        """
+        Find the best tactics for one team of a fixture.
+
+        Args:
+            factory: Picklable callable returning the fixture's Match
+            side: 'home' or 'away', the team whose tactics are searched
+                  (the other keeps the factory's tactics)
+
+        Returns:
+            Dictionary with the best tactics, its win probability and 95%
+            interval, draw probability, points per match, matches played,
+            the rung schedule and a leaderboard of the final rung
+        """
+        candidates = sample_tactics(self.n_candidates, self._rng)
+        results = [[] for _ in candidates]
+        alive = list(range(len(candidates)))
+        seeds = []
+        budget = self.min_budget
+        rungs = []
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        try:
+            while True:
+                # Extend the shared seed list, then top every survivor up to the budget
+                while len(seeds) < budget:
+                    seeds.append(self._rng.getrandbits(32))
+                jobs = [(i, seeds[len(results[i]):budget]) for i in alive]
+                if executor is not None:
+                    futures = [(i, executor.submit(evaluate_tactics, factory, candidates[i], side, new))
+                               for i, new in jobs]
+                    for i, future in futures:
+                        results[i].extend(future.result())
+                else:
+                    for i, new in jobs:
+                        results[i].extend(evaluate_tactics(factory, candidates[i], side, new))
+                rungs.append({'candidates': len(alive), 'matches_each': budget})
+
+                alive.sort(key=lambda i: self._score(results[i]), reverse=True)
+                if len(alive) == 1 or budget >= self.max_budget:
+                    break
+                alive = alive[:max(1, len(alive) // self.eta)]
+                budget = min(budget * self.eta, self.max_budget)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        best = alive[0]
+        differences = results[best]
+        n = len(differences)
+        wins = sum(d > 0 for d in differences)
+        draws = sum(d == 0 for d in differences)
+        return {
+            'tactics': candidates[best],
+            'side': side,
+            'win_probability': wins / n,
+            'win_interval': wilson_interval(wins, n),
+            'draw_probability': draws / n,
+            'points_per_match': self._score(differences)[0],
+            'matches': n,
+            'total_matches': sum(len(r) for r in results),
+            'rungs': rungs,
+            'leaderboard': [{'tactics': candidates[i], 'points_per_match': self._score(results[i])[0],
+                             'matches': len(results[i])} for i in alive]
+        }
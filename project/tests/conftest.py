@@ -0,0 +1,5 @@
+# test setup: modules are imported flat from the project directory
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
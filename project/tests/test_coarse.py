@@ -0,0 +1,36 @@
+# tests for the coarse engine's calibration against the full engine
+import numpy as np
+from reference import load_reference, reference_match
+from states import MatchPeriod
+from coarse import LONG_SHOT_SHARE, SHOT_ODDS, CoarseMatchSimulator, fit_chain
+from markov import solve_match
+
+
+def test_shipped_constants_fit_the_reference_set():
+    fit = fit_chain(long_shot_shares=(LONG_SHOT_SHARE,))
+    assert np.allclose(fit['shot_odds'], SHOT_ODDS, atol=0.01)
+
+
+def test_goals_and_results_match_the_full_engine():
+    fixtures = load_reference()
+    solutions = [solve_match(reference_match(entry)) for entry in fixtures]
+    scores = np.array([score for entry in fixtures for score in entry['scores']])
+
+    full = {'home_goals': scores[:, 0].mean(), 'away_goals': scores[:, 1].mean(),
+            'home_win': np.mean(scores[:, 0] > scores[:, 1]), 'draw': np.mean(scores[:, 0] == scores[:, 1]),
+            'away_win': np.mean(scores[:, 0] < scores[:, 1])}
+    coarse = {name: np.mean([solution[name] for solution in solutions]) for name in full}
+
+    for name in ('home_goals', 'away_goals'):
+        assert abs(coarse[name] - full[name]) / full[name] < 0.05
+    for name in ('home_win', 'draw', 'away_win'):
+        assert abs(coarse[name] - full[name]) < 0.04
+
+
+def test_resume_keeps_the_score():
+    match = reference_match(load_reference()[0])
+    match.period = MatchPeriod.SECOND_HALF
+    match.clock = 90 * 60 - 6.0
+    match.home_team.goals_scored = 2
+    for home_goals, away_goals in CoarseMatchSimulator(match).simulate(200, seed=1, resume=True):
+        assert home_goals in (2, 3) and away_goals in (0, 1)
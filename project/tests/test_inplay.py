@@ -0,0 +1,52 @@
+# tests for the in-play estimator's time budget and sample reuse
+import random
+from gamesim import create_sample_match
+from states import MatchPeriod
+from inplay import InPlayEngine
+
+
+def _late_match():
+    random.seed(3)
+    match = create_sample_match()
+    match.period = MatchPeriod.SECOND_HALF
+    match.clock = 90 * 60 - 20.0
+    return match
+
+
+def test_estimate_returns_within_budget():
+    random.seed(3)
+    match = create_sample_match()
+    engine = InPlayEngine(seed=0, time_budget=0.3)
+    estimate = engine.estimate(match)
+    # A full continuation from kickoff takes seconds, so the coarse top-up answers
+    assert estimate['elapsed'] < 0.3 + 0.3
+    assert estimate['fallback'] > 0
+    assert estimate['samples'] == estimate['full'] + estimate['fallback'] <= engine.max_samples
+    # Precision is claimed for the full-engine samples only
+    assert not estimate['converged']
+    assert abs(estimate['home_win'] + estimate['draw'] + estimate['away_win'] - 1.0) < 1e-9
+
+
+def test_cards_break_sample_reuse():
+    match = _late_match()
+    engine = InPlayEngine(seed=0, min_samples=8, max_samples=8, time_budget=30.0, fallback=False)
+    first = engine.estimate(match)
+    assert first['samples'] == 8 and first['fallback'] == 0
+
+    assert engine.estimate(match)['reused'] == 8
+    match.away_team.lineup[4].yellow_cards = 1
+    assert engine.estimate(match)['reused'] == 0
+
+
+def test_reused_samples_age_out():
+    match = _late_match()
+    match.clock -= 20.0
+    engine = InPlayEngine(seed=0, min_samples=8, max_samples=8, time_budget=60.0, fallback=False)
+    assert engine.estimate(match)['reused'] == 0
+
+    # Reusing samples does not refresh when they were generated
+    match.clock += 8.0
+    assert engine.estimate(match)['reused'] == 8
+    match.clock += 8.0
+    estimate = engine.estimate(match)
+    assert estimate['reused'] == 0 and estimate['samples'] == 8
@@ -0,0 +1,26 @@
+# tests for the shared pitch-control surface and its refresh
+import random
+import numpy as np
+from gamesim import create_sample_match
+
+
+def _match():
+    random.seed(0)
+    return create_sample_match()
+
+
+def test_velocity_change_refreshes_surface():
+    match = _match()
+    before = match.pitch_control.surface().copy()
+    player = match.home_team.lineup[5]
+    player.velocity = np.array([5.0, 0.0])
+    # No position moved, so only the velocity check can notice
+    assert not np.allclose(match.pitch_control.surface(), before)
+
+
+def test_controls_at_matches_single_queries():
+    match = _match()
+    positions = [p.position for p in match.away_team.lineup]
+    controls = match.pitch_control.controls_at(positions, match.home_team)
+    assert np.allclose(controls, [match.pitch_control.control_at(position, match.home_team)
+                                  for position in positions])
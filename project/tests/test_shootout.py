@@ -0,0 +1,31 @@
+# tests for the penalty shootout kick order
+from gamesim import create_sample_match
+from shootout import PenaltyShootout
+from states import PlayingPosition
+
+
+def test_takers_ordered_by_conversion():
+    match = create_sample_match()
+    shootout = PenaltyShootout(match)
+    for side, takers in enumerate(shootout.takers):
+        keeper = shootout.keepers[1 - side]
+        conversions = [shootout.conversion(taker, keeper) for taker in takers
+                       if taker.assigned_position != PlayingPosition.GK]
+        assert conversions == sorted(conversions, reverse=True)
+
+
+def test_sent_off_players_do_not_take_kicks():
+    match = create_sample_match()
+    sent_off = match.home_team.lineup[3]
+    sent_off.red_card = True
+    shootout = PenaltyShootout(match)
+    assert sent_off not in shootout.takers[0]
+    assert len(shootout.takers[0]) == len(match.home_team.lineup) - 1
+
+
+def test_goalkeeper_kicks_last():
+    match = create_sample_match()
+    shootout = PenaltyShootout(match)
+    for takers in shootout.takers:
+        assert takers[-1].assigned_position == PlayingPosition.GK
+        assert all(p.assigned_position != PlayingPosition.GK for p in takers[:-1])
@@ -0,0 +1,47 @@
+# tests for restoring snapshots and resuming matches from them
+import random
+import numpy as np
+from gamesim import create_sample_match, SimpleMatchSimulator
+from snapshot import take_snapshot, fork_match
+
+RESUME_SECONDS = 300
+
+
+def _play_until_ball_in_flight(simulator: SimpleMatchSimulator, after: int) -> int:
+    """Advance tick by tick until a kicked ball is loose with players chasing it"""
+    simulator.setup()
+    tick = after
+    simulator.env.run(until=tick)
+    ball = simulator.match.ball
+    while not (ball.possession_player is None and ball.last_kicker is not None and ball.chasers):
+        tick += 1
+        simulator.env.run(until=tick)
+    return tick
+
+
+def test_resume_from_snapshot_matches_uninterrupted_run():
+    random.seed(7)
+    match = create_sample_match()
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    tick = _play_until_ball_in_flight(simulator, after=200)
+
+    blob = take_snapshot(match)
+    state = random.getstate()
+    fork = fork_match(match, blob)
+    assert fork.ball.last_kicker.player_id == match.ball.last_kicker.player_id
+    assert [p.player_id for p in fork.home_team.starting_lineup] == \
+        [p.player_id for p in match.home_team.starting_lineup]
+
+    simulator.env.run(until=tick + RESUME_SECONDS)
+    random.setstate(state)
+    # The pending tick at the snapshot's env time has not run yet
+    SimpleMatchSimulator(fork, verbose=False).run(until=RESUME_SECONDS + 1, resume=True)
+
+    assert fork.clock == match.clock
+    assert len(fork.events) == len(match.events)
+    assert (fork.home_team.goals_scored, fork.away_team.goals_scored) == \
+        (match.home_team.goals_scored, match.away_team.goals_scored)
+    for original, resumed in zip(match.home_team.players + match.away_team.players,
+                                 fork.home_team.players + fork.away_team.players):
+        assert np.array_equal(original.position, resumed.position)
+    assert np.array_equal(match.ball.position, fork.ball.position)
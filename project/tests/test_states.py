@@ -0,0 +1,42 @@
+# tests for the slotted match objects and the player attribute mapping
+import pytest
+from states import Player, PlayerAttribute, PlayerAttributes, PlayingPosition, DEFAULT_ATTRIBUTES
+from gamesim import create_sample_match
+from memory import match_footprint
+
+# Bytes per fresh sample match before match objects used __slots__ and attribute arrays
+# (memory.match_footprint on the parent of the __slots__ change measured 34066)
+UNSLOTTED_BYTES_PER_MATCH = 34066
+
+
+def test_attributes_mapping_methods():
+    attributes = PlayerAttributes()
+    attributes['passing'] = 81
+
+    assert list(attributes.keys()) == [attribute.name.lower() for attribute in PlayerAttribute]
+    assert list(attributes.values()) == [81.0 if attribute == PlayerAttribute.PASSING else float(value)
+                                         for attribute, value in zip(PlayerAttribute, DEFAULT_ATTRIBUTES)]
+    assert dict(attributes.items())['passing'] == 81.0
+    assert attributes.get('shooting') == 70.0
+    assert attributes.get('unknown', 5) == 5
+
+
+def test_attributes_share_the_array():
+    player = Player('P1', 'Player 1', PlayingPosition.CM, None)
+    player.attributes['pace'] = 90
+    assert player.attributes.array[PlayerAttribute.PACE] == 90.0
+    with pytest.raises(KeyError):
+        player.attributes['unknown'] = 1
+    with pytest.raises(TypeError):
+        del player.attributes['pace']
+
+
+def test_match_objects_have_no_instance_dict():
+    match = create_sample_match()
+    for obj in (match, match.ball, match.home_team, match.home_team.players[0]):
+        assert not hasattr(obj, '__dict__')
+
+
+def test_match_footprint_below_unslotted():
+    footprint = match_footprint(create_sample_match, n=20)
+    assert footprint['bytes_per_match'] < 0.85 * UNSLOTTED_BYTES_PER_MATCH
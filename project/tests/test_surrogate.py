@@ -0,0 +1,39 @@
+# tests for the scoreline surrogate's shipped calibration
+import random
+from gamesim import create_sample_match
+import surrogate as surrogate_module
+from memory import MAX_CACHED_FIXTURES
+from surrogate import ScorelineSurrogate, match_features, sample_fixture
+
+
+def test_fresh_fixture_is_served_without_simulating():
+    surrogate = ScorelineSurrogate()
+    scores = sample_fixture(create_sample_match, list(range(50)), surrogate)
+    assert surrogate.fitted
+    assert surrogate.fallbacks == 0
+    assert len(scores) == 50
+
+
+def test_fixtures_across_strengths_stay_in_region():
+    surrogate = ScorelineSurrogate()
+    surrogate.calibrate_reference()
+    saved_state = random.getstate()
+    try:
+        for seed, (home, away) in enumerate(((0, 0), (5, -5), (-6, 4), (7, 7))):
+            random.seed(1000 + seed)
+            match = create_sample_match(home, away)
+            assert surrogate.in_region(match_features(match))
+            assert not surrogate.predict(match)['fallback']
+    finally:
+        random.setstate(saved_state)
+    assert surrogate.fallbacks == 0
+
+
+def test_query_matches_are_bounded():
+    surrogate = ScorelineSurrogate()
+    factories = [lambda k=k: create_sample_match(k % 3, 0) for k in range(MAX_CACHED_FIXTURES + 3)]
+    for factory in factories:
+        sample_fixture(factory, [0], surrogate)
+    cache = surrogate_module._query_matches
+    assert len(cache) <= MAX_CACHED_FIXTURES
+    assert factories[-1] in cache and factories[0] not in cache
@@ -0,0 +1,210 @@
+# per-tick tracking data recorder writing to memory-mapped files
+import json
+import numpy as np
+from typing import Optional
+from states import Match, MatchPeriod, PlayerAction, BallAction
+
+FORMAT_NAME = 'ucl-sim tracking'
+FORMAT_VERSION = 1
+
+# Fixed row layout: home slots, away slots, then the ball
+TEAM_ROWS = 11
+BALL_ROW = 2 * TEAM_ROWS
+N_ROWS = BALL_ROW + 1
+
+# Per-row channels of the float32 and int16 frames
+FLOAT_CHANNELS = ('x', 'y', 'vx', 'vy', 'z')
+CODE_CHANNELS = ('player', 'action', 'possession', 'zone_mask')
+
+# Values of the possession code on the ball row
+BALL_LOOSE, BALL_HOME, BALL_AWAY = 0, 1, 2
+
+FULL_MATCH_SECONDS = 90 * 60
+
+# Section layout of the data file: name, dtype, row shape after the tick axis
+_SECTIONS = (
+    ('frames', 'float32', (N_ROWS, len(FLOAT_CHANNELS))),
+    ('clock', 'float32', ()),
+    ('codes', 'int16', (N_ROWS, len(CODE_CHANNELS))),
+    ('period', 'int16', ()),
+)
+
+
+def header_path(path: str) -> str:
+    """Path of the JSON header written next to a tracking data file"""
+    return path + '.json'
+
+
+def events_path(path: str) -> str:
+    """Path of the match event log written next to a tracking data file"""
+    return path + '.events.json'
+
+
+class TrackingRecorder:
+    """
+    Records every player and the ball on every tick into a preallocated file.
+
+    The data file holds four memory-mapped sections, one row per tick:
+
+        frames  float32 (ticks, 23, 5)  x, y, vx, vy, z (ball height)
+        clock   float32 (ticks,)        match clock in seconds
+        codes   int16   (ticks, 23, 4)  player, action, possession, zone_mask
+        period  int16   (ticks,)        MatchPeriod value
+
+    Rows 0-10 are the home lineup slots, 11-21 the away lineup slots and
+    22 the ball. The player code indexes the roster in the header (-1 for
+    an empty slot and the ball). Players have an action of PlayerAction
+    value and possession 1 while on the ball; the ball row holds a
+    BallAction value and 0 (loose), 1 (home) or 2 (away).
+
+    A JSON header next to the data file describes the layout, the roster
+    and the code tables, and records how many ticks have been written.
+    The match event log is saved alongside it on every flush.
+    Positions are cast straight from the match geometry array into the
+    mapped frame, so a tick costs a few slice assignments.
+    """
+
+    def __init__(self, path: str, match: Match, time_step: float = 1.0,
+                 capacity: Optional[int] = None):
+        """
+        Create the data file and its header.
+
+        Args:
+            path: Path of the data file (the header goes to path + '.json')
+            match: The match to record
+            time_step: Seconds of match time per tick
+            capacity: Ticks to preallocate (defaults to 90 minutes of play)
+        """
+        self.path = path
+        self.match = match
+        self.time_step = time_step
+        self.capacity = capacity if capacity is not None else int(round(FULL_MATCH_SECONDS / time_step))
+        self.ticks = 0
+
+        # Roster: every squad player, so substitutes keep a stable code
+        self.roster = match.home_team.players + match.away_team.players
+        self._roster_index = {player: i for i, player in enumerate(self.roster)}
+
+        self.sections = {}
+        offset = 0
+        for name, dtype, row_shape in _SECTIONS:
+            shape = (self.capacity,) + row_shape
+            self.sections[name] = {'offset': offset, 'dtype': dtype, 'shape': list(shape)}
+            offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        with open(path, 'wb') as data_file:
+            data_file.truncate(offset)
+        self._maps = [np.memmap(path, dtype=section['dtype'], mode='r+', offset=section['offset'],
+                                shape=tuple(section['shape']))
+                      for section in self.sections.values()]
+        # Plain ndarray views of the maps: indexing a memmap subclass costs far more per tick
+        self.frames, self.clock, self.codes, self.period = (
+            mapped.view(np.ndarray) for mapped in self._maps)
+
+        # Frame rows of the geometry entities, rebuilt when the lineup sizes change
+        self._lineup_sizes = None
+        self._rows = None
+        self._code_rows = []
+        self._write_header()
+
+    def header(self) -> dict:
+        """Layout, roster and code tables describing the data file"""
+        home = self.match.home_team
+        return {
+            'format': FORMAT_NAME,
+            'version': FORMAT_VERSION,
+            'ticks': self.ticks,
+            'capacity': self.capacity,
+            'time_step': self.time_step,
+            'rows': {'home': [0, TEAM_ROWS], 'away': [TEAM_ROWS, BALL_ROW], 'ball': BALL_ROW},
+            'float_channels': list(FLOAT_CHANNELS),
+            'code_channels': list(CODE_CHANNELS),
+            'sections': self.sections,
+            'teams': {'home': home.name, 'away': self.match.away_team.name},
+            'roster': [{'player_id': p.player_id, 'name': p.name,
+                        'team': 'home' if p.team == home else 'away',
+                        'position': p.assigned_position.name} for p in self.roster],
+            'player_actions': {action.name: action.value for action in PlayerAction},
+            'ball_actions': {action.name: action.value for action in BallAction},
+            'periods': {period.name: period.value for period in MatchPeriod},
+        }
+
+    def _write_header(self):
+        with open(header_path(self.path), 'w') as header_file:
+            json.dump(self.header(), header_file, indent=1)
+
+    def _write_events(self):
+        with open(events_path(self.path), 'w') as events_file:
+            json.dump(self.match.events, events_file, default=str)
+
+    def record(self, match: Optional[Match] = None):
+        """
+        Append the current state of the match as the next tick.
+
+        Args:
+            match: The match to read (defaults to the one the file was created for)
+        """
+        if self.ticks >= self.capacity:
+            raise ValueError(f"Tracking file is full ({self.capacity} ticks)")
+        match = match if match is not None else self.match
+        t = self.ticks
+
+        geometry = match.geometry
+        entities = geometry.entities
+        n_home = geometry.n_home
+        sizes = (n_home, len(entities) - 1 - n_home)
+        if sizes != self._lineup_sizes:
+            rows = np.r_[0:sizes[0], TEAM_ROWS:TEAM_ROWS + sizes[1], BALL_ROW]
+            self._rows = slice(None) if len(rows) == N_ROWS else rows
+            self._code_rows = rows[:-1].tolist()
+            self._lineup_sizes = sizes
+
+        frame = self.frames[t]
+        frame[self._rows, 0:2] = geometry.positions
+        frame[self._rows, 2:4] = np.stack([entity.velocity for entity in entities])
+        frame[BALL_ROW, 4] = match.ball.height
+
+        codes = [[-1, 0, 0, 0]] * N_ROWS
+        for row, player in zip(self._code_rows, entities[:-1]):
+            codes[row] = [self._roster_index.get(player, -1), player.current_action.value,
+                          player.has_ball, player.zone_mask]
+        ball = match.ball
+        if ball.possession_team is None:
+            holder = BALL_LOOSE
+        else:
+            holder = BALL_HOME if ball.possession_team == match.home_team else BALL_AWAY
+        codes[BALL_ROW] = [-1, ball.action.value, holder, ball.zone_mask]
+        self.codes[t] = codes
+
+        self.clock[t] = match.clock
+        self.period[t] = match.period.value
+        self.ticks += 1
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes mapped for the tick buffers (file-backed; pages are resident once written)"""
+        if self._maps is None:
+            return 0
+        return sum(mapped.nbytes for mapped in self._maps)
+
+    def flush(self):
+        """Write pending data to disk and bring the header and event log up to date"""
+        for mapped in self._maps:
+            mapped.flush()
+        self._write_header()
+        self._write_events()
+
+    def close(self):
+        """Flush and release the memory maps"""
+        if self._maps is None:
+            return
+        self.flush()
+        self._maps = None
+        self.frames = self.clock = self.codes = self.period = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,228 @@
+# common random numbers and antithetic variates for paired tactic comparisons
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from gamesim import SimpleMatchSimulator
+
+# Separate random streams of the simulator (see SimpleMatchSimulator.use_random_streams)
+STREAMS = ('kicks', 'outcomes', 'decisions')
+
+# 1 - 2**-53: mirrors random()'s k * 2**-53 grid onto itself, staying inside [0, 1)
+_MIRROR = 1.0 - 2.0 ** -53
+
+
+class AntitheticRandom(random.Random):
+    """
+    Random source producing the mirror image of random.Random with the same seed.
+
+    Every uniform u becomes 1 - u (exactly, on random()'s 53-bit grid), so
+    uniform() is mirrored too, and every integer draw k below n (choice(),
+    randint()) becomes n - 1 - k.
+    """
+
+    def random(self) -> float:
+        return _MIRROR - super().random()
+
+    def _randbelow(self, n: int) -> int:
+        return n - 1 - super()._randbelow(n)
+
+
+def make_streams(seed: int, antithetic: bool = False) -> Dict[str, random.Random]:
+    """
+    Independent random streams for one replication, derived from one seed.
+
+    Args:
+        seed: Replication seed; both arms of a pair use the same one
+        antithetic: Build mirrored streams instead
+
+    Returns:
+        Dictionary of stream name to random source
+    """
+    seeder = random.Random(seed)
+    stream_class = AntitheticRandom if antithetic else random.Random
+    return {name: stream_class(seeder.getrandbits(64)) for name in STREAMS}
+
+
+def goal_difference(match) -> float:
+    """Home goals minus away goals"""
+    return float(match.home_team.goals_scored - match.away_team.goals_scored)
+
+
+def home_points(match) -> float:
+    """League points won by the home team"""
+    difference = match.home_team.goals_scored - match.away_team.goals_scored
+    return 3.0 if difference > 0 else 1.0 if difference == 0 else 0.0
+
+
+class Arm:
+    """One setting of the experiment: tactic overrides for either team"""
+
+    def __init__(self, home: Optional[Dict[str, Any]] = None, away: Optional[Dict[str, Any]] = None):
+        """
+        Initialize an arm.
+
+        Args:
+            home: Values replacing the home team's tactics
+            away: Values replacing the away team's tactics
+        """
+        self.home = dict(home or {})
+        self.away = dict(away or {})
+
+
+def play_arm(simulator: SimpleMatchSimulator, base_tactics: Tuple[dict, dict], arm: Arm,
+             seed: int, antithetic: bool, metric: Callable) -> float:
+    """
+    Play one replication of an arm from kickoff on its own random streams.
+
+    Args:
+        simulator: Simulator whose match is reused
+        base_tactics: The factory's home and away tactics
+        arm: Tactic overrides to apply
+        seed: Replication seed
+        antithetic: Use mirrored streams
+        metric: Function of the finished match to report
+
+    Returns:
+        The metric's value
+    """
+    match = simulator.match
+    match.home_team.tactics = dict(base_tactics[0], **arm.home)
+    match.away_team.tactics = dict(base_tactics[1], **arm.away)
+    simulator.reset(seed)
+    simulator.use_random_streams(**make_streams(seed, antithetic))
+    simulator.run()
+    return metric(match)
+
+
+def run_pairs(factory: Callable, arm_a: Arm, arm_b: Arm, seeds: List[int], antithetic: bool = False,
+              common: bool = True, metric: Callable = goal_difference) -> List[Tuple[float, ...]]:
+    """
+    Play both arms for every seed.
+
+    Runs in worker processes as well as inline; the caller's random state
+    is left untouched.
+
+    Args:
+        factory: Picklable callable returning a new Match
+        arm_a: First setting
+        arm_b: Second setting
+        seeds: One seed per pair
+        antithetic: Also play every pair on mirrored streams
+        common: Give both arms the same streams (False gives arm B
+                independent streams, as a baseline)
+        metric: Picklable function of the finished match to compare
+
+    Returns:
+        Per seed (a, b), or (a, b, mirrored a, mirrored b) when antithetic
+    """
+    saved_state = random.getstate()
+    match = factory()
+    simulator = SimpleMatchSimulator(match, verbose=False)
+    base_tactics = (dict(match.home_team.tactics), dict(match.away_team.tactics))
+    results = []
+    try:
+        for seed in seeds:
+            seed_b = seed if common else seed ^ 0x5A5A5A5A
+            row = (play_arm(simulator, base_tactics, arm_a, seed, False, metric),
+                   play_arm(simulator, base_tactics, arm_b, seed_b, False, metric))
+            if antithetic:
+                row += (play_arm(simulator, base_tactics, arm_a, seed, True, metric),
+                        play_arm(simulator, base_tactics, arm_b, seed_b, True, metric))
+            results.append(row)
+    finally:
+        random.setstate(saved_state)
+    return results
+
+
+def _mean_variance(values: List[float]) -> Tuple[float, float]:
+    """Sample mean and unbiased variance"""
+    n = len(values)
+    mean = sum(values) / n if n else 0.0
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    return mean, variance
+
+
+def paired_report(rows: List[Tuple[float, ...]], z: float = 1.96) -> Dict[str, Any]:
+    """
+    Paired-difference estimate and the variance reduction it achieved.
+
+    Each row is one sampling unit: the difference is arm A minus arm B,
+    averaged over the mirrored pair for antithetic rows. The reduction
+    factor compares the unit variance with what independent runs of each
+    arm (same number of runs per unit) would give, using the per-run
+    variances of the two arms.
+
+    Args:
+        rows: Output of run_pairs
+        z: Normal quantile for the interval (1.96 = 95%)
+
+    Returns:
+        Dictionary with both arm means, the mean difference and its
+        interval, the interval independent sampling would give, the
+        variance-reduction factor and the sample counts
+    """
+    n = len(rows)
+    runs_per_unit = len(rows[0]) // 2 if rows else 1
+    runs_a = [value for row in rows for value in row[0::2]]
+    runs_b = [value for row in rows for value in row[1::2]]
+    units = [sum(row[0::2]) / runs_per_unit - sum(row[1::2]) / runs_per_unit for row in rows]
+
+    mean_a, variance_a = _mean_variance(runs_a)
+    mean_b, variance_b = _mean_variance(runs_b)
+    difference, unit_variance = _mean_variance(units)
+    independent_variance = (variance_a + variance_b) / runs_per_unit
+
+    half_width = z * math.sqrt(unit_variance / n) if n else math.inf
+    independent_half_width = z * math.sqrt(independent_variance / n) if n else math.inf
+    return {
+        'mean_a': mean_a,
+        'mean_b': mean_b,
+        'difference': difference,
+        'interval': (difference - half_width, difference + half_width),
+        'independent_interval': (difference - independent_half_width,
+                                 difference + independent_half_width),
+        'variance_reduction': independent_variance / unit_variance if unit_variance > 0 else math.inf,
+        'units': n,
+        'runs_per_arm': n * runs_per_unit
+    }
+
+
+def paired_experiment(factory: Callable, arm_a: Arm, arm_b: Arm, n_pairs: int,
+                      seed: Optional[int] = None, antithetic: bool = False, common: bool = True,
+                      metric: Callable = goal_difference, workers: int = 0,
+                      chunk_size: int = 8) -> Dict[str, Any]:
+    """
+    Compare two tactic settings with common random numbers and optional antithetic runs.
+
+    Args:
+        factory: Picklable callable returning a new Match
+        arm_a: First setting
+        arm_b: Second setting
+        n_pairs: Number of seeds (each plays both arms, twice if antithetic)
+        seed: Seed for the pair seeds (None for nondeterministic)
+        antithetic: Also play every pair on mirrored streams
+        common: Share streams between the arms (False gives the independent baseline)
+        metric: Picklable function of the finished match to compare
+        workers: Worker processes to use (0 runs everything inline)
+        chunk_size: Seeds per worker task
+
+    Returns:
+        The paired report (see paired_report)
+    """
+    seeder = random.Random(seed)
+    seeds = [seeder.getrandbits(32) for _ in range(n_pairs)]
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    args = (antithetic, common, metric)
+
+    rows = []
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_pairs, factory, arm_a, arm_b, chunk, *args)
+                       for chunk in chunks]
+            for future in futures:
+                rows.extend(future.result())
+    else:
+        for chunk in chunks:
+            rows.extend(run_pairs(factory, arm_a, arm_b, chunk, *args))
+    return paired_report(rows)
@@ -0,0 +1,128 @@
+# pitch zone classification via a precomputed bitmask raster
+import numpy as np
+from typing import List
+from states import FieldZone
+
+# One bit per zone, so a position can belong to several zones at once
+ZONE_BITS = {zone: 1 << (zone.value - 1) for zone in FieldZone}
+
+# The thirds; every position is in exactly one, which is an entity's primary zone
+THIRDS = (FieldZone.DEFENSIVE_THIRD, FieldZone.MIDDLE_THIRD, FieldZone.ATTACKING_THIRD)
+
+# Zone boundaries on the 0-100 pitch (x runs home goal to away goal, y left
+# wing is high y for the home team)
+THIRD_LINES = (33.3, 66.6)
+WING_LINES = (33.3, 66.6)
+PENALTY_AREA_DEPTH = 15.7  # 16.5m of a 105m pitch
+PENALTY_AREA_Y = (20.4, 79.6)  # 40.3m wide on a 68m pitch
+GOAL_AREA_DEPTH = 5.2  # 5.5m
+GOAL_AREA_Y = (36.5, 63.5)  # 18.3m wide
+CORNER_AREA_SIZE = 8.0
+
+RASTER_RESOLUTION = 2  # Raster cells per pitch unit
+
+# Third for each of the three third bits, and all three bits together
+_THIRD_BY_BIT = {ZONE_BITS[zone]: zone for zone in THIRDS}
+_THIRD_BITS = sum(_THIRD_BY_BIT)
+
+
+def _build_raster(resolution: int) -> np.ndarray:
+    """
+    Zone bitmask for every raster cell, indexed [x_cell, y_cell].
+
+    Args:
+        resolution: Cells per pitch unit
+
+    Returns:
+        uint16 array of shape (100 * resolution + 1, 100 * resolution + 1)
+    """
+    coords = np.arange(100 * resolution + 1) / resolution
+    x = coords[:, None]
+    y = coords[None, :]
+    raster = np.zeros((len(coords), len(coords)), dtype=np.uint16)
+
+    def mark(zone: FieldZone, region: np.ndarray):
+        raster[np.broadcast_to(region, raster.shape)] |= ZONE_BITS[zone]
+
+    mark(FieldZone.DEFENSIVE_THIRD, x < THIRD_LINES[0])
+    mark(FieldZone.MIDDLE_THIRD, (x >= THIRD_LINES[0]) & (x < THIRD_LINES[1]))
+    mark(FieldZone.ATTACKING_THIRD, x >= THIRD_LINES[1])
+
+    mark(FieldZone.RIGHT_WING, y < WING_LINES[0])
+    mark(FieldZone.CENTER, (y >= WING_LINES[0]) & (y < WING_LINES[1]))
+    mark(FieldZone.LEFT_WING, y >= WING_LINES[1])
+
+    near_goal_line = np.minimum(x, 100.0 - x)
+    mark(FieldZone.PENALTY_AREA, (near_goal_line <= PENALTY_AREA_DEPTH) &
+         (y >= PENALTY_AREA_Y[0]) & (y <= PENALTY_AREA_Y[1]))
+    mark(FieldZone.GOAL_AREA, (near_goal_line <= GOAL_AREA_DEPTH) &
+         (y >= GOAL_AREA_Y[0]) & (y <= GOAL_AREA_Y[1]))
+    mark(FieldZone.CORNER_AREA, (near_goal_line <= CORNER_AREA_SIZE) &
+         (np.minimum(y, 100.0 - y) <= CORNER_AREA_SIZE))
+
+    raster.flags.writeable = False
+    return raster
+
+
+ZONE_RASTER = _build_raster(RASTER_RESOLUTION)
+_RASTER_MAX = ZONE_RASTER.shape[0] - 1
+
+
+def zone_masks(positions: np.ndarray) -> np.ndarray:
+    """
+    Classify many positions at once with a single raster lookup.
+
+    Args:
+        positions: Pitch positions, shape (n, 2)
+
+    Returns:
+        uint16 zone bitmasks, shape (n,)
+    """
+    cells = (np.asarray(positions, dtype=float) * RASTER_RESOLUTION).astype(np.intp)
+    np.clip(cells, 0, _RASTER_MAX, out=cells)
+    return ZONE_RASTER[cells[:, 0], cells[:, 1]]
+
+
+def zone_mask(position: np.ndarray) -> int:
+    """Zone bitmask of a single position"""
+    return int(zone_masks(np.asarray(position, dtype=float).reshape(1, 2))[0])
+
+
+def in_zone(mask: int, zone: FieldZone) -> bool:
+    """Whether a bitmask includes a zone"""
+    return bool(mask & ZONE_BITS[zone])
+
+
+def zones_of(mask: int) -> List[FieldZone]:
+    """All zones in a bitmask, in enum order"""
+    return [zone for zone in FieldZone if mask & ZONE_BITS[zone]]
+
+
+def primary_zone(mask: int) -> FieldZone:
+    """The third a bitmask falls in (every pitch position is in exactly one)"""
+    return _THIRD_BY_BIT.get(mask & _THIRD_BITS, FieldZone.MIDDLE_THIRD)
+
+
+def update_zones(match) -> np.ndarray:
+    """
+    Classify every player and the ball in one raster lookup.
+
+    Sets zone_mask on all entities, and current_zone / zone to the third
+    they are in.
+
+    Args:
+        match: The current match state
+
+    Returns:
+        Zone bitmasks in geometry order (home lineup, away lineup, ball)
+    """
+    geometry = match.geometry
+    masks = zone_masks(geometry.positions)
+    for entity, mask in zip(geometry.entities, masks.tolist()):
+        entity.zone_mask = mask
+        third = _THIRD_BY_BIT.get(mask & _THIRD_BITS, FieldZone.MIDDLE_THIRD)
+        if entity is match.ball:
+            entity.zone = third
+        else:
+            entity.current_zone = third
+    return masks